@@ -1,26 +1,107 @@
 import sys
 import os
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import base64
+import json
 import logging
-from typing import List, Dict
-from supplier_scrape_core.processer import Processer
+import time
+import zlib
+from collections import deque
+from typing import Iterable, Iterator, List, Dict, Optional
+from supplier_scrape_core.processer import Processer, pending_prestates, code_worst_case
+from supplier_scrape_core.cache import shared_cache, load_shared
+from supplier_scrape_core.connections import ConnectionWarmer, dns_cache
+from supplier_scrape_core.breaker import shared_breakers
+from supplier_scrape_core.images import ImageVerifier
+from supplier_scrape_core.metrics import registry as metrics_registry
+from supplier_scrape_core.logs import setup_logging
+from supplier_scrape_core.profiling import ProfileStore
+from supplier_scrape_core.store import ProductStore, DEFAULT_STORE_PATH
+from supplier_scrape_core.distributed import Coordinator, SQLiteTaskQueue
 from supplier_scrape_core.structers.product import Suppliers,PreState,Product
-from flask import Flask, request, jsonify, send_file
+from backend.exports import ExportStore, STATUS_PENDING, STATUS_READY
+from backend.scheduler import FairScheduler
+from flask import Flask, Response, request, jsonify, send_file, stream_with_context, url_for
 
 # app initialize
 app = Flask(__name__)
-app.config['MAX_CONTENT_LENGTH'] = 16 * 16 * 1024 # 16 MB max request size
+app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024 # 16 MB max request size, ndjson akış gövdesi sınırsız
 
 # # logs
 # logging = logging.getlogging(__name__)
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s - %(levelname)s - %(message)s"
+# log yazımı kuyruk thread'inde, seviye / örnekleme SCRAPE_LOG_* ortam değişkenleriyle
+setup_logging()
+# warm-up işinin diske yazdığı önbellek ve link indeksini yükle
+load_shared()
+
+# start_connections ile başlatılır, import eden testler / araçlar / worker'lar ağa çıkmaz
+connection_warmer = None
+
+# çekilen her sonuç kalıcı depoya yazılır, export'lar ağa gitmeden buradan okunabilir
+product_store = ProductStore(DEFAULT_STORE_PATH)
+
+# SCRAPE_QUEUE_PATH verilirse /fetch-products kodları kuyruğa yazar, çekimi distributed worker'lar yapar
+coordinator = None
+if os.environ.get("SCRAPE_QUEUE_PATH"):
+    coordinator = Coordinator(
+        SQLiteTaskQueue(os.environ["SCRAPE_QUEUE_PATH"]),
+        task_size=int(os.environ.get("SCRAPE_QUEUE_TASK_SIZE", 100)),
+        timeout=float(os.environ.get("SCRAPE_QUEUE_TIMEOUT", 600)),
+        store=product_store,
+    )
+
+# aynı anda çekilen batch sayısı sınırlı; küçük / interaktif istekler bulk işlerin önüne alınır
+scheduler = FairScheduler(
+    slots=int(os.environ.get("SCHEDULER_SLOTS", 4)),
+    interactive_max_codes=int(os.environ.get("SCHEDULER_INTERACTIVE_MAX", 20)),
+    bulk_chunk=int(os.environ.get("SCHEDULER_BULK_CHUNK", 50)),
+)
+
+# excel çıktıları arka planda render edilip bu dizinde saklanır
+export_store = ExportStore(os.environ.get("EXPORT_DIR", "./exports"), ttl=float(os.environ.get("EXPORT_TTL", 24 * 3600)))
+
+# X-Profile başlığı veya ?profile=true ile tek bir batch profillenir, aynı anda tek profil ve aralık sınırı var.
+# pyinstrument yoksa profil kapalıdır; her çağrıyı izleyen cProfile sadece PROFILE_DETERMINISTIC=true ile açılır
+profile_store = ProfileStore(
+    os.environ.get("PROFILE_DIR", "./profiles"),
+    min_interval=float(os.environ.get("PROFILE_MIN_INTERVAL", 60)),
+    allow_deterministic=os.environ.get("PROFILE_DETERMINISTIC", "false").lower() == "true",
 )
-def create_response(successed:List[Product], failed:List[Product])->Dict:
+
+# verilirse /admin uçları X-Admin-Token başlığı ister
+ADMIN_TOKEN = os.environ.get("ADMIN_TOKEN")
+
+# görsel doğrulama isteğe bağlı, scrape'ten ayrı kendi havuzunda çalışır
+image_verifier = None
+if os.environ.get("VERIFY_IMAGES", "false").lower() == "true":
+    image_verifier = ImageVerifier(
+        max_workers=int(os.environ.get("IMAGE_VERIFY_WORKERS", 8)),
+        store_dir=os.environ.get("IMAGE_STORE_DIR") or None,
+    )
+
+def start_connections():
+    """
+    Sunucu açılış işi: tedarikçi host'ları çözülüp bağlanır, ilk batch DNS / TCP / TLS beklemez ve bağlantılar
+    aralıklarla canlı tutulur (SCRAPE_PREWARM, varsayılan açık). SCRAPE_DNS_CACHE=true ise process'in
+    socket.getaddrinfo'su TTL'li önbellekle değiştirilir. Tekrar çağrılırsa bir şey yapmaz
+    """
+    global connection_warmer
+    if os.environ.get("SCRAPE_DNS_CACHE", "false").lower() == "true":
+        dns_cache.install()
+    if connection_warmer is None and os.environ.get("SCRAPE_PREWARM", "true").lower() == "true":
+        connection_warmer = ConnectionWarmer().start()
+
+def create_app() -> Flask:
+    """WSGI sunucuları için açılış işleriyle birlikte app, ör. gunicorn 'backend.app:create_app()'"""
+    start_connections()
+    return app
+
+def create_response(successed:List[Product], failed:List[Product], pending:Optional[List[PreState]] = None,
+                    continuation:Optional[str] = None)->Dict:
     # ürünleri serialize et
     serialized_successed = [product.serialize() for product in successed]
     serialized_failed = [product.serialize() for product in failed]
+    pending = pending or []
     
     # response
     return {
@@ -31,8 +112,138 @@ def create_response(successed:List[Product], failed:List[Product])->Dict:
         "failed" : {
             "count" : len(serialized_failed),
             "products" : serialized_failed
+        },
+        # deadline yüzünden çekilmeyen kodlar, continuation ile tekrar gönderilerek devam edilir
+        "pending" : {
+            "count" : len(pending),
+            "prestates" : [dict(p) for p in pending],
+            "continuation" : continuation
         }
     }
+
+def encode_continuation(supplier:Suppliers, prestates:List[PreState]) -> str:
+    """Bekleyen kodları istek body'si olarak taşıyan token, sunucuda durum tutulmaz"""
+    body = {"supplier": supplier.value["prefix"], "prestates": [dict(p) for p in prestates]}
+    return base64.urlsafe_b64encode(zlib.compress(json.dumps(body).encode("utf-8"))).decode("ascii")
+
+def decode_continuation(token:str) -> Optional[Dict]:
+    """Token'dan {"supplier", "prestates"} body'si, geçersizse None"""
+    try:
+        body = json.loads(zlib.decompress(base64.urlsafe_b64decode(token.encode("ascii"))))
+    except Exception as e:
+        logging.error(f"Continuation decode error: {e}")
+        return None
+    if not isinstance(body, dict) or not isinstance(body.get("prestates"), list):
+        return None
+    return {"supplier": body.get("supplier"), "prestates": body["prestates"]}
+
+# akış cevabında tek seferde yazılan satır sayısı
+STREAM_LINES = 100
+NDJSON = "application/x-ndjson"
+
+def stream_products(processer, supplier:Suppliers, prestates:Iterable[PreState], client_id:str, priority:str,
+                    deadline:Optional[float]):
+    """
+    ndjson akışı: her ürün bir satır ({"status", "product"}), en sonda {"summary"} satırı.
+    prestates generator olabilir (ndjson istek gövdesi), kodlar okundukça çekilir ve ürünler çekildikçe yazılır;
+    ne istek ne sonuç listeleri bellekte biriktirilir. Deadline'da okunmamış gövde pending'e alınır
+    """
+    counts = {"successed": 0, "failed": 0}
+    source = iter(prestates)
+    # çekime verilmiş, sonucu gelmemiş prestate'ler; sonuçlar veriliş sırasıyla gelir
+    taken = deque()
+
+    def tracked():
+        for prestate in source:
+            taken.append(prestate)
+            yield prestate
+
+    lines = []
+    outcomes = scheduler.iter_run(
+        lambda chunk: processer.iter_with_code(supplier, chunk, deadline=deadline),
+        tracked(), client_id, priority, deadline
+    )
+    for _, product, success in outcomes:
+        taken.popleft()
+        status = "successed" if success else "failed"
+        counts[status] += 1
+        lines.append(json.dumps({"status": status, "product": product.serialize()}, ensure_ascii=False))
+        if len(lines) >= STREAM_LINES:
+            yield "\n".join(lines) + "\n"
+            lines = []
+
+    # deadline yoksa kaynak sonuna kadar tüketilmiştir, ikisi de boş
+    pending = list(taken) + list(source)
+    continuation = encode_continuation(supplier, pending) if pending else None
+    if pending:
+        total = counts["successed"] + counts["failed"] + len(pending)
+        logging.warning(f"[{supplier.name}] Deadline reached, {len(pending)}/{total} codes pending")
+    lines.append(json.dumps({"summary": {
+        **counts,
+        "pending": {"count": len(pending), "prestates": [dict(p) for p in pending], "continuation": continuation}
+    }}))
+    yield "\n".join(lines) + "\n"
+
+def iter_ndjson_prestates(stream) -> Iterator[PreState]:
+    """Satır başına bir prestate ({"code", "price", "stock"}) içeren gövdeden okudukça PreState, hatalı satırlar atlanır"""
+    for n, line in enumerate(stream, 1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield PreState.from_dict(json.loads(line))
+        except (ValueError, KeyError, TypeError) as e:
+            logging.error(f"PreState build error on line {n}: {e}")
+
+def fetch_products_ndjson():
+    """
+    /fetch-products?stream=true&supplier=11 için ndjson gövde (Content-Type: application/x-ndjson), satır başına
+    bir prestate. Gövde tek seferde parse edilmez, boyut sınırı yoktur. Kod sayısı önceden bilinmediği için
+    X-Priority verilmezse bulk sayılır; süre bütçesi ?deadline_ms= veya X-Deadline-Ms ile
+    """
+    if request.args.get("stream", "false").lower() != "true":
+        response_text = "ndjson body requires stream=true"
+        logging.error(response_text)
+        return jsonify({"error": response_text}), 400
+    if coordinator is not None:
+        response_text = "Streaming is not supported in queue mode"
+        logging.error(response_text)
+        return jsonify({"error": response_text}), 400
+
+    supplier_code = request.args.get("supplier")
+    supplier = find_supplier(supplier_code) if supplier_code else None
+    if not supplier:
+        response_text = f"Invalid supplier code. Input: {supplier_code}"
+        logging.error(response_text)
+        return jsonify({"error": response_text}), 400
+    try:
+        deadline = request_deadline({"deadline_ms": request.args.get("deadline_ms")})
+    except ValueError as e:
+        response_text = f"Invalid deadline_ms: {e}"
+        logging.error(response_text)
+        return jsonify({"error": response_text}), 400
+
+    # gövde satır satır okunur, MAX_CONTENT_LENGTH bu istekte uygulanmaz
+    request.max_content_length = None
+    processer = Processer(image_verifier=image_verifier, store=product_store)
+    priority = scheduler.classify(request.headers.get("X-Priority"), sys.maxsize)
+    client_id = request.headers.get("X-Client-Id") or request.remote_addr or "anonymous"
+    logging.info(f"Products will stream using {supplier.name} (ndjson body)")
+    prestates = iter_ndjson_prestates(request.stream)
+    return Response(stream_with_context(stream_products(processer, supplier, prestates, client_id, priority, deadline)),
+                    mimetype=NDJSON), 200
+
+def request_deadline(data:Dict) -> Optional[float]:
+    """body deadline_ms veya X-Deadline-Ms başlığındaki süre bütçesinden time.monotonic() cinsinden son an"""
+    budget = data.get("deadline_ms")
+    if budget is None:
+        budget = request.headers.get("X-Deadline-Ms")
+    if budget is None:
+        return None
+    budget = float(budget)
+    if budget <= 0:
+        raise ValueError(f"deadline_ms must be positive: {budget}")
+    return time.monotonic() + budget / 1000
     
 def create_prestate_objects_from_list(prestate_data: List[dict]) -> List[PreState]:
     prestates = []
@@ -45,19 +256,51 @@ def create_prestate_objects_from_list(prestate_data: List[dict]) -> List[PreStat
             continue
     return prestates
 
+def profile_requested() -> bool:
+    flag = request.headers.get("X-Profile") or request.args.get("profile", "false")
+    return flag.lower() in ("1", "true", "yes")
+
+def admin_allowed() -> bool:
+    return ADMIN_TOKEN is None or request.headers.get("X-Admin-Token") == ADMIN_TOKEN
+
+def find_supplier(supplier_code:str):
+    """Prefix koduna göre tedarikçiyi bul, bulunamazsa None"""
+    for sup in Suppliers:
+        if sup.value["prefix"] == supplier_code:
+            return sup
+    return None
+
 @app.route('/health', methods=['GET'])
 def health_check():
-    """Sunucunu sağlık durumunu kontrol et"""
+    """
+    Sunucunu sağlık durumunu kontrol et. suppliers: tedarikçi bazında devre durumu, open olanlara istek gönderilmemeli.
+    code_worst_case_s: deadline'dan sonra o an çekilen kodun en fazla süresi, istemci zaman aşımı bundan kısa olmamalı.
+    profiler: "sampling", "deterministic" (cProfile, her çağrıyı izler) veya profil kapalıysa None
+    """
     return jsonify({
         "status" : "ok",
-        "message" : "Server is running"
+        "message" : "Server is running",
+        "coalesced_requests" : Processer.coalesced_count(),
+        "suppliers" : shared_breakers.snapshot(),
+        "code_worst_case_s" : code_worst_case(),
+        "profiler" : profile_store.mode
     }), 200
     
+def with_profile_header(response, profile):
+    # profil yazıldıysa indirme adresi ve profil türü başlıkta döner
+    if profile["name"]:
+        response.headers["X-Profile-Report"] = url_for("download_profile", name=profile["name"])
+        response.headers["X-Profile-Mode"] = profile["mode"]
+    return response
+
 @app.route('/fetch-products', methods=["POST"])
 def fetch_products():
     """
     Docstring for fecth_products
     """
+    # büyük listeler satır satır okunan ndjson gövdeyle gönderilebilir
+    if request.mimetype == NDJSON:
+        return fetch_products_ndjson()
     try:
         data = request.get_json()
         
@@ -65,6 +308,24 @@ def fetch_products():
             response_text = "Request body has zero items"
             logging.error(response_text)
             return jsonify({"error", response_text})
+
+        # süre bütçesi istek alınır alınmaz başlar
+        try:
+            deadline = request_deadline(data)
+        except ValueError as e:
+            response_text = f"Invalid deadline_ms: {e}"
+            logging.error(response_text)
+            return jsonify({"error": response_text}), 400
+
+        # continuation token'ı önceki isteğin bekleyen supplier + prestates body'sini taşır
+        token = data.get("continuation")
+        if token:
+            resumed = decode_continuation(token)
+            if resumed is None:
+                response_text = "Invalid continuation token"
+                logging.error(response_text)
+                return jsonify({"error": response_text}), 400
+            data = {**data, **resumed}
         
         # prestate text listesini al
         prestate_texts = data.get('prestates',[])
@@ -87,51 +348,257 @@ def fetch_products():
             logging.error(response_text)
             return jsonify("error",response_text)
         
-        supplier = None
-        for sup in Suppliers:
-            if sup.value["prefix"] == supplier_code:
-                supplier = sup
-                break
-        
         # text'ten supplier'ı oluştur
+        supplier = find_supplier(supplier_code)
         if not supplier:
             response_text = f"Invalid supplier code. Input: {supplier_code}"
             logging.error(response_text)
             return jsonify("error",response_text)
         
         # Ürünleri işle
-        processer = Processer()
+        processer = coordinator or Processer(image_verifier=image_verifier, store=product_store)
         logging.info(f"Products will fetch using {supplier.name}")
-        prodducts_successed, products_failed = processer.get_with_code(supplier,*prestates)
+        # X-Priority: interactive | bulk, verilmezse kod sayısına göre. Adil sıra X-Client-Id başına
+        priority = scheduler.classify(request.headers.get("X-Priority"), len(prestates))
+        client_id = request.headers.get("X-Client-Id") or request.remote_addr or "anonymous"
+
+        # ?stream=true: ürünler çekildikçe ndjson olarak yazılır, büyük batch'lerde bellek batch boyutuyla büyümez
+        if request.args.get("stream", "false").lower() == "true":
+            if not hasattr(processer, "iter_with_code"):
+                response_text = "Streaming is not supported in queue mode"
+                logging.error(response_text)
+                return jsonify({"error": response_text}), 400
+            return Response(stream_products(processer, supplier, prestates, client_id, priority, deadline),
+                            mimetype="application/x-ndjson"), 200
+        fetch = lambda chunk: processer.get_with_code(supplier,*chunk,deadline=deadline)
+        # Coordinator listeyi görevlere bölüp worker'lara kendisi dağıtır, tek slotta tamamını alır
+        chunked = coordinator is None
+        profile = {"name": None, "mode": None}
+        if profile_requested():
+            if profile_store.mode is None:
+                response_text = "Profiling is disabled, pyinstrument is not installed"
+                logging.error(response_text)
+                return jsonify({"error": response_text}), 501
+            with profile_store.profile(supplier.name) as profile:
+                prodducts_successed, products_failed = scheduler.run(fetch, prestates, client_id, priority, deadline, chunked)
+        else:
+            prodducts_successed, products_failed = scheduler.run(fetch, prestates, client_id, priority, deadline, chunked)
+
+        # deadline geçtiyse tamamlananlar döner, kalanlar pending
+        pending, continuation = [], None
+        if deadline is not None:
+            pending = pending_prestates(supplier, prestates, prodducts_successed, products_failed)
+            if pending:
+                continuation = encode_continuation(supplier, pending)
+                logging.warning(f"[{supplier.name}] Deadline reached, {len(pending)}/{len(prestates)} codes pending")
         
-        #eğer excel olarak isteniyorsa öyle döndür
+        #eğer excel olarak isteniyorsa export işini arka plana at, indirme adresini döndür
         export_excel = request.args.get("excel", "false").lower() == "true"
         if export_excel:
-            from supplier_scrape_core.savers import SaverLikeIkasTemplate
-            from supplier_scrape_core.config.config import STATIC_VALUES
-
-            saver = SaverLikeIkasTemplate()
-            filled_frame_successed = saver.fill(prodducts_successed,STATIC_VALUES)
-            filled_frame_failed = saver.fill(products_failed,STATIC_VALUES)
-            output = saver.convert_io_output(filled_frame_successed,filled_frame_failed)
-            
-            return send_file(
-                output,
-                as_attachment=True,
-                download_name="products.xlsx",
-                mimetype="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-            )
+            job_id = export_store.submit(prodducts_successed, products_failed)
+            status = export_store.status(job_id)
+            return with_profile_header(jsonify({
+                "job_id" : job_id,
+                "etag" : job_id,
+                "status" : status["status"],
+                "status_url" : url_for("export_status", job_id=job_id),
+                "download_url" : url_for("download_export", job_id=job_id),
+                "successed" : {"count" : len(prodducts_successed)},
+                "failed" : {"count" : len(products_failed)},
+                "pending" : {"count" : len(pending), "continuation" : continuation}
+            }), profile), 202
 
         # response oluştur
-        response = create_response(prodducts_successed, products_failed)
+        response = create_response(prodducts_successed, products_failed, pending, continuation)
         
-        return jsonify(response), 200
+        return with_profile_header(jsonify(response), profile), 200
     
     except Exception as e:
         response_text = f"Unknown process fail: {e}"
         logging.error(response_text)
         return jsonify({"error" : response_text}), 500
     
+@app.route('/exports/<job_id>/status', methods=['GET'])
+def export_status(job_id):
+    """Excel export işinin durumu"""
+    status = export_store.status(job_id)
+    if status is None:
+        return jsonify({"error": "Export could'nt find"}), 404
+    return jsonify({"job_id": job_id, **status}), 200
+
+@app.route('/exports/<job_id>', methods=['GET'])
+def download_export(job_id):
+    """Hazır excel dosyasını indir. ETag / If-None-Match ve Range desteklenir"""
+    status = export_store.status(job_id)
+    if status is None:
+        return jsonify({"error": "Export could'nt find"}), 404
+    if status["status"] == STATUS_PENDING:
+        return jsonify({"job_id": job_id, **status}), 202
+    if status["status"] != STATUS_READY:
+        return jsonify({"job_id": job_id, **status}), 500
+
+    response = send_file(
+        os.path.abspath(export_store.path(job_id)),
+        as_attachment=True,
+        download_name="products.xlsx",
+        mimetype="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+        etag=job_id,
+        conditional=True,
+        max_age=3600
+    )
+    response.headers["Accept-Ranges"] = "bytes"
+    return response
+
+@app.route('/cache/stats', methods=['GET'])
+def cache_stats():
+    """Ürün önbelleği istatistikleri"""
+    return jsonify(shared_cache.stats()), 200
+
+@app.route('/connections/stats', methods=['GET'])
+def connections_stats():
+    """DNS önbelleği ve bağlantı ısıtma sonuçları (host başına ilk byte süresi)"""
+    if connection_warmer is None:
+        return jsonify({"prewarm": False, "dns": dns_cache.stats()}), 200
+    return jsonify({"prewarm": True, **connection_warmer.stats()}), 200
+
+@app.route('/cache/invalidate', methods=['POST'])
+def cache_invalidate():
+    """
+    Önbellekten girdi sil. Body verilmezse tüm önbellek temizlenir.
+    {"supplier": "11", "codes": [145204, 147149]}
+    """
+    data = request.get_json(silent=True) or {}
+    supplier = None
+    supplier_code = data.get("supplier")
+    if supplier_code:
+        supplier = find_supplier(supplier_code)
+        if not supplier:
+            return jsonify({"error": f"Invalid supplier code. Input: {supplier_code}"}), 400
+
+    codes = data.get("codes")
+    if codes is not None and (supplier is None or not isinstance(codes, list)):
+        return jsonify({"error": "codes must be a list and requires supplier"}), 400
+
+    removed = shared_cache.invalidate(supplier, codes)
+    logging.info(f"Cache invalidated: {removed} entries")
+    return jsonify({"removed": removed}), 200
+
+@app.route('/cache/reload', methods=['POST'])
+def cache_reload():
+    """Warm-up işinin diske yazdığı veriyi yeniden yükle"""
+    load_shared()
+    return jsonify({"entries": len(shared_cache)}), 200
+
+@app.route('/cache/warm', methods=['POST'])
+def cache_warm():
+    """
+    Verilen kodları çekip önbelleğe doldur.
+    {"supplier": "11", "codes": [145204, 147149]}
+    """
+    data = request.get_json(silent=True) or {}
+    supplier = find_supplier(data.get("supplier"))
+    if not supplier:
+        return jsonify({"error": f"Invalid supplier code. Input: {data.get('supplier')}"}), 400
+
+    codes = data.get("codes")
+    if not codes or not isinstance(codes, list):
+        return jsonify({"error": "Unvalid body codes format"}), 400
+
+    processer = Processer(store=product_store)
+    successed, failed = processer.get_with_code(supplier, *[PreState(code) for code in codes])
+    return jsonify({
+        "warmed": len(successed),
+        "failed": len(failed),
+        "entries": len(shared_cache)
+    }), 200
+
+@app.route('/store/stats', methods=['GET'])
+def store_stats():
+    """Ürün deposu istatistikleri ve son çalışmalar"""
+    return jsonify({**product_store.stats(), "recent_scrapes": product_store.scrapes(limit=20)}), 200
+
+@app.route('/store/export', methods=['GET'])
+def store_export():
+    """
+    Depodaki ürünleri ağa gitmeden xlsx olarak indir.
+    ?supplier=11&kategori=Zıbın&scrape_id=42 (hepsi isteğe bağlı)
+    """
+    supplier = None
+    supplier_code = request.args.get("supplier")
+    if supplier_code:
+        supplier = find_supplier(supplier_code)
+        if not supplier:
+            return jsonify({"error": f"Invalid supplier code. Input: {supplier_code}"}), 400
+    scrape_id = request.args.get("scrape_id")
+    if scrape_id is not None and not scrape_id.isdigit():
+        return jsonify({"error": "scrape_id must be an integer"}), 400
+
+    try:
+        from supplier_scrape_core.savers import SaverLikeIkasTemplate
+        from supplier_scrape_core.config.config import STATIC_VALUES
+
+        frame = product_store.read_frame(supplier, request.args.get("kategori"),
+                                         scrape_id=int(scrape_id) if scrape_id else None)
+        saver = SaverLikeIkasTemplate()
+        output = saver.convert_io_output(saver.fill_frame(frame, STATIC_VALUES))
+    except Exception as e:
+        logging.error(f"Store export fail: {e}")
+        return jsonify({"error": f"Store export fail: {e}"}), 500
+
+    return send_file(
+        output,
+        as_attachment=True,
+        download_name="products.xlsx",
+        mimetype="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+    )
+
+@app.route('/metrics', methods=['GET'])
+def metrics():
+    """Aşama bazlı süre histogramları, Prometheus text formatında. ?format=json ile özet"""
+    if request.args.get("format") == "json":
+        return jsonify({**metrics_registry.snapshot(), **scheduler.snapshot()}), 200
+    gauges = {
+        "scrape_cache_entries": len(shared_cache),
+        "scrape_coalesced_requests_total": Processer.coalesced_count(),
+    }
+    text = metrics_registry.render_prometheus(gauges) + scheduler.render_prometheus()
+    return Response(text, mimetype="text/plain; version=0.0.4"), 200
+
+@app.route('/admin/profiles', methods=['GET'])
+def list_profiles():
+    """Kaydedilmiş profil raporları"""
+    if not admin_allowed():
+        return jsonify({"error": "Forbidden"}), 403
+    return jsonify({
+        "mode": profile_store.mode,
+        "skipped": profile_store.skipped,
+        "profiles": [
+            {**report, "download_url": url_for("download_profile", name=report["name"])}
+            for report in profile_store.list()
+        ]
+    }), 200
+
+@app.route('/admin/profiles/<name>', methods=['GET'])
+def download_profile(name):
+    """Profil raporunu indir (speedscope json veya pstats)"""
+    if not admin_allowed():
+        return jsonify({"error": "Forbidden"}), 403
+    path = profile_store.path(name)
+    if path is None:
+        return jsonify({"error": "Profile could'nt find"}), 404
+    return send_file(os.path.abspath(path), as_attachment=True, download_name=name)
+
+@app.route('/images/stats', methods=['GET'])
+def images_stats():
+    """Görsel doğrulama aşamasının throughput'u ve bozuk görseller"""
+    if image_verifier is None:
+        return jsonify({"enabled": False}), 200
+    return jsonify({
+        "enabled": True,
+        **image_verifier.stats(),
+        "broken_urls": image_verifier.broken_urls()
+    }), 200
+
 @app.errorhandler(404)
 def not_found(error):
     """404 hatası"""
@@ -144,6 +611,7 @@ def internal_error(error):
 
 if __name__ == "__main__":
     logging.info("Server Starting...")
+    start_connections()
     
     app.run(debug=True, host='0.0.0.0', port=5000)
     
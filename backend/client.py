@@ -4,10 +4,16 @@ sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')
 from supplier_scrape_core.structers.product import PreState,Suppliers,Product
 from supplier_scrape_core.savers import SaverLikeIkasTemplate
 from supplier_scrape_core.config.config import STATIC_VALUES
-from typing import List, Optional, Tuple
+from supplier_scrape_core.processer import code_worst_case
+from typing import Dict, List, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
 import requests
 import logging
 import json
+import socket
+import threading
+import time
 
 
 def create_payload(prestates:List[PreState], supplier:Suppliers):
@@ -17,27 +23,255 @@ def create_payload(prestates:List[PreState], supplier:Suppliers):
     
 class Client:
     
-    def __init__(self, base_url):
+    def __init__(self, base_url, chunk_size:int = 100, max_workers:int = 4, timeout:float = 30,
+                 retries:int = 2, health_ttl:float = 30, priority:Optional[str] = None, client_id:Optional[str] = None,
+                 deadline:Optional[float] = None):
+        """
+        Args:
+            base_url: Sunucu adresi
+            chunk_size: Tek istekte gönderilecek en fazla prestate sayısı
+            max_workers: Paralel gönderilecek en fazla parça (ve bağlantı havuzu boyutu)
+            timeout: Parça başına istek zaman aşımı (saniye). /fetch-products isteklerinde deadline + sunucunun kod
+                başına en kötü süresinden kısa tutulmaz
+            retries: Başarısız bir parçanın tekrar deneme sayısı
+            health_ttl: Health check sonucunun geçerli sayılacağı süre (saniye)
+            priority: Sunucudaki öncelik sınıfı ("interactive" / "bulk"), verilmezse kod sayısına göre belirlenir
+            client_id: Sunucunun adil sıralamada kullandığı kimlik, verilmezse host:pid
+            deadline: Sunucunun tek istekte yeni kod başlatacağı süre (saniye), dolunca tamamlananlar döner ve kalanlarla
+                devam edilir. Verilmezse timeout'un yarısı
+        """
         self.base_url = base_url
+        self.chunk_size = chunk_size
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self.retries = retries
+        self.health_ttl = health_ttl
+        self.deadline = deadline if deadline is not None else timeout / 2
+        # sunucu deadline'da o an çektiği kodu bitirir; health cevabındaki değerle güncellenir
+        self.code_worst_case = code_worst_case()
+        # son send çağrısında süre bütçesi yetmediği için çekilemeyen kodlar, tedarikçi bazında
+        self.last_pending: Dict[Suppliers, List[PreState]] = {}
+
+        # bağlantılar istekler arasında açık tutulur
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max_workers)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.session.headers["X-Client-Id"] = client_id or f"{socket.gethostname()}:{os.getpid()}"
+        if priority:
+            self.session.headers["X-Priority"] = priority
+
+        self._health_lock = threading.Lock()
+        self._health_status = False
+        self._health_checked_at = None
+        # son health cevabındaki tedarikçi devre durumları
+        self._supplier_states: Dict[str, Dict] = {}
         
         health = self._health_check()
         logging.info(f"Server health {health}")
         
-    def _health_check(self):
-        """Health check"""
-        try:
-            response = requests.get(f"{self.base_url}/health", timeout=5)
-            
-            if response.status_code == 200:            
-                return True
-            else:
-                return False       
-        except requests.exceptions.ConnectionError:
-                return False
-        except Exception as e:
+    def _health_check(self, force:bool = False):
+        """Health check, sonuç health_ttl süresince önbellekten döner"""
+        with self._health_lock:
+            if (not force and self._health_checked_at is not None
+                    and time.monotonic() - self._health_checked_at < self.health_ttl):
+                return self._health_status
+            try:
+                response = self.session.get(f"{self.base_url}/health", timeout=5)
+                status = response.status_code == 200
+                if status:
+                    body = response.json()
+                    self._supplier_states = body.get("suppliers") or {}
+                    self.code_worst_case = body.get("code_worst_case_s") or self.code_worst_case
+            except requests.exceptions.ConnectionError:
+                status = False
+            except Exception as e:
+                status = False
+            self._health_status = status
+            self._health_checked_at = time.monotonic()
+            return status
+
+    def supplier_down(self, supplier:Suppliers) -> bool:
+        """Sunucuda tedarikçinin devresi açık ve deneme zamanı gelmemişse True (health_ttl süresince önbellekten)"""
+        self._health_check()
+        state = self._supplier_states.get(supplier.name) or {}
+        return state.get("state") == "open" and (state.get("retry_in") or 0) > 0
+
+    def fetch_timeout(self, deadline:float) -> float:
+        """
+        deadline'lı /fetch-products isteğinin zaman aşımı. Sunucu deadline'dan sonra o an çektiği kodu bitirip cevap
+        verir; istemci bundan önce vazgeçerse parça tekrar gönderilir ve kodlar iki kez çekilir
+        """
+        return max(self.timeout, deadline + self.code_worst_case + 5)
+
+    def _invalidate_health(self):
+        with self._health_lock:
+            self._health_checked_at = None
+
+    @staticmethod
+    def _log_payload(payload: Dict):
+        # payload'ın tamamı sadece DEBUG açıkken serialize edilir
+        if "continuation" in payload:
+            logging.info("Payload gönderiliyor: continuation, deadline %s ms", payload.get("deadline_ms"))
+        else:
+            logging.info("Payload gönderiliyor: %d prestates, supplier %s", len(payload["prestates"]), payload["supplier"])
+        if logging.getLogger().isEnabledFor(logging.DEBUG):
+            logging.debug("Payload: %s", json.dumps(payload))
+
+    def _post_chunk(self, payload:Dict, query:str = "") -> Optional[requests.Response]:
+        """Bir parçayı gönderir, zaman aşımı / bağlantı / 5xx / 429 durumlarında tekrar dener"""
+        timeout = self.fetch_timeout(payload["deadline_ms"] / 1000) if "deadline_ms" in payload else self.timeout
+        for attempt in range(self.retries + 1):
+            if attempt:
+                time.sleep(min(2 ** (attempt - 1), 8))
+            try:
+                self._log_payload(payload)
+                response = self.session.post(
+                    f"{self.base_url}/fetch-products{query}",
+                    json = payload,
+                    timeout = timeout
+                )
+            except requests.exceptions.Timeout:
+                logging.error(f"İstek zaman aşımına uğradı (timeout) [{attempt + 1}/{self.retries + 1}]")
+                continue
+            except requests.exceptions.ConnectionError:
+                logging.error(f"Sunucuya bağlanılamadı: {self.base_url} [{attempt + 1}/{self.retries + 1}]")
+                self._invalidate_health()
+                continue
+
+            logging.info(f"Response status: {response.status_code}")
+            if response.status_code == 200:
+                return response
+            if response.status_code == 429 or response.status_code >= 500:
+                continue
+            logging.error(f"HTTP Error: {response.status_code}")
+            return None
+        return None
+
+    def _send_chunk(self, prestates:List[PreState], supplier:Suppliers, budget_end:Optional[float] = None,
+                    cancel_event:Optional[threading.Event] = None) -> Optional[dict]:
+        """
+        Parçayı sunucuya deadline ile gönderir, cevapta pending kalan kodlar continuation token'ı ile
+        bitene, budget_end geçene, cancel_event set edilene veya arka arkaya retries kez ilerleme olmayana kadar
+        devam ettirilir. İlk istek gönderilemezse None
+
+        Returns:
+            {"successed": {"products"}, "failed": {"products"}, "pending": [prestate dict]}
+        """
+        payload = create_payload(prestates,supplier)
+        successed, failed = [], []
+        pending = [dict(p) for p in prestates]
+        sent, stalls = False, 0
+        while pending:
+            if cancel_event is not None and cancel_event.is_set():
+                logging.warning(f"[{supplier.name}] Cancelled, {len(pending)} codes not sent")
+                break
+            remaining = None if budget_end is None else budget_end - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                break
+            payload["deadline_ms"] = int(min(self.deadline, remaining if remaining is not None else self.deadline) * 1000)
+            response = self._post_chunk(payload)
+            if response is None:
+                if not sent:
+                    return None
+                break
+            sent = True
+            data = response.json()
+            done = data.get("successed", {}).get("products", []) + data.get("failed", {}).get("products", [])
+            successed.extend(data.get("successed", {}).get("products", []))
+            failed.extend(data.get("failed", {}).get("products", []))
+
+            block = data.get("pending") or {}
+            token = block.get("continuation")
+            if not token:
+                pending = []
+                break
+            pending = block.get("prestates", [])
+            logging.info(f"[{supplier.name}] {len(pending)} codes pending, resuming")
+            stalls = 0 if done else stalls + 1
+            if stalls > self.retries:
+                logging.error(f"[{supplier.name}] No progress in {stalls} rounds, {len(pending)} codes left pending")
+                break
+            payload = {"continuation": token}
+        return {"successed": {"products": successed}, "failed": {"products": failed}, "pending": pending}
+
+    def _fetch_chunked(self, prestates:List[PreState], supplier:Suppliers, budget_end:Optional[float] = None,
+                       cancel_event:Optional[threading.Event] = None) -> Optional[Tuple[List[Product],List[Product]]]:
+        """
+        Prestate listesini parçalara bölüp paralel gönderir ve sonuçları parça sırasıyla birleştirir.
+        Tekrar denemelere rağmen başarısız olan parçaların ürünleri başarısız listesine eklenir.
+        Süre bütçesi içinde çekilemeyen kodlar çekilmeye çalışılmadığı için iki listede de yer almaz, continuation ile
+        devam ettirilmek üzere last_pending'e yazılır. cancel_event set edilirse yeni parça ve devam isteği gönderilmez,
+        kalan kodlar aynı şekilde last_pending'de kalır.
+        Hiçbir parça gönderilemezse None döner.
+        """
+        chunks = [prestates[i:i + self.chunk_size] for i in range(0, len(prestates), self.chunk_size)]
+        if not chunks:
+            return [], []
+
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(chunks))) as executor:
+            # map parça sırasını korur
+            results = list(executor.map(lambda chunk: self._send_chunk(chunk, supplier, budget_end, cancel_event), chunks))
+
+        successed_products = []
+        failed_products = []
+        pending = []
+        sent_chunks = 0
+        for chunk, data in zip(chunks, results):
+            if data is None:
+                logging.error(f"[{supplier.name}] {len(chunk)} prestates could'nt send, marked as failed")
+                failed_products.extend(
+                    Product(urun_kodu=p.code, marka=supplier, fiyat=p.price, stok=p.stock) for p in chunk
+                )
+                continue
+            sent_chunks += 1
+            for item in data.get("successed", {}).get("products",[]):
+                successed_products.append(Product.from_Serialize(item))
+            for item in data.get("failed", {}).get("products",[]):
+                failed_products.append(Product.from_Serialize(item))
+            pending.extend(PreState.from_dict(item) for item in data.get("pending", []))
+
+        self.last_pending[supplier] = pending
+        if pending and not (cancel_event is not None and cancel_event.is_set()):
+            logging.warning(f"[{supplier.name}] {len(pending)} codes could'nt fetch within the time budget, left pending")
+        if sent_chunks == 0:
+            return None
+        logging.info(f"Başarılı: {len(successed_products)} Başarısız: {len(failed_products)} ({sent_chunks}/{len(chunks)} parça)")
+        return successed_products, failed_products
+
+    def _download_export(self, job:dict, output_path:str, poll_interval:float = 0.5, wait_timeout:float = 300) -> bool:
+        """Arka planda hazırlanan export'u hazır olana kadar bekleyip indirir"""
+        download_url = f"{self.base_url}{job['download_url']}"
+        deadline = time.monotonic() + wait_timeout
+        while time.monotonic() < deadline:
+            response = self.session.get(download_url, timeout=self.timeout, stream=True)
+            if response.status_code == 202:
+                response.close()
+                time.sleep(poll_interval)
+                continue
+            if response.status_code != 200:
+                logging.error(f"Export download fail: {response.status_code}")
                 return False
+            with open(output_path, "wb") as f:
+                for block in response.iter_content(64 * 1024):
+                    f.write(block)
+            return True
+        logging.error(f"Export was'nt ready in {wait_timeout}s: {job['job_id']}")
+        return False
+
+    def send_many(self, sup_prestates:Dict[Suppliers, List[PreState]], save_path : Optional[str] = None,
+                  budget : Optional[float] = None,
+                  cancel_event : Optional[threading.Event] = None) -> Dict[Suppliers, Tuple[List[Product],List[Product]]]:
+        """Birden fazla tedarikçiyi paralel gönderir. Her tedarikçi için send() sonucunu döndürür"""
+        jobs = {k: v for k, v in sup_prestates.items() if v}
+        if not jobs:
+            return {}
+        with ThreadPoolExecutor(max_workers=len(jobs)) as executor:
+            futures = {k: executor.submit(self.send, v, k, save_path, budget, cancel_event) for k, v in jobs.items()}
+            return {k: f.result() for k, f in futures.items()}
             
-    def send(self,prestates: List[PreState],supplier:Suppliers, save_path : Optional[str] = None)->Tuple[List[Product],List[Product]]:
+    def send(self,prestates: List[PreState],supplier:Suppliers, save_path : Optional[str] = None,
+             budget : Optional[float] = None, cancel_event : Optional[threading.Event] = None)->Tuple[List[Product],List[Product]]:
         """
         Send prestates to the remote product-fetching endpoint, parse the response and optionally save results to Excel files.
         Parameters
@@ -51,26 +285,37 @@ class Client:
             - {save_path}/{supplier.name}_successed.xlsx
             - {save_path}/{supplier.name}_failed.xlsx
             Saving is performed using SaverLikeIkasTemplate().fill(..., STATIC_VALUES, path).
+        budget : Optional[float]
+            Total time budget in seconds. When it runs out, codes the server has not fetched yet are left out of both
+            lists and listed in self.last_pending[supplier] to be resumed later. None keeps resuming until every code
+            is done (or the server stops making progress).
+        cancel_event : Optional[threading.Event]
+            Checked before every chunk and every continuation request. Once set, nothing more is sent and the codes
+            not fetched yet are left out of both lists (listed in self.last_pending[supplier]).
         Returns
         -------
         Tuple[List[Product], List[Product]]
             A tuple (successed_products, failed_products) on success where each element is a list of Product instances
-            created via Product.from_Serialize(...) from the server response.
+            created via Product.from_Serialize(...) from the server response. Codes that were never attempted
+            (pending) are in neither list; they are in self.last_pending[supplier].
         bool
             Returns False on failure (health check failure, HTTP errors, timeouts, connection errors or other exceptions).
             Note: the implementation currently mixes tuple return and boolean False for error paths.
         Behavior / Side effects
         ----------------------
-        - Performs a local health check via self._health_check(); if it returns False, the method logs an error and returns False.
-        - Constructs a JSON payload: {"prestates": [dict(p) for p in prestates], "supplier": supplier.value["prefix"]}.
-        - Sends a POST to f"{self.base_url}/fetch-products" with a 30s timeout.
-        - Expects a JSON response with structure containing "successed" and "failed" blocks, each optionally having "count" and "products".
-        - Converts each returned product dict to a Product via Product.from_Serialize and collects separately into successed_products and failed_products.
+        - Performs a health check via self._health_check(); the result is cached for health_ttl seconds. If it returns False, the method logs an error and returns False.
+        - If the server reports the supplier's circuit breaker as open, nothing is sent: both lists are empty and every code is listed in self.last_pending[supplier] as deferred.
+        - Splits prestates into chunks of chunk_size and builds a JSON payload per chunk: {"prestates": [dict(p) for p in chunk], "supplier": supplier.value["prefix"]}.
+        - Sends the chunks in parallel (up to max_workers) as POSTs to f"{self.base_url}/fetch-products" over the pooled session, each with its own timeout and retries.
+        - Each request carries deadline_ms (self.deadline); the server returns what it completed in time and a continuation token for the rest, which is posted back until nothing is pending.
+        - Expects a JSON response per chunk with structure containing "successed" and "failed" blocks, each optionally having "count" and "products".
+        - Converts each returned product dict to a Product via Product.from_Serialize and collects separately into successed_products and failed_products, in chunk order.
+        - Prestates of a chunk that still fails after retries are returned as failed products; False is returned only when no chunk could be sent.
         - If save_path is provided, attempts to save both lists to Excel files; exceptions during saving are caught and printed (but do not change the method's return on success parsing).
         - Logs status information and errors using the module logger.
         Errors and Logging
         ------------------
-        - Catches requests.exceptions.Timeout and requests.exceptions.ConnectionError and logs an appropriate error message, returning False.
+        - Timeouts, connection errors, 429 and 5xx responses are retried per chunk with exponential backoff.
         - Catches any other Exception, logs it as a processing error and returns False.
         - Saving-related exceptions are printed to stdout (do not raise).
         """
@@ -78,36 +323,18 @@ class Client:
         if not health_status:
             logging.error("Server Health Status False")
             return False,False
+        if self.supplier_down(supplier):
+            # sunucu bu tedarikçiye erişemiyor, istek gönderilmez. Kodlar denenmediği için başarısız sayılmaz,
+            # daha sonra tekrar denenmek üzere last_pending'de
+            logging.warning(f"[{supplier.name}] Supplier is down on server, {len(prestates)} codes deferred")
+            self.last_pending[supplier] = list(prestates)
+            return [], []
         try:
-            payload = create_payload(prestates,supplier)
-
-            logging.info(f"Payload gönderiliyor: {json.dumps(payload, indent=2)}")
-            response = requests.post(
-                # f"{self.base_url}/fetch-products",
-                f"{self.base_url}/fetch-products",
-                json = payload,
-                timeout = 30
-            )
-            
-            logging.info(f"Response status: {response.status_code}")
-            if response.status_code == 200:
-                data = response.json()
-                
-                successed_count = data.get('successed', {}).get('count',0)
-                failed_count = data.get('failed', {}).get('count',0)
-
-                logging.info(f"Başarılı: {successed_count} Başarısız: {failed_count}")
-
-                successed_products = []
-                failed_products = []
-                
-                for item in data.get("successed").get("products",[]):
-                    product = Product.from_Serialize(item)
-                    successed_products.append(product)
-                    
-                for item in data.get("failed").get("products",[]):
-                    product = Product.from_Serialize(item)
-                    failed_products.append(product)       
+            budget_end = None if budget is None else time.monotonic() + budget
+            result = self._fetch_chunked(prestates, supplier, budget_end, cancel_event)
+            if result is None:
+                return False,False
+            successed_products, failed_products = result
                         
             if save_path is not None:
 
@@ -156,6 +383,9 @@ class Client:
         Returns
         -------
         Excel File
+
+        The server renders the export in the background and answers 202 with a download_url;
+        the client polls until the file is ready and then downloads it.
         """
         health_status = self._health_check()
         if not health_status:
@@ -164,16 +394,16 @@ class Client:
         try:
             payload = create_payload(prestates,supplier)
 
-            logging.info(f"Payload gönderiliyor: {json.dumps(payload, indent=2)}")
-            response = requests.post(
+            self._log_payload(payload)
+            response = self.session.post(
                 f"{self.base_url}/fetch-products?excel=true",
                 json=payload,
-                timeout=30
+                timeout=self.timeout
             )
 
             logging.info(f"Response status: {response.status_code}")
 
-            if response.status_code != 200:
+            if response.status_code not in (200, 202):
                 logging.error(f"HTTP Error: {response.status_code}")
                 return False, False
 
@@ -182,8 +412,13 @@ class Client:
                 return False, False
 
             output_path = f"{save_path}/{supplier.name}_products_mixed.xlsx"
-            with open(output_path, "wb") as f:
-                f.write(response.content)
+            if response.status_code == 202:
+                # sunucu export'u arka planda hazırlıyor, hazır olunca indir
+                if not self._download_export(response.json(), output_path):
+                    return False, False
+            else:
+                with open(output_path, "wb") as f:
+                    f.write(response.content)
 
             logging.info(f"Excel kaydedildi: {output_path}")
 
@@ -0,0 +1,164 @@
+import os
+from typing import Dict, List, Optional
+from concurrent.futures import ThreadPoolExecutor
+import hashlib
+import logging
+import re
+import threading
+import time
+from supplier_scrape_core.structers.product import Product
+
+"""
+excel=true isteklerinin xlsx çıktısını istek içinde değil arka planda üreten iş kuyruğu.
+Dosyalar yerel bir artifact dizinine içerik hash'i ile yazılır; aynı sonuç tekrar istendiğinde
+yeniden render edilmez, diskteki dosya döndürülür. ttl süresince istenmeyen export'ların kaydı ve dosyası silinir.
+"""
+
+JOB_ID_PATTERN = re.compile(r"^[0-9a-f]{64}$")
+
+STATUS_PENDING = "pending"
+STATUS_READY = "ready"
+STATUS_FAILED = "failed"
+
+# süresi dolan export'ların en sık hangi aralıkla aranacağı (saniye)
+PRUNE_INTERVAL = 60
+
+
+def export_id(successed: List[Product], failed: List[Product]) -> str:
+    """Sonuç içeriğinin hash'i. Hem dosya adı hem ETag olarak kullanılır"""
+    digest = hashlib.sha256()
+    for title, products in (("successed", successed), ("failed", failed)):
+        digest.update(title.encode())
+        for product in products:
+            digest.update(product.serialize().encode("utf-8"))
+            digest.update(b"\n")
+    return digest.hexdigest()
+
+
+class ExportStore:
+    """xlsx export işlerini arka planda çalıştıran ve çıktıları saklayan depo"""
+
+    def __init__(self, directory: str = "./exports", max_workers: int = 2, ttl: float = 24 * 3600):
+        """
+        Args:
+            directory: Çıktıların yazılacağı dizin
+            max_workers: Aynı anda render edilecek en fazla export
+            ttl: Biten export'un kaydının ve dosyasının saklanma süresi (saniye), tekrar istenince yenilenir
+        """
+        self.directory = directory
+        self.ttl = ttl
+        os.makedirs(self.directory, exist_ok=True)
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="excel-export")
+        self._lock = threading.Lock()
+        # job_id -> {"status": ..., "error": ...}
+        self._jobs: Dict[str, Dict] = {}
+        # job_id -> bitiş / son istenme zamanı (time.time, dosya mtime'ı ile aynı saat)
+        self._finished: Dict[str, float] = {}
+        self._last_prune = time.monotonic()
+
+    def path(self, job_id: str) -> str:
+        return os.path.join(self.directory, f"{job_id}.xlsx")
+
+    def submit(self, successed: List[Product], failed: List[Product]) -> str:
+        """Export işini kuyruğa ekler ve job id döndürür. Aynı içerik daha önce render edildiyse tekrar yapılmaz"""
+        self._maybe_prune()
+        job_id = export_id(successed, failed)
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is not None and job["status"] == STATUS_PENDING:
+                return job_id
+            if os.path.exists(self.path(job_id)):
+                self._jobs[job_id] = {"status": STATUS_READY, "error": None}
+                self._touch(job_id)
+                return job_id
+            self._jobs[job_id] = {"status": STATUS_PENDING, "error": None}
+            self._finished.pop(job_id, None)
+
+        self._executor.submit(self._render, job_id, successed, failed)
+        return job_id
+
+    def status(self, job_id: str) -> Optional[Dict]:
+        """İşin durumu, bilinmeyen id için None"""
+        if not JOB_ID_PATTERN.match(job_id):
+            return None
+        self._maybe_prune()
+        with self._lock:
+            job = self._jobs.get(job_id)
+        if job is not None:
+            return dict(job)
+        # sunucu yeniden başlatıldıysa diskteki dosya hâlâ geçerli
+        if os.path.exists(self.path(job_id)):
+            return {"status": STATUS_READY, "error": None}
+        return None
+
+    def _touch(self, job_id: str):
+        """Kilit altında çağrılır. Tekrar istenen export'un süresini yeniler"""
+        now = time.time()
+        self._finished[job_id] = now
+        try:
+            os.utime(self.path(job_id), (now, now))
+        except FileNotFoundError:
+            pass
+
+    def _maybe_prune(self):
+        if time.monotonic() - self._last_prune < min(PRUNE_INTERVAL, self.ttl):
+            return
+        self._last_prune = time.monotonic()
+        self.prune()
+
+    def prune(self) -> int:
+        """
+        Süresi dolan export'ların kaydını ve dosyasını siler. Kaydı olmayan (önceki çalışmadan kalan)
+        dosyalar değiştirilme zamanına göre silinir
+
+        Returns:
+            Silinen dosya sayısı
+        """
+        cutoff = time.time() - self.ttl
+        with self._lock:
+            for job_id, finished_at in list(self._finished.items()):
+                if finished_at < cutoff:
+                    del self._finished[job_id]
+                    self._jobs.pop(job_id, None)
+            pending = {job_id for job_id, job in self._jobs.items() if job["status"] == STATUS_PENDING}
+
+        removed = 0
+        for entry in os.scandir(self.directory):
+            job_id = entry.name.split(".", 1)[0]
+            if not JOB_ID_PATTERN.match(job_id) or job_id in pending:
+                continue
+            try:
+                if entry.stat().st_mtime < cutoff:
+                    os.remove(entry.path)
+                    removed += 1
+            except FileNotFoundError:
+                pass
+        if removed:
+            logging.info(f"Pruned {removed} expired exports")
+        return removed
+
+    def _render(self, job_id: str, successed: List[Product], failed: List[Product]):
+        try:
+            from supplier_scrape_core.savers import SaverLikeIkasTemplate
+            from supplier_scrape_core.config.config import STATIC_VALUES
+
+            saver = SaverLikeIkasTemplate()
+            filled_frame_successed = saver.fill(successed,STATIC_VALUES)
+            filled_frame_failed = saver.fill(failed,STATIC_VALUES)
+            output = saver.convert_io_output(filled_frame_successed,filled_frame_failed)
+
+            # okuyan istek yarım dosya görmesin
+            tmp_path = self.path(job_id) + ".tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(output.getbuffer())
+            os.replace(tmp_path, self.path(job_id))
+
+            with self._lock:
+                self._jobs[job_id] = {"status": STATUS_READY, "error": None}
+                self._finished[job_id] = time.time()
+            logging.info(f"Export ready: {job_id}")
+        except Exception as e:
+            logging.error(f"Export fail {job_id}: {e}")
+            with self._lock:
+                self._jobs[job_id] = {"status": STATUS_FAILED, "error": str(e)}
+                self._finished[job_id] = time.time()
@@ -0,0 +1,216 @@
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+from itertools import islice
+from typing import Callable, Deque, Dict, Iterable, Iterator, List, Optional, Tuple
+import threading
+import time
+from supplier_scrape_core.metrics import Histogram, DEFAULT_BUCKETS
+from supplier_scrape_core.structers.product import PreState
+
+"""
+/fetch-products için öncelik sınıflı, istemci bazında adil scrape zamanlayıcısı.
+Aynı anda en fazla `slots` batch çekilir. Boşalan slot önce interactive sınıfına, o sınıfta da
+istemciler arasında sırayla (round-robin) verilir; bulk işler kalan kapasiteyi kullanır.
+İstekler parçalar halinde (interactive interactive_max_codes, bulk bulk_chunk kodluk) ayrı ayrı slot alır,
+böylece gelen küçük bir interaktif istek en fazla bir parça süresi bekler ve interactive işaretli büyük
+bir liste slotu bitene kadar tutamaz. İşi kendisi worker'lara dağıtan fetch'ler (kuyruk modundaki Coordinator)
+chunked=False ile tüm listeyi tek slotta alır; parçalar sırayla verilse kuyrukta tek görev olur, worker'lar boş kalır.
+"""
+
+PRIORITY_INTERACTIVE = "interactive"
+PRIORITY_BULK = "bulk"
+# önce gelen sınıf önce servis edilir
+PRIORITIES = (PRIORITY_INTERACTIVE, PRIORITY_BULK)
+
+
+class _Waiter:
+    __slots__ = ("event", "enqueued_at")
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.enqueued_at = time.monotonic()
+
+
+class FairScheduler:
+    """Slot sayısı sınırlı, sınıf öncelikli ve istemci bazında round-robin kuyruk"""
+
+    def __init__(self, slots: int = 4, interactive_max_codes: int = 20, bulk_chunk: int = 50):
+        """
+        Args:
+            slots: Aynı anda çalışabilecek en fazla batch
+            interactive_max_codes: Öncelik belirtilmemiş isteklerde bu kadar ve daha az kod interactive sayılır
+            bulk_chunk: Bulk isteklerin slot başına çekilecek kod sayısı
+        """
+        self.slots = slots
+        self.interactive_max_codes = interactive_max_codes
+        self.bulk_chunk = bulk_chunk
+        self._lock = threading.Lock()
+        self._free = slots
+        # öncelik -> istemci -> bekleyenler. Servis edilen istemci sona alınır
+        self._queues: Dict[str, "OrderedDict[str, Deque[_Waiter]]"] = {p: OrderedDict() for p in PRIORITIES}
+        self._waits = {p: Histogram(DEFAULT_BUCKETS + (60.0, 120.0)) for p in PRIORITIES}
+
+    def classify(self, requested: Optional[str], codes: int) -> str:
+        """İstenen sınıf geçerliyse o, değilse kod sayısına göre"""
+        if requested and requested.lower() in PRIORITIES:
+            return requested.lower()
+        return PRIORITY_INTERACTIVE if codes <= self.interactive_max_codes else PRIORITY_BULK
+
+    def chunk_size(self, priority: str) -> int:
+        """Sınıfın slot başına çekeceği kod sayısı"""
+        size = self.interactive_max_codes if priority == PRIORITY_INTERACTIVE else self.bulk_chunk
+        return max(size, 1)
+
+    def _waiting(self) -> int:
+        return sum(len(waiters) for queue in self._queues.values() for waiters in queue.values())
+
+    def _next(self) -> Optional[_Waiter]:
+        for priority in PRIORITIES:
+            queue = self._queues[priority]
+            if not queue:
+                continue
+            client, waiters = queue.popitem(last=False)
+            waiter = waiters.popleft()
+            if waiters:
+                queue[client] = waiters
+            return waiter
+        return None
+
+    def _release(self):
+        with self._lock:
+            waiter = self._next()
+            if waiter is None:
+                self._free += 1
+        # slot doğrudan bekleyene devredilir
+        if waiter is not None:
+            waiter.event.set()
+
+    def _acquire(self, client: str, priority: str, deadline: Optional[float]) -> Optional[float]:
+        """Slot alınırsa beklenen süre, deadline'a kadar alınamazsa None"""
+        waiter = None
+        with self._lock:
+            if self._free > 0 and not self._waiting():
+                self._free -= 1
+            else:
+                waiter = _Waiter()
+                self._queues[priority].setdefault(client, deque()).append(waiter)
+
+        acquired = True
+        if waiter is not None:
+            timeout = None if deadline is None else max(deadline - time.monotonic(), 0.0)
+            if not waiter.event.wait(timeout):
+                with self._lock:
+                    waiters = self._queues[priority].get(client)
+                    # sırada hala duruyorsa vazgeç; çıkarılmışsa slot devredilmek üzere, onu al
+                    if waiters is not None and waiter in waiters:
+                        waiters.remove(waiter)
+                        if not waiters:
+                            del self._queues[priority][client]
+                        acquired = False
+                if acquired:
+                    waiter.event.wait()
+        waited = time.monotonic() - waiter.enqueued_at if waiter is not None else 0.0
+        with self._lock:
+            self._waits[priority].observe(waited)
+        return waited if acquired else None
+
+    @contextmanager
+    def slot(self, client: str, priority: str, deadline: Optional[float] = None):
+        """
+        Slot alınana kadar bekler. Yield edilen değer kuyrukta beklenen süredir (saniye),
+        deadline'a (time.monotonic()) kadar slot alınamazsa None
+        """
+        waited = self._acquire(client, priority, deadline)
+        if waited is None:
+            yield None
+            return
+        try:
+            yield waited
+        finally:
+            self._release()
+
+    def run(self, fetch: Callable[[List[PreState]], Tuple[list, list]], prestates: List[PreState],
+            client: str, priority: str, deadline: Optional[float] = None, chunked: bool = True) -> Tuple[list, list]:
+        """
+        fetch'i slot içinde çalıştırır. Her chunk_size'lık parça ayrı slot alır
+
+        Args:
+            fetch: Kod listesi -> (başarılı ürünler, başarısız ürünler), ör. Processer.get_with_code
+            prestates: Çekilecek kodlar
+            client: Adil sıralama için istemci kimliği
+            priority: PRIORITIES içinden sınıf
+            deadline: time.monotonic() cinsinden son an. Geçince kalan parçalar başlatılmaz, sonuçta yer almazlar
+            chunked: False ise tüm liste tek slotta tek fetch çağrısıyla verilir
+        """
+        size = self.chunk_size(priority) if chunked else max(len(prestates), 1)
+        products, failed_products = [], []
+        for i in range(0, len(prestates), size):
+            if deadline is not None and time.monotonic() >= deadline:
+                break
+            with self.slot(client, priority, deadline) as waited:
+                if waited is None:
+                    break
+                ok, bad = fetch(prestates[i:i + size])
+            products.extend(ok)
+            failed_products.extend(bad)
+        return products, failed_products
+
+    def iter_run(self, iter_fetch: Callable[[List[PreState]], Iterator], prestates: Iterable[PreState],
+                 client: str, priority: str, deadline: Optional[float] = None) -> Iterator:
+        """
+        run'ın akış hali, iter_fetch'in (ör. Processer.iter_with_code) sonuçları geldikçe yield edilir.
+        prestates generator olabilir, parça parça okunur. Slot parça tüketilene kadar tutulur, yavaş okuyan
+        istemci kendi slotunu bekletir
+        """
+        size = self.chunk_size(priority)
+        prestates = iter(prestates)
+        while True:
+            if deadline is not None and time.monotonic() >= deadline:
+                return
+            chunk = list(islice(prestates, size))
+            if not chunk:
+                return
+            with self.slot(client, priority, deadline) as waited:
+                if waited is None:
+                    return
+                yield from iter_fetch(chunk)
+
+    def snapshot(self) -> Dict[str, Dict]:
+        """/metrics?format=json ile aynı biçimde, "queue_wait/sınıf" anahtarlı özet"""
+        with self._lock:
+            waiting = {p: sum(len(w) for w in self._queues[p].values()) for p in PRIORITIES}
+            return {
+                f"queue_wait/{priority}": {
+                    "count": histogram.count,
+                    "waiting": waiting[priority],
+                    "total_s": round(histogram.sum, 4),
+                    "mean_ms": round(histogram.sum / histogram.count * 1000, 2) if histogram.count else 0.0,
+                    "p95_ms": round(histogram.quantile(0.95) * 1000, 2),
+                    "max_ms": round(histogram.max * 1000, 2),
+                }
+                for priority, histogram in self._waits.items()
+            }
+
+    def render_prometheus(self) -> str:
+        name = "scrape_queue_wait_seconds"
+        lines = [
+            f"# HELP {name} Time a batch waited for a scrape slot, per priority class",
+            f"# TYPE {name} histogram",
+        ]
+        with self._lock:
+            for priority, histogram in self._waits.items():
+                labels = f'priority="{priority}"'
+                cumulative = 0
+                for bound, n in zip(histogram.buckets, histogram.counts):
+                    cumulative += n
+                    lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+                lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {histogram.count}')
+                lines.append(f"{name}_sum{{{labels}}} {histogram.sum:.6f}")
+                lines.append(f"{name}_count{{{labels}}} {histogram.count}")
+            lines.append("# TYPE scrape_queue_waiting gauge")
+            for priority in PRIORITIES:
+                waiting = sum(len(w) for w in self._queues[priority].values())
+                lines.append(f'scrape_queue_waiting{{priority="{priority}"}} {waiting}')
+            lines.append("# TYPE scrape_slots_free gauge")
+            lines.append(f"scrape_slots_free {self._free}")
+        return "\n".join(lines) + "\n"
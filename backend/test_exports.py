@@ -0,0 +1,79 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import tempfile
+import time
+import unittest
+
+from backend.exports import ExportStore, STATUS_READY
+from supplier_scrape_core.structers.product import Product, Suppliers
+
+"""
+Export deposunun süresi dolan iş kayıtlarını ve dosyalarını silmesi.
+
+    python -m unittest backend.test_exports
+"""
+
+
+def wait_ready(store: ExportStore, job_id: str, timeout: float = 30):
+    end = time.monotonic() + timeout
+    while store.status(job_id)["status"] != STATUS_READY:
+        if time.monotonic() > end:
+            raise AssertionError(f"export not ready: {store.status(job_id)}")
+        time.sleep(0.05)
+
+
+class ExportPruneTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.store = ExportStore(self.tmp.name, max_workers=1, ttl=60)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def submit(self, code: int) -> str:
+        job_id = self.store.submit([Product(urun_kodu=code, urun_ismi="body", marka=Suppliers.BALGUNES)], [])
+        wait_ready(self.store, job_id)
+        return job_id
+
+    def age(self, job_id: str, seconds: float):
+        """Dosyayı ve kaydı seconds kadar eskitir"""
+        past = time.time() - seconds
+        os.utime(self.store.path(job_id), (past, past))
+        self.store._finished[job_id] = past
+
+    def test_expired_export_removed(self):
+        old, fresh = self.submit(1001), self.submit(1002)
+        self.age(old, 120)
+
+        self.assertEqual(self.store.prune(), 1)
+        self.assertFalse(os.path.exists(self.store.path(old)))
+        self.assertIsNone(self.store.status(old))
+        self.assertEqual(self.store.status(fresh)["status"], STATUS_READY)
+
+    def test_leftover_file_from_previous_run_removed(self):
+        job_id = "a" * 64
+        with open(self.store.path(job_id), "wb") as f:
+            f.write(b"xlsx")
+        past = time.time() - 120
+        os.utime(self.store.path(job_id), (past, past))
+        with open(os.path.join(self.tmp.name, "notes.txt"), "w") as f:
+            f.write("keep")
+        os.utime(os.path.join(self.tmp.name, "notes.txt"), (past, past))
+
+        self.assertEqual(self.store.prune(), 1)
+        self.assertEqual(os.listdir(self.tmp.name), ["notes.txt"])
+
+    def test_resubmit_renews_ttl(self):
+        job_id = self.submit(1003)
+        self.age(job_id, 50)
+        # aynı içerik tekrar istenince süre yenilenir
+        self.assertEqual(self.submit(1003), job_id)
+        self.store.ttl = 30
+        self.assertEqual(self.store.prune(), 0)
+        self.assertTrue(os.path.exists(self.store.path(job_id)))
+
+
+if __name__ == "__main__":
+    unittest.main()
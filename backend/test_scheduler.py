@@ -0,0 +1,121 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import threading
+import time
+import unittest
+
+from backend.scheduler import FairScheduler, PRIORITY_BULK, PRIORITY_INTERACTIVE
+from supplier_scrape_core.structers.product import PreState
+
+"""
+Ağa çıkmadan, fetch yerine kaydeden sahte fonksiyonla zamanlayıcı sırası.
+
+    python -m unittest backend.test_scheduler
+"""
+
+
+def prestates(count: int, start: int = 1000):
+    return [PreState(start + i, 10, 1) for i in range(count)]
+
+
+def wait_until(predicate, timeout: float = 5.0):
+    end = time.monotonic() + timeout
+    while not predicate():
+        if time.monotonic() > end:
+            raise AssertionError("condition not reached")
+        time.sleep(0.005)
+
+
+class Recorder:
+    """Her parçayı (etiket, kod sayısı) olarak kaydeder, gate set edilene kadar bekletir"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.calls = []
+        self.gate = threading.Event()
+
+    def fetch(self, label: str):
+        def _fetch(chunk):
+            with self.lock:
+                self.calls.append((label, len(chunk)))
+            self.gate.wait(5)
+            return list(chunk), []
+        return _fetch
+
+
+class ClassifyTest(unittest.TestCase):
+
+    def test_size_decides_without_header(self):
+        scheduler = FairScheduler(interactive_max_codes=20)
+        self.assertEqual(scheduler.classify(None, 20), PRIORITY_INTERACTIVE)
+        self.assertEqual(scheduler.classify(None, 5000), PRIORITY_BULK)
+        self.assertEqual(scheduler.classify("BULK", 3), PRIORITY_BULK)
+        self.assertEqual(scheduler.classify("unknown", 3), PRIORITY_INTERACTIVE)
+
+
+class FairSchedulerTest(unittest.TestCase):
+
+    def test_large_interactive_batch_is_chunked(self):
+        scheduler = FairScheduler(slots=1, interactive_max_codes=20, bulk_chunk=50)
+        recorder = Recorder()
+        recorder.gate.set()
+        ok, bad = scheduler.run(recorder.fetch("gui"), prestates(45), "gui", PRIORITY_INTERACTIVE)
+
+        self.assertEqual(len(ok), 45)
+        self.assertEqual([n for _, n in recorder.calls], [20, 20, 5])
+
+    def test_unchunked_batch_runs_in_one_slot(self):
+        # kuyruk modunda Coordinator tüm listeyi alır ve görevleri worker'lara kendisi dağıtır
+        scheduler = FairScheduler(slots=1, interactive_max_codes=20, bulk_chunk=50)
+        recorder = Recorder()
+        recorder.gate.set()
+        ok, bad = scheduler.run(recorder.fetch("queue"), prestates(230), "batch", PRIORITY_BULK, chunked=False)
+
+        self.assertEqual(len(ok), 230)
+        self.assertEqual(recorder.calls, [("queue", 230)])
+
+    def test_large_interactive_batch_does_not_hold_slot(self):
+        scheduler = FairScheduler(slots=1, interactive_max_codes=20, bulk_chunk=50)
+        recorder = Recorder()
+        results = {}
+
+        def run(label, count, priority):
+            results[label] = scheduler.run(recorder.fetch(label), prestates(count), label, priority)
+
+        # büyük interactive liste slotu alır, ilk parçası çekilirken başka bir istemci kuyruğa girer
+        big = threading.Thread(target=run, args=("paste", 100, PRIORITY_INTERACTIVE))
+        big.start()
+        wait_until(lambda: len(recorder.calls) == 1)
+        small = threading.Thread(target=run, args=("operator", 3, PRIORITY_INTERACTIVE))
+        small.start()
+        wait_until(lambda: scheduler.snapshot()[f"queue_wait/{PRIORITY_INTERACTIVE}"]["waiting"] == 1)
+        recorder.gate.set()
+        big.join(5)
+        small.join(5)
+
+        # küçük istek büyük listenin sonunu değil, ilk parçasının bitişini bekler
+        self.assertEqual(recorder.calls, [("paste", 20), ("operator", 3)] + [("paste", 20)] * 4)
+        self.assertEqual(len(results["paste"][0]), 100)
+        self.assertEqual(len(results["operator"][0]), 3)
+
+    def test_interactive_served_before_bulk(self):
+        scheduler = FairScheduler(slots=1, interactive_max_codes=20, bulk_chunk=10)
+        recorder = Recorder()
+
+        bulk = threading.Thread(target=scheduler.run, args=(recorder.fetch("bulk"), prestates(30), "batch", PRIORITY_BULK))
+        bulk.start()
+        wait_until(lambda: len(recorder.calls) == 1)
+        interactive = threading.Thread(
+            target=scheduler.run, args=(recorder.fetch("gui"), prestates(5), "gui", PRIORITY_INTERACTIVE))
+        interactive.start()
+        wait_until(lambda: scheduler.snapshot()[f"queue_wait/{PRIORITY_INTERACTIVE}"]["waiting"] == 1)
+        recorder.gate.set()
+        bulk.join(5)
+        interactive.join(5)
+
+        self.assertEqual([label for label, _ in recorder.calls], ["bulk", "gui", "bulk", "bulk"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,120 @@
+import sys
+import os
+from typing import Dict, List, Optional
+import argparse
+import json
+import subprocess
+import tempfile
+
+"""
+Giriş noktalarının soğuk import süresi.
+Her modül temiz bir `python -X importtime` process'inde import edilir; toplam süre, en ağır modüller
+ve erken yüklenmemesi gereken ağır bağımlılıklar (pandas, openpyxl, bs4, requests) raporlanır.
+
+    python benchmarks/importtime.py
+    python benchmarks/importtime.py --check   # hedef aşılırsa çıkış kodu 1
+"""
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+# giriş noktası -> (modül, hedef ms, import anında yüklenmemesi gerekenler)
+ENTRY_POINTS = {
+    "cli": ("main", 150, ("pandas", "openpyxl", "bs4", "requests")),
+    "core": ("supplier_scrape_core.processer", 50, ("pandas", "openpyxl", "bs4", "requests")),
+    "server": ("backend.app", 400, ("pandas", "openpyxl", "bs4", "requests")),
+    "client": ("backend.client", 250, ("pandas", "openpyxl", "bs4")),
+    "gui": ("frontend.desktop.gui", 300, ("pandas", "openpyxl", "bs4", "requests")),
+}
+
+
+def measure(module: str, python: str = sys.executable) -> Dict:
+    """
+    Modülü yeni bir process'te import eder ve -X importtime çıktısını ayrıştırır
+
+    Returns:
+        {"total_ms", "modules": {ad: cumulative_ms}, "top": [(ad, self_ms)], "error"}
+    """
+    env = dict(os.environ, QT_QPA_PLATFORM=os.environ.get("QT_QPA_PLATFORM", "offscreen"),
+               PYTHONPATH=ROOT + os.pathsep + os.environ.get("PYTHONPATH", ""))
+    # backend import'ta cache / export dizinleri oluşturduğu için ayrı dizinde çalıştır
+    with tempfile.TemporaryDirectory() as cwd:
+        process = subprocess.run(
+            [python, "-X", "importtime", "-c", f"import {module}"],
+            cwd=cwd, env=env, capture_output=True, text=True
+        )
+
+    modules, selfs = {}, []
+    for line in process.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        fields = line[len("import time:"):].split("|")
+        try:
+            self_us, cumulative_us = int(fields[0]), int(fields[1])
+        except ValueError:
+            continue
+        name = fields[2].strip()
+        modules[name] = cumulative_us / 1000
+        selfs.append((name, self_us / 1000))
+
+    error = None
+    if process.returncode != 0:
+        error = process.stderr.strip().splitlines()[-1] if process.stderr.strip() else f"exit {process.returncode}"
+
+    return {
+        "total_ms": round(modules.get(module, 0.0), 1),
+        "modules": modules,
+        "top": sorted(selfs, key=lambda x: x[1], reverse=True)[:10],
+        "error": error,
+    }
+
+
+def run(entries: List[str], python: str) -> Dict[str, Dict]:
+    results = {}
+    for entry in entries:
+        module, target_ms, forbidden = ENTRY_POINTS[entry]
+        result = measure(module, python)
+        loaded = [name for name in forbidden if name in result["modules"]]
+        results[entry] = {
+            "module": module,
+            "total_ms": result["total_ms"],
+            "target_ms": target_ms,
+            "eager_heavy_imports": loaded,
+            "top_self_ms": [(name, round(ms, 1)) for name, ms in result["top"]],
+            "error": result["error"],
+            "ok": result["error"] is None and result["total_ms"] <= target_ms and not loaded,
+        }
+    return results
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Giriş noktalarının import süresi")
+    parser.add_argument("entries", nargs="*", help=f"Ölçülecek giriş noktaları: {', '.join(ENTRY_POINTS)} (varsayılan hepsi)")
+    parser.add_argument("--python", default=sys.executable, help="Ölçümde kullanılacak yorumlayıcı")
+    parser.add_argument("--json", action="store_true", help="Sonucu JSON olarak yazdır")
+    parser.add_argument("--check", action="store_true", help="Hedef aşılırsa 1 ile çık")
+    args = parser.parse_args(argv)
+    unknown = [entry for entry in args.entries if entry not in ENTRY_POINTS]
+    if unknown:
+        parser.error(f"unknown entry points: {', '.join(unknown)}")
+
+    results = run(args.entries or list(ENTRY_POINTS), args.python)
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        for entry, r in results.items():
+            status = "ok" if r["ok"] else "FAIL"
+            print(f"{entry:<7} {r['module']:<32} {r['total_ms']:>8.1f} ms  (target {r['target_ms']} ms)  {status}")
+            if r["error"]:
+                print(f"        error: {r['error']}")
+            if r["eager_heavy_imports"]:
+                print(f"        loaded at import: {', '.join(r['eager_heavy_imports'])}")
+            print("        heaviest: " + ", ".join(f"{name} {ms}" for name, ms in r["top_self_ms"][:5]))
+
+    if args.check and not all(r["ok"] for r in results.values()):
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,332 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from typing import Dict, List, Optional
+import argparse
+import datetime
+import json
+import logging
+import subprocess
+import time
+
+from benchmarks.stub_server import StubConfig, StubServer
+
+"""
+Tekrarlanabilir throughput ölçümü.
+Yerel sahte tedarikçi sunucusuna karşı Processer.get_with_code, Flask API ve saver'ları çalıştırır,
+sonuçları commit'ler arası karşılaştırma için JSON olarak yazar.
+
+    python benchmarks/run.py --codes 200 --latency 0.02
+    python benchmarks/run.py --compare benchmarks/results/a.json benchmarks/results/b.json
+"""
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+
+
+def percentiles(values: List[float]) -> Dict[str, float]:
+    """Süre listesinin (saniye) milisaniye cinsinden özet istatistikleri"""
+    if not values:
+        return {"count": 0}
+    ordered = sorted(values)
+
+    def pick(q: float) -> float:
+        return ordered[min(len(ordered) - 1, int(round(q * (len(ordered) - 1))))]
+
+    return {
+        "count": len(ordered),
+        "mean_ms": round(sum(ordered) / len(ordered) * 1000, 3),
+        "p50_ms": round(pick(0.50) * 1000, 3),
+        "p95_ms": round(pick(0.95) * 1000, 3),
+        "p99_ms": round(pick(0.99) * 1000, 3),
+        "max_ms": round(ordered[-1] * 1000, 3),
+    }
+
+
+def peak_rss_mb() -> Optional[float]:
+    try:
+        import resource
+    except ImportError:
+        return None
+    # linux'ta KB, macOS'ta byte
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(rss / 1024 / (1024 if sys.platform == "darwin" else 1), 1)
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True,
+                                       cwd=os.path.dirname(__file__)).strip()
+    except Exception:
+        return "unknown"
+
+
+def load_static_values() -> Dict:
+    try:
+        from supplier_scrape_core.config.config import STATIC_VALUES
+        return STATIC_VALUES
+    except ImportError:
+        logging.warning("supplier_scrape_core.config.config not found, static values are empty")
+        return {}
+
+
+def make_prestates(start: int, count: int):
+    from supplier_scrape_core.structers.product import PreState
+    return [PreState(start + i, 100 + i % 50, 1 + i % 12) for i in range(count)]
+
+
+def bench_processer(codes: int) -> Dict:
+    """Her tedarikçi için ayrı batch, kod başına geçen süre ölçülür. Önbellekler boş başlar"""
+    from supplier_scrape_core.processer import Processer
+    from supplier_scrape_core.cache import ProductCache, LinkIndex
+    from supplier_scrape_core.structers.product import Suppliers
+
+    processer = Processer(cache=ProductCache(), link_index=LinkIndex())
+    durations = []
+    products = []
+    successed = failed = 0
+
+    started = time.perf_counter()
+    for n, supplier in enumerate(Suppliers):
+        last = [time.perf_counter()]
+
+        def on_result(prestate, product, success):
+            now = time.perf_counter()
+            durations.append(now - last[0])
+            last[0] = now
+
+        ok, bad = processer.get_with_code(supplier, *make_prestates(100000 * (n + 1), codes), on_result=on_result)
+        products.extend(ok)
+        successed += len(ok)
+        failed += len(bad)
+    elapsed = time.perf_counter() - started
+
+    return {
+        "codes": successed + failed,
+        "successed": successed,
+        "failed": failed,
+        "seconds": round(elapsed, 3),
+        "codes_per_sec": round((successed + failed) / elapsed, 2) if elapsed else None,
+        "per_code": percentiles(durations),
+    }, products
+
+
+def bench_api(codes: int, chunk_size: int) -> Dict:
+    """Flask uygulamasını test client'ı ile, parça parça /fetch-products istekleriyle ölçer"""
+    from backend.app import app
+    from supplier_scrape_core.structers.product import Suppliers
+
+    client = app.test_client()
+    durations = []
+    total = 0
+    started = time.perf_counter()
+    for n, supplier in enumerate(Suppliers):
+        # processer aşamasından farklı kodlar, paylaşılan önbellekten dönmesin
+        prestates = make_prestates(500000 + 100000 * n, codes)
+        for i in range(0, len(prestates), chunk_size):
+            payload = {
+                "prestates": [dict(p) for p in prestates[i:i + chunk_size]],
+                "supplier": supplier.value["prefix"],
+            }
+            t = time.perf_counter()
+            response = client.post("/fetch-products", json=payload)
+            durations.append(time.perf_counter() - t)
+            if response.status_code != 200:
+                logging.error(f"API status {response.status_code}")
+            total += len(payload["prestates"])
+    elapsed = time.perf_counter() - started
+
+    return {
+        "codes": total,
+        "requests": len(durations),
+        "seconds": round(elapsed, 3),
+        "codes_per_sec": round(total / elapsed, 2) if elapsed else None,
+        "per_request": percentiles(durations),
+    }
+
+
+def bench_distributed(codes: int, workers: int, task_size: int) -> Dict:
+    """Aynı kodlar yerel worker process'leri ve SQLite kuyruğu üzerinden, her kodun bir kez sayıldığı kontrol edilir"""
+    import tempfile
+    from supplier_scrape_core.distributed import Coordinator, SQLiteTaskQueue, start_workers
+    from supplier_scrape_core.structers.product import Suppliers
+
+    with tempfile.TemporaryDirectory() as directory:
+        queue_path = os.path.join(directory, "tasks.db")
+        coordinator = Coordinator(SQLiteTaskQueue(queue_path), task_size=task_size, poll_interval=0.05)
+        processes, stop_event = start_workers(workers, queue_path, interval=0, idle_sleep=0.05)
+        try:
+            successed = failed = late = 0
+            exact = True
+            started = time.perf_counter()
+            for n, supplier in enumerate(Suppliers):
+                prestates = make_prestates(700000 + 100000 * n, codes)
+                report = {}
+                ok, bad = coordinator.get_with_code(supplier, *prestates, report=report)
+                successed += len(ok)
+                failed += len(bad)
+                late += report["late_results"]
+                exact = exact and len(ok) + len(bad) == len(prestates)
+            elapsed = time.perf_counter() - started
+        finally:
+            stop_event.set()
+            for process in processes:
+                process.join(10)
+
+    return {
+        "workers": workers,
+        "task_size": task_size,
+        "codes": successed + failed,
+        "successed": successed,
+        "failed": failed,
+        "late_results": late,
+        "exactly_once": exact,
+        "seconds": round(elapsed, 3),
+        "codes_per_sec": round((successed + failed) / elapsed, 2) if elapsed else None,
+    }
+
+
+def bench_first_byte(samples: int) -> Dict:
+    """Tedarikçi host'larına soğuk (yeni bağlantı, boş DNS önbelleği) ve sıcak ilk byte süresi"""
+    from supplier_scrape_core.connections import first_byte_report
+
+    return first_byte_report(samples=samples)
+
+
+def bench_savers(products, repeat: int) -> Dict:
+    """fill ve xlsx render sürelerini ölçer"""
+    from supplier_scrape_core.savers import SaverLikeIkasTemplate
+
+    static_values = load_static_values()
+    fill_durations, export_durations = [], []
+    size = 0
+    for _ in range(repeat):
+        saver = SaverLikeIkasTemplate()
+        t = time.perf_counter()
+        frame = saver.fill(products, static_values)
+        fill_durations.append(time.perf_counter() - t)
+
+        t = time.perf_counter()
+        output = saver.convert_io_output(frame)
+        export_durations.append(time.perf_counter() - t)
+        size = output.getbuffer().nbytes
+
+    return {
+        "products": len(products),
+        "xlsx_bytes": size,
+        "fill": percentiles(fill_durations),
+        "export": percentiles(export_durations),
+    }
+
+
+def run(args) -> Dict:
+    config = StubConfig(args.latency, args.jitter, args.error_rate, args.rate_429, args.missing_rate, seed=args.seed)
+    with StubServer(config) as server:
+        os.environ["SCRAPE_SUPPLIER_BASE_URL"] = server.base_url
+
+        stages = {}
+        stages["first_byte"] = bench_first_byte(args.repeat)
+        stages["processer"], products = bench_processer(args.codes)
+        if not args.skip_api:
+            stages["api"] = bench_api(args.codes, args.chunk_size)
+        if args.distributed:
+            stages["distributed"] = bench_distributed(args.codes, args.distributed, args.task_size)
+        if not args.skip_savers:
+            stages["savers"] = bench_savers(products, args.repeat)
+
+        stub_requests = dict(server.stats.counts)
+
+    from supplier_scrape_core.metrics import registry
+
+    return {
+        "commit": git_commit(),
+        "timestamp": datetime.datetime.now().isoformat(timespec="seconds"),
+        "python": sys.version.split()[0],
+        "config": {
+            "codes_per_supplier": args.codes,
+            "chunk_size": args.chunk_size,
+            "latency": args.latency,
+            "jitter": args.jitter,
+            "error_rate": args.error_rate,
+            "rate_429": args.rate_429,
+            "missing_rate": args.missing_rate,
+            "distributed_workers": args.distributed,
+        },
+        "stages": stages,
+        "stub_requests": stub_requests,
+        "stage_timings": registry.snapshot(),
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+def write_result(result: Dict, output: Optional[str]) -> str:
+    if output is None:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        stamp = result["timestamp"].replace(":", "").replace("-", "")
+        output = os.path.join(RESULTS_DIR, f"{stamp}_{result['commit']}.json")
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(result, f, indent=2, ensure_ascii=False)
+    return output
+
+
+def _flatten(prefix: str, value, out: Dict):
+    if isinstance(value, dict):
+        for k, v in value.items():
+            _flatten(f"{prefix}.{k}" if prefix else k, v, out)
+    elif isinstance(value, (int, float)) and not isinstance(value, bool):
+        out[prefix] = value
+
+
+def compare(old_path: str, new_path: str):
+    """İki sonuç dosyasındaki sayısal metrikleri yan yana yazdırır"""
+    with open(old_path, encoding="utf-8") as f:
+        old = json.load(f)
+    with open(new_path, encoding="utf-8") as f:
+        new = json.load(f)
+
+    old_flat, new_flat = {}, {}
+    _flatten("", {"stages": old["stages"], "peak_rss_mb": old.get("peak_rss_mb")}, old_flat)
+    _flatten("", {"stages": new["stages"], "peak_rss_mb": new.get("peak_rss_mb")}, new_flat)
+
+    print(f"{'metric':<45} {old['commit']:>12} {new['commit']:>12} {'change':>9}")
+    for key in sorted(set(old_flat) | set(new_flat)):
+        a, b = old_flat.get(key), new_flat.get(key)
+        change = f"{(b - a) / a * 100:+.1f}%" if a and b is not None else ""
+        print(f"{key:<45} {str(a):>12} {str(b):>12} {change:>9}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sahte tedarikçi sunucusuna karşı throughput ölçümü")
+    parser.add_argument("--codes", type=int, default=100, help="Tedarikçi başına kod sayısı")
+    parser.add_argument("--chunk-size", type=int, default=50, help="API isteği başına kod sayısı")
+    parser.add_argument("--repeat", type=int, default=3, help="Saver ölçüm tekrarı")
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rate-429", type=float, default=0.0)
+    parser.add_argument("--missing-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--skip-api", action="store_true")
+    parser.add_argument("--skip-savers", action="store_true")
+    parser.add_argument("--distributed", type=int, default=0, help="Verilirse bu kadar yerel worker process'iyle kuyruk üzerinden ölç")
+    parser.add_argument("--task-size", type=int, default=25, help="--distributed ile görev başına kod sayısı")
+    parser.add_argument("--output", help="Sonuç dosyası, verilmezse benchmarks/results altına yazılır")
+    parser.add_argument("--compare", nargs=2, metavar=("OLD", "NEW"), help="İki sonuç dosyasını karşılaştır")
+    args = parser.parse_args()
+
+    if args.compare:
+        compare(*args.compare)
+        return
+
+    # scrape logları ölçümü bozmasın, backend import'u da aynı seviyeyi kullanır
+    os.environ.setdefault("SCRAPE_LOG_LEVEL", "WARNING")
+    from supplier_scrape_core.logs import setup_logging
+    setup_logging()
+
+    result = run(args)
+    path = write_result(result, args.output)
+    print(json.dumps(result, indent=2, ensure_ascii=False))
+    print(f"Saved: {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,313 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional
+from urllib.parse import urlsplit, parse_qs
+import argparse
+import gzip
+import logging
+import random
+import re
+import threading
+import time
+
+"""
+Tedarikçi sitelerinin (BALGUNES / BABEXI / MALKOC) kayıtlı arama ve ürün sayfalarını
+yerelde yeniden oynatan sahte sunucu. Gecikme, hata oranı ve 429 yanıtları ayarlanabilir.
+
+Processer'ı bu sunucuya yönlendirmek için:
+    SCRAPE_SUPPLIER_BASE_URL=http://127.0.0.1:8800
+"""
+
+FIXTURE_DIR = os.path.join(os.path.dirname(__file__), "fixtures")
+SUPPLIERS = ("balgunes", "babexi", "malkoc")
+
+SEARCH_PATH = re.compile(r"^/(?P<supplier>\w+)/urunler/arama$")
+PRODUCT_PATH = re.compile(r"^/(?P<supplier>\w+)/tr/product/urun-(?P<code>\d+)$")
+IMAGE_PATH = re.compile(r"^/(?P<supplier>\w+)/img/(?P<code>\d+)\.jpg$")
+HOME_PATH = re.compile(r"^/(?P<supplier>\w+)/?$")
+CATEGORY_PATH = re.compile(r"^/(?P<supplier>\w+)/tr/category/(?P<slug>[\w-]+?)--(?P<category>\d+)$")
+ROBOTS_PATH = re.compile(r"^/(?P<supplier>\w+)/robots\.txt$")
+SITEMAP_INDEX_PATH = re.compile(r"^/(?P<supplier>\w+)/sitemap\.xml$")
+SITEMAP_PATH = re.compile(r"^/(?P<supplier>\w+)/sitemap-products-(?P<part>\d+)\.xml\.gz$")
+CARD_BLOCK = re.compile(r"( *<div class=\"col-6 col-md-3\">.*?</div>\s*</div>\s*</div>)", re.S)
+
+# en küçük geçerli jpeg başlığı, görsel doğrulama için yeterli
+FAKE_JPEG = b"\xff\xd8\xff\xe0\x00\x10JFIF\x00\x01\x01\x00\x00\x01\x00\x01\x00\x00\xff\xd9"
+
+
+class StubConfig:
+    """Sahte sunucunun davranış ayarları"""
+
+    def __init__(self, latency: float = 0.0, jitter: float = 0.0, error_rate: float = 0.0,
+                 rate_429: float = 0.0, missing_rate: float = 0.0, seed: Optional[int] = None,
+                 category_pages: int = 3, page_size: int = 24, sitemap_parts: int = 2, sitemap_size: int = 100,
+                 sitemap_lastmod: str = "2024-01-01"):
+        """
+        Args:
+            latency: Her yanıt öncesi sabit gecikme (saniye)
+            jitter: Gecikmeye eklenecek rastgele en fazla süre (saniye)
+            error_rate: 500 dönen isteklerin oranı (0-1)
+            rate_429: 429 Too Many Requests dönen isteklerin oranı (0-1)
+            missing_rate: Aramada bulunamayan kodların oranı (0-1), kod bazında sabittir
+            seed: Rastgelelik tohumu
+            category_pages: Her kategori listesinin sayfa sayısı
+            page_size: Liste sayfası başına ürün kartı
+            sitemap_parts: Sitemap index'teki gzip'li ürün sitemap sayısı
+            sitemap_size: Ürün sitemap'i başına adres
+            sitemap_lastmod: Sitemap'teki ürünlerin lastmod değeri
+        """
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.rate_429 = rate_429
+        self.missing_rate = missing_rate
+        self.category_pages = category_pages
+        self.page_size = page_size
+        self.sitemap_parts = sitemap_parts
+        self.sitemap_size = sitemap_size
+        self.sitemap_lastmod = sitemap_lastmod
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+
+    def roll(self) -> float:
+        with self.lock:
+            return self.random.random()
+
+
+class StubStats:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.counts: Dict[str, int] = {}
+
+    def add(self, key: str):
+        with self.lock:
+            self.counts[key] = self.counts.get(key, 0) + 1
+
+
+def load_fixtures() -> Dict[str, Dict[str, str]]:
+    fixtures = {}
+    for supplier in SUPPLIERS:
+        fixtures[supplier] = {}
+        for name in ("search", "search_empty", "product", "category"):
+            with open(os.path.join(FIXTURE_DIR, supplier, f"{name}.html"), encoding="utf-8") as f:
+                fixtures[supplier][name] = f.read()
+        # liste sayfaları arama sonucundaki kart şablonuyla üretilir
+        fixtures[supplier]["card"] = CARD_BLOCK.search(fixtures[supplier]["search"]).group(1)
+    return fixtures
+
+
+def category_code(category: int, page: int, position: int, page_size: int) -> int:
+    """Liste sayfasındaki karta karşılık gelen sabit ürün kodu"""
+    return 800000 + category * 10000 + (page - 1) * page_size + position
+
+
+def sitemap_code(part: int, position: int, size: int) -> int:
+    """Ürün sitemap'indeki adrese karşılık gelen sabit ürün kodu"""
+    return 900000 + part * size + position
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # başlık ve gövde ayrı yazılıyor; Nagle açıkken keep-alive bağlantıda her cevap istemcinin gecikmeli ACK'ini (~40ms) bekler
+    disable_nagle_algorithm = True
+    # server tarafından atanır
+    config: StubConfig = None
+    fixtures: Dict[str, Dict[str, str]] = None
+    stats: StubStats = None
+
+    def log_message(self, format, *args):
+        logging.debug("stub: " + format, *args)
+
+    def _send(self, status: int, body: bytes, content_type: str = "text/html; charset=utf-8", headers: Optional[Dict] = None):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(body)
+
+    def _render(self, supplier: str, name: str, code: str) -> bytes:
+        base = f"http://{self.headers.get('Host')}/{supplier}"
+        html = self.fixtures[supplier][name]
+        return html.replace("__BASE__", base).replace("__CODE__", code).encode("utf-8")
+
+    def _render_category(self, supplier: str, slug: str, category: int, page: int) -> bytes:
+        base = f"http://{self.headers.get('Host')}/{supplier}"
+        config = self.config
+        cards = []
+        if 1 <= page <= config.category_pages:
+            card = self.fixtures[supplier]["card"]
+            for position in range(config.page_size):
+                code = str(category_code(category, page, position, config.page_size))
+                cards.append(card.replace("__CODE__", code))
+        pagination = ""
+        if page < config.category_pages:
+            pagination = (
+                '        <ul class="pagination"><li class="page-item next">'
+                f'<a class="page-link" rel="next" href="?page={page + 1}">Sonraki</a></li></ul>'
+            )
+        html = (self.fixtures[supplier]["category"]
+                .replace("__CARDS__", "\n".join(cards))
+                .replace("__PAGINATION__", pagination)
+                .replace("__CATEGORY__", slug.replace("-", " ").title()))
+        return html.replace("__BASE__", base).encode("utf-8")
+
+    def _render_sitemap(self, supplier: str, part: Optional[int] = None) -> bytes:
+        base = f"http://{self.headers.get('Host')}/{supplier}"
+        config = self.config
+        lines = ['<?xml version="1.0" encoding="UTF-8"?>']
+        if part is None:
+            lines.append('<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">')
+            for n in range(config.sitemap_parts):
+                lines.append(f"<sitemap><loc>{base}/sitemap-products-{n}.xml.gz</loc></sitemap>")
+            lines.append("</sitemapindex>")
+        else:
+            lines.append('<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">')
+            if 0 <= part < config.sitemap_parts:
+                for position in range(config.sitemap_size):
+                    code = sitemap_code(part, position, config.sitemap_size)
+                    lines.append(f"<url><loc>{base}/tr/product/urun-{code}</loc>"
+                                 f"<lastmod>{config.sitemap_lastmod}</lastmod></url>")
+            lines.append("</urlset>")
+        return "\n".join(lines).encode("utf-8")
+
+    def _is_missing(self, code: str) -> bool:
+        # aynı kod her seferinde aynı sonucu versin
+        return self.config.missing_rate > 0 and random.Random(code).random() < self.config.missing_rate
+
+    def do_HEAD(self):
+        self.do_GET()
+
+    def do_GET(self):
+        config = self.config
+        delay = config.latency + (config.roll() * config.jitter if config.jitter else 0)
+        if delay:
+            time.sleep(delay)
+
+        if config.rate_429 and config.roll() < config.rate_429:
+            self.stats.add("429")
+            return self._send(429, b"Too Many Requests", "text/plain", {"Retry-After": "0"})
+        if config.error_rate and config.roll() < config.error_rate:
+            self.stats.add("500")
+            return self._send(500, b"Internal Server Error", "text/plain")
+
+        parts = urlsplit(self.path)
+
+        match = SEARCH_PATH.match(parts.path)
+        if match and match["supplier"] in self.fixtures:
+            code = parse_qs(parts.query).get("q", [""])[0]
+            self.stats.add("search")
+            page = "search_empty" if not code.isdigit() or self._is_missing(code) else "search"
+            return self._send(200, self._render(match["supplier"], page, code))
+
+        match = PRODUCT_PATH.match(parts.path)
+        if match and match["supplier"] in self.fixtures:
+            self.stats.add("product")
+            return self._send(200, self._render(match["supplier"], "product", match["code"]))
+
+        match = CATEGORY_PATH.match(parts.path)
+        if match and match["supplier"] in self.fixtures:
+            self.stats.add("category")
+            page = parse_qs(parts.query).get("page", ["1"])[0]
+            page = int(page) if page.isdigit() else 1
+            return self._send(200, self._render_category(match["supplier"], match["slug"], int(match["category"]), page))
+
+        match = ROBOTS_PATH.match(parts.path)
+        if match and match["supplier"] in self.fixtures:
+            self.stats.add("robots")
+            base = f"http://{self.headers.get('Host')}/{match['supplier']}"
+            return self._send(200, f"User-agent: *\nSitemap: {base}/sitemap.xml\n".encode("utf-8"), "text/plain")
+
+        match = SITEMAP_INDEX_PATH.match(parts.path)
+        if match and match["supplier"] in self.fixtures:
+            self.stats.add("sitemap")
+            return self._send(200, self._render_sitemap(match["supplier"]), "application/xml")
+
+        match = SITEMAP_PATH.match(parts.path)
+        if match and match["supplier"] in self.fixtures:
+            self.stats.add("sitemap")
+            body = gzip.compress(self._render_sitemap(match["supplier"], int(match["part"])))
+            return self._send(200, body, "application/x-gzip")
+
+        match = HOME_PATH.match(parts.path)
+        if match and match["supplier"] in self.fixtures:
+            self.stats.add("home")
+            return self._send(200, self._render(match["supplier"], "search_empty", ""))
+
+        match = IMAGE_PATH.match(parts.path)
+        if match:
+            self.stats.add("image")
+            return self._send(200, FAKE_JPEG, "image/jpeg")
+
+        self.stats.add("404")
+        return self._send(404, b"Not Found", "text/plain")
+
+
+class StubServer:
+    """Arka plan thread'inde çalışan sahte tedarikçi sunucusu"""
+
+    def __init__(self, config: Optional[StubConfig] = None, host: str = "127.0.0.1", port: int = 0):
+        handler = type("BoundStubHandler", (StubHandler,), {
+            "config": config or StubConfig(),
+            "fixtures": load_fixtures(),
+            "stats": StubStats(),
+        })
+        self.httpd = ThreadingHTTPServer((host, port), handler)
+        self.httpd.daemon_threads = True
+        self.stats = handler.stats
+        self._thread = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "StubServer":
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sahte tedarikçi sunucusu")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8800)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rate-429", type=float, default=0.0)
+    parser.add_argument("--missing-rate", type=float, default=0.0)
+    parser.add_argument("--category-pages", type=int, default=3)
+    parser.add_argument("--page-size", type=int, default=24)
+    parser.add_argument("--sitemap-parts", type=int, default=2)
+    parser.add_argument("--sitemap-size", type=int, default=100)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+    config = StubConfig(args.latency, args.jitter, args.error_rate, args.rate_429, args.missing_rate,
+                        category_pages=args.category_pages, page_size=args.page_size,
+                        sitemap_parts=args.sitemap_parts, sitemap_size=args.sitemap_size)
+    server = StubServer(config, args.host, args.port)
+    logging.info(f"Stub supplier server on {server.base_url} (SCRAPE_SUPPLIER_BASE_URL={server.base_url})")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
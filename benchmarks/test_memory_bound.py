@@ -0,0 +1,185 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from typing import Iterator
+import io
+import json
+import shutil
+import tempfile
+import threading
+import unittest
+
+from benchmarks.stub_server import StubConfig, StubServer
+
+"""
+Büyük batch'lerin akış (iter_with_code) yolunda bellek kullanımının batch boyutuyla büyümediğini kontrol eder.
+Sahte tedarikçi sunucusuna karşı binlerce kod çekildiği için uzun sürer, ortam değişkeniyle açılır.
+Varsayılan 10k kod; 100k kod tek çekirdekte yaklaşık bir saat sürer:
+
+    SCRAPE_MEMORY_TEST=1 python -m unittest benchmarks.test_memory_bound
+    SCRAPE_MEMORY_TEST=1 SCRAPE_MEMORY_TEST_CODES=100000 python -m unittest benchmarks.test_memory_bound
+"""
+
+CODES = int(os.environ.get("SCRAPE_MEMORY_TEST_CODES", 10000))
+# akış boyunca RSS'in başlangıca göre en fazla artışı
+LIMIT_MB = float(os.environ.get("SCRAPE_MEMORY_TEST_LIMIT_MB", 150))
+
+
+def current_rss_mb() -> float:
+    """Linux'ta anlık RSS, diğer platformlarda tepe RSS"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 1024 / 1024
+    except (OSError, ValueError, AttributeError):
+        import resource
+        rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return rss / 1024 / (1024 if sys.platform == "darwin" else 1)
+
+
+class RSSSampler:
+    """Blok boyunca RSS'i örnekler, growth_mb: tepe - başlangıç"""
+
+    def __init__(self, interval: float = 0.05):
+        self.interval = interval
+        self.start_mb = self.peak_mb = 0.0
+        self._stop = threading.Event()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.peak_mb = max(self.peak_mb, current_rss_mb())
+
+    def __enter__(self):
+        self.start_mb = self.peak_mb = current_rss_mb()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        self.peak_mb = max(self.peak_mb, current_rss_mb())
+
+    @property
+    def growth_mb(self) -> float:
+        return self.peak_mb - self.start_mb
+
+
+def prestates(start: int, count: int) -> Iterator:
+    from supplier_scrape_core.structers.product import PreState
+    for i in range(count):
+        yield PreState(start + i, 100 + i % 50, i % 7)
+
+
+def ndjson_lines(start: int, count: int) -> Iterator[bytes]:
+    for prestate in prestates(start, count):
+        yield (json.dumps(dict(prestate)) + "\n").encode("utf-8")
+
+
+class NDJSONBody(io.RawIOBase):
+    """Satırları bellekte toplamadan okunabilir istek gövdesi olarak verir"""
+
+    def __init__(self, lines: Iterator[bytes]):
+        self._lines = lines
+        self._buffer = b""
+
+    def readable(self):
+        return True
+
+    def readinto(self, b):
+        while not self._buffer:
+            self._buffer = next(self._lines, b"")
+            if not self._buffer:
+                return 0
+        n = min(len(b), len(self._buffer))
+        b[:n] = self._buffer[:n]
+        self._buffer = self._buffer[n:]
+        return n
+
+
+def post_ndjson(client, supplier: str, start: int, count: int, **kwargs):
+    """ndjson gövdeyi satır satır üretip /fetch-products?stream=true'ya gönderir"""
+    length = sum(len(line) for line in ndjson_lines(start, count))
+    # test client input_stream'i seek ile ölçer, akış gövdesi wsgi.input olarak doğrudan verilir
+    body = io.BufferedReader(NDJSONBody(ndjson_lines(start, count)))
+    return client.post(f"/fetch-products?stream=true&supplier={supplier}", content_type="application/x-ndjson",
+                       environ_overrides={"wsgi.input": body, "CONTENT_LENGTH": str(length)}, **kwargs)
+
+
+@unittest.skipUnless(os.environ.get("SCRAPE_MEMORY_TEST"), "set SCRAPE_MEMORY_TEST=1 to run")
+class MemoryBoundTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        os.environ.setdefault("SCRAPE_LOG_LEVEL", "WARNING")
+        cls.workdir = tempfile.mkdtemp()
+        os.environ["SCRAPE_STORE_PATH"] = os.path.join(cls.workdir, "products.db")
+        cls.server = StubServer(StubConfig()).__enter__()
+        os.environ["SCRAPE_SUPPLIER_BASE_URL"] = cls.server.base_url
+
+        from supplier_scrape_core.logs import setup_logging
+        setup_logging()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.__exit__(None, None, None)
+        shutil.rmtree(cls.workdir, ignore_errors=True)
+
+    def _processer(self):
+        from supplier_scrape_core.cache import ProductCache, LinkIndex
+        from supplier_scrape_core.processer import Processer
+        from supplier_scrape_core.store import ProductStore
+        return Processer(cache=ProductCache(), link_index=LinkIndex(), store=ProductStore(os.environ["SCRAPE_STORE_PATH"]))
+
+    def test_iter_with_code_to_stream_writer(self):
+        from supplier_scrape_core.savers import SaverLikeIkasTemplate
+        from supplier_scrape_core.structers.product import Suppliers
+
+        saver = SaverLikeIkasTemplate()
+        processer = self._processer()
+        # import'lar, bağlantı havuzu ve yazıcı ölçüm dışında yüklensin
+        saver.write_stream((p for _, p, _ in processer.iter_with_code(Suppliers.BALGUNES, prestates(100000, 200))),
+                           os.path.join(self.workdir, "warmup.xlsx"))
+
+        counts = {True: 0, False: 0}
+        with RSSSampler() as rss:
+            with saver.stream_writer(os.path.join(self.workdir, "success.xlsx")) as ok, \
+                    saver.stream_writer(os.path.join(self.workdir, "failed.xlsx")) as bad:
+                for _, product, success in processer.iter_with_code(Suppliers.BALGUNES, prestates(200000, CODES)):
+                    counts[success] += 1
+                    (ok if success else bad).add(product)
+
+        self.assertEqual(counts[True] + counts[False], CODES)
+        self.assertEqual(ok.count, counts[True])
+        self.assertLess(rss.growth_mb, LIMIT_MB, f"RSS grew {rss.growth_mb:.1f} MB for {CODES} codes")
+
+    def test_streaming_response(self):
+        from backend import app as backend
+
+        client = backend.app.test_client()
+        post_ndjson(client, "12", 100000, 200).get_data()
+
+        lines, summary = 0, None
+        with RSSSampler() as rss:
+            # istek gövdesi de akış, ne test ne sunucu kod listesini bellekte tutar
+            response = post_ndjson(client, "12", 300000, CODES, buffered=False)
+            self.assertEqual(response.status_code, 200)
+            tail = ""
+            for chunk in response.response:
+                text = tail + (chunk.decode("utf-8") if isinstance(chunk, bytes) else chunk)
+                *complete, tail = text.split("\n")
+                for line in complete:
+                    item = json.loads(line)
+                    if "summary" in item:
+                        summary = item["summary"]
+                    else:
+                        lines += 1
+            response.close()
+
+        self.assertIsNotNone(summary)
+        self.assertEqual(lines, CODES)
+        self.assertEqual(summary["successed"] + summary["failed"], CODES)
+        self.assertLess(rss.growth_mb, LIMIT_MB, f"RSS grew {rss.growth_mb:.1f} MB for {CODES} codes")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,24 +1,32 @@
 from PyQt6.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QLabel,
-    QTableWidget,QTableWidgetItem,
+    QTableView,QHeaderView,QFileDialog,
     QComboBox, QPushButton,QLineEdit,QSpinBox,QCheckBox,
     QMessageBox,QProgressBar
 )
 
-from PyQt6.QtGui import QFont
-from typing import Dict, List, Callable
+from PyQt6.QtGui import QFont, QKeySequence, QShortcut
+from PyQt6.QtCore import QThreadPool, QTimer
+from typing import TYPE_CHECKING, Dict, List, Callable, Tuple
+from collections import deque
 import sys
 import os
 import logging
+import threading
 import yaml
 
 # API kökü dizinini sys.path'e ekle
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
-from supplier_scrape_core.processer import Processer
-from supplier_scrape_core.savers import SaverLikeIkasTemplate
 from supplier_scrape_core.structers.product import PreState, Suppliers, Product
-from supplier_scrape_core.config.config import STATIC_VALUES
-from backend.client import Client
+from supplier_scrape_core.ingest import PreStateIngestor
+from supplier_scrape_core.logs import setup_logging
+from frontend.desktop.workers import SupplierWorker
+# requests ilk uzak gönderimde yüklenir
+if TYPE_CHECKING:
+    from backend.client import Client
+from frontend.desktop.queue_model import (
+    QueueTableModel, StatusFilterProxyModel, STATUS_NONE, STATUS_TRUE, STATUS_FALSE, STATUS_PENDING
+)
 
 
 class ColorFormatter(logging.Formatter):
@@ -37,13 +45,12 @@ class ColorFormatter(logging.Formatter):
         return f'{color}{message}{self.RESET}'
 
 
-logger = logging.getLogger()
-logger.setLevel(logging.INFO)
 handler = logging.StreamHandler()
 handler.setFormatter(ColorFormatter(
     "%(asctime)s - %(levelname)s - %(message)s"
 ))
-logger.addHandler(handler)
+# worker thread'leri log I/O'da beklemesin
+setup_logging(handler=handler)
 
 class MainWindow(QMainWindow):
     
@@ -51,6 +58,23 @@ class MainWindow(QMainWindow):
         super().__init__()
 
         self.config = self.load_config()
+        self.thread_pool = QThreadPool.globalInstance()
+        self.cancel_event = threading.Event()
+        self.running_workers = 0
+        self.worker_errors = []
+        self.client = None
+
+        # gönderim sırasında henüz sonucu gelmemiş satırlar
+        self.pending_rows: Dict[Tuple[str, str], deque] = {}
+
+        # worker sonuçları biriktirilip tabloya toplu yazılır
+        self.status_buffer = []
+        # sunucunun denemeden döndürdüğü (Ertelendi) ürün sayısı
+        self.deferred = 0
+        self.flush_timer = QTimer(self)
+        self.flush_timer.setSingleShot(True)
+        self.flush_timer.setInterval(100)
+        self.flush_timer.timeout.connect(self.flush_status_updates)
         self.setWindowTitle("Ürün Çekme Uygulaması")
         self.setGeometry(100, 100, 1200, 600)
         self.set_central_widget()
@@ -80,8 +104,11 @@ class MainWindow(QMainWindow):
         form_layout = self.set_form_widgets()
         main_layout.addLayout(form_layout)
         
-        self.table_widget = self.create_table()
-        main_layout.addWidget(self.table_widget)
+        queue_toolbar = self.create_queue_toolbar()
+        main_layout.addLayout(queue_toolbar)
+
+        self.table_view = self.create_table()
+        main_layout.addWidget(self.table_view)
         
         self.sendbar_layout = self.create_sendbar()
         main_layout.addLayout(self.sendbar_layout)
@@ -166,14 +193,8 @@ class MainWindow(QMainWindow):
         chosenSupplier = list(Suppliers)[supplierIdx]
         product_count = int(self.product_count_box.text())
         
-        row = self.table_widget.rowCount()
-        self.table_widget.insertRow(row)
-
-        self.table_widget.setItem(row, 0, QTableWidgetItem(chosenSupplier.value["prefix"]))
-        self.table_widget.setItem(row, 1, QTableWidgetItem(str(product_code)))
-        self.table_widget.setItem(row, 2, QTableWidgetItem(str(product_price)))
-        self.table_widget.setItem(row, 3, QTableWidgetItem(str(product_count)))
-        self.table_widget.setItem(row, 4, QTableWidgetItem(str(None)))
+        self.queue_model.append_rows([(chosenSupplier, PreState(product_code, product_price, product_count))])
+        self.update_queue_label()
 
         self.product_code_lineedit.clear()
         self.product_price_lineedit.clear()
@@ -181,21 +202,115 @@ class MainWindow(QMainWindow):
         
     def create_table(self):
         """Veri tablosu oluştur"""
-        table = QTableWidget()
-        table.setColumnCount(5)
-        table.setHorizontalHeaderLabels([
-            "Tedarikçi", "Ürün Kodu", "Fiyat", "Adet", "Durum"
-        ])
-        table.setRowCount(0)
+        self.queue_model = QueueTableModel(self)
+        self.proxy_model = StatusFilterProxyModel(self)
+        self.proxy_model.setSourceModel(self.queue_model)
+
+        table = QTableView()
+        table.setModel(self.proxy_model)
+        table.setSortingEnabled(True)
         table.setAlternatingRowColors(True)
+        # satır yükseklikleri tek tek ölçülmesin, sadece görünen satırlar çizilsin
+        table.verticalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Fixed)
+        table.verticalHeader().setDefaultSectionSize(24)
         table.setColumnWidth(0, 150)
         table.setColumnWidth(1, 250)
         table.setColumnWidth(2, 250)
         table.setColumnWidth(3, 250)
         table.setColumnWidth(4, 100)
+
+        # panodan toplu yapıştırma
+        QShortcut(QKeySequence.StandardKey.Paste, table, activated=self.paste_from_clipboard)
         
         return table
 
+    def create_queue_toolbar(self):
+        layout = QHBoxLayout()
+
+        self.import_button = QPushButton("Dosyadan İçe Aktar")
+        self.import_button.clicked.connect(self.import_from_file)
+        layout.addWidget(self.import_button)
+
+        self.paste_button = QPushButton("Panodan Yapıştır")
+        self.paste_button.clicked.connect(self.paste_from_clipboard)
+        layout.addWidget(self.paste_button)
+
+        self.clear_button = QPushButton("Temizle")
+        self.clear_button.clicked.connect(self.clear_queue)
+        layout.addWidget(self.clear_button)
+
+        layout.addStretch()
+
+        # duruma göre filtre
+        layout.addWidget(QLabel("Durum"))
+        self.status_filter_combo = QComboBox()
+        self.status_filter_combo.addItem("Tümü", None)
+        self.status_filter_combo.addItem("Bekliyor", STATUS_NONE)
+        self.status_filter_combo.addItem("Başarılı", STATUS_TRUE)
+        self.status_filter_combo.addItem("Başarısız", STATUS_FALSE)
+        self.status_filter_combo.addItem("Ertelendi", STATUS_PENDING)
+        self.status_filter_combo.currentIndexChanged.connect(
+            lambda: self.proxy_model.set_status_filter(self.status_filter_combo.currentData())
+        )
+        layout.addWidget(self.status_filter_combo)
+
+        self.queue_label = QLabel("0 ürün")
+        layout.addWidget(self.queue_label)
+
+        return layout
+
+    def update_queue_label(self):
+        self.queue_label.setText(f"{self.queue_model.rowCount()} ürün")
+
+    def chosen_supplier(self) -> Suppliers:
+        return list(Suppliers)[self.supplier_combo.currentIndex()]
+
+    def paste_from_clipboard(self):
+        """
+        Panodaki satırları seçili tedarikçi için kuyruğa ekle.
+        Her satır: kod [fiyat [adet]], tab / ; / , ile ayrılmış
+        """
+        text = QApplication.clipboard().text()
+        supplier = self.chosen_supplier()
+        rows, invalid = [], 0
+        for line in text.splitlines():
+            parts = [p.strip() for p in line.replace(";", "\t").replace(",", "\t").split("\t") if p.strip()]
+            if not parts:
+                continue
+            if not all(p.isdigit() for p in parts[:3]):
+                invalid += 1
+                continue
+            values = [int(p) for p in parts[:3]] + [None] * (3 - len(parts[:3]))
+            rows.append((supplier, PreState(*values)))
+
+        self.queue_model.append_rows(rows)
+        self.update_queue_label()
+        if invalid:
+            QMessageBox.warning(self, "Hatalı Giriş", f"{invalid} satır sayı olmadığı için atlandı")
+
+    def import_from_file(self):
+        """csv / xlsx / jsonl dosyasından kuyruğa toplu ekle"""
+        path, _ = QFileDialog.getOpenFileName(self, "Ürün Listesi", "", "Ürün Listesi (*.csv *.xlsx *.jsonl)")
+        if not path:
+            return
+        try:
+            ingestor = PreStateIngestor(path, self.chosen_supplier())
+            for supplier, prestates in ingestor.iter_chunks():
+                self.queue_model.append_rows((supplier, p) for p in prestates)
+        except Exception as e:
+            QMessageBox.warning(self, "Hata", f"Dosya okunamadı: {str(e)}")
+            return
+        self.update_queue_label()
+        report = ingestor.report
+        QMessageBox.information(
+            self, "İçe Aktarıldı",
+            f"Eklenen: {report.valid}  Hatalı: {report.invalid}  Tekrar eden: {report.duplicates}"
+        )
+
+    def clear_queue(self):
+        self.queue_model.clear()
+        self.update_queue_label()
+
     def create_sendbar(self):
         layout = QHBoxLayout()
         
@@ -215,136 +330,119 @@ class MainWindow(QMainWindow):
         self.send_button.setFixedHeight(40)
 
         layout.addWidget(self.send_button)
+
+        # iptal butonu, sadece gönderim sürerken aktif
+        self.cancel_button = QPushButton("İptal")
+        self.cancel_button.clicked.connect(self.cancel)
+        self.cancel_button.setEnabled(False)
+        self.cancel_button.setMaximumWidth(120)
+        self.cancel_button.setFixedHeight(40)
+        layout.addWidget(self.cancel_button)
         
         return layout
         
     def send(self):
         
-        if self.table_widget.rowCount() == 0:
+        if self.queue_model.rowCount() == 0:
             QMessageBox.warning(self, "Hata", "Tabloya herhangi bir öğe eklenmemiş")
             return
         # tedarikçi kategorilerine göre ayıkla, sub_prestates sözlüğünde tut
-        data = []
-        for row in range(self.table_widget.rowCount()):
-            row_data = []
-            for col in range(self.table_widget.columnCount()):
-                item = self.table_widget.item(row, col)
-                row_data.append(item.text() if item else None)
-            data.append(row_data)
-
-        sup_prestates = {}
-        for i in Suppliers:
-            sup_prestates.update({i : []})
-            
-        for row in data:
-            
-            for elem in Suppliers:
-                if elem.value["prefix"] == row[0]:
-                    supplier = elem
-                    break
-            
-            if supplier is None:
-                QMessageBox.warning(self, "Hata", f"Tedarikçi '{row[0]}' bulunamadı")
-                continue
-            
-            try:
-                code = int(row[1])
-                price = int(row[2])
-                stock = int(row[3])
-                
-                prestate = PreState(code=code, price=price, stock=stock)
-                
-                sup_prestates[supplier].append(prestate)
-                        
-            except ValueError as e:
-                QMessageBox.warning(self, "Hata", f"Geçersiz veri formatı: {str(e)}")
-                continue
-            except Exception as e:
-                QMessageBox.warning(self, "Hata", f"İşlem hatası: {str(e)}")
-                continue
+        sup_prestates = self.queue_model.prestates_by_supplier()
             
         print("SUP PRESTATES", sup_prestates)
-            
+
+        jobs = {k: v for k, v in sup_prestates.items() if len(v) > 0}
+        if not jobs:
+            return
+
         # remote ya da local processor seçeneğine göre işlem yap
-        if self.send_type_checkbox.isChecked():
-            client = Client(self.config["REMOTE_BASE_URL"])
-            for k,v in sup_prestates.items():
-                if len(v) == 0:
-                    continue
-                
-                successed, failed = client.send(sup_prestates[k],k)
-                successed:List[Product]
-                failed:List[Product]
-                if not successed:
-                    QMessageBox.information(self, "Başarılı", f"Veri çekmede bir problem meydana geldi.")   
-                    break
-                # Table yenile başarılı
-                for product in successed:
-                    for j, row in enumerate(data):
-                        code = int(row[1])     
-                        product_code = str(product.urun_kodu)[2:]
-                        if str(product_code) == str(code):
-                            self.table_widget.setItem(j,4,QTableWidgetItem(str(True)))
-                            break
-                # Table yenile başarısız
-                for product in failed:
-                    for j, row in enumerate(data):
-                        code = int(row[1])     
-                        product_code = str(product.urun_kodu)[2:]
-                        if str(product_code) == str(code):
-                            self.table_widget.setItem(j,4,QTableWidgetItem(str(False)))
-                            break
-                        
-                saver = SaverLikeIkasTemplate()
-
-                # Başarıyla çekilmiş olanları ikas frame'ine doldur ve kaydet
-                out_path = f"./frontend/desktop/output/success_{k.value["name"]}.xlsx"
-                filled_frame = saver.fill(successed,STATIC_VALUES)
-                saver.write(filled_frame,out_path)
-                
-                # Başarısız olanları ikas frame'inde doldur ve kaydet
-                out_path = f"./frontend/desktop/output/failed_{k.value["name"]}.xlsx"
-                filled_frame = saver.fill(failed,STATIC_VALUES)
-                saver.write(filled_frame,out_path)
+        client = self.get_client() if self.send_type_checkbox.isChecked() else None
 
-            QMessageBox.information(self, "Başarılı", f"Ürünler başarıyla işlendi")
-        else:
-            processer = Processer()
- 
-            for k,v in sup_prestates.items():
-                if len(v) == 0:
-                    continue
-                
-                products, failed_producuts = processer.get_with_code(k, *sup_prestates[k])
-                products:list[Product]
-                failed_producuts:list[Product]
-                
-                # Table yenile başarılı
-                for product in products:
-                    for j, row in enumerate(data):
-                        code = int(row[1])     
-                        product_code = str(product.urun_kodu)[2:]
-                        if str(product_code) == str(code):
-                            self.table_widget.setItem(j,4,QTableWidgetItem(str(True)))
-                            break
-                # Table yenile başarısız
-                for product in failed_producuts:
-                    for j, row in enumerate(data):
-                        code = int(row[1])     
-                        product_code = str(product.urun_kodu)[2:]
-                        if str(product_code) == str(code):
-                            self.table_widget.setItem(j,4,QTableWidgetItem(str(False)))
-                            break
-                        
-                saver = SaverLikeIkasTemplate()
-                                
-
-                # Başarıyla çekilmiş olanları ikas frame'ine doldur ve kaydet
-                saver.fill(products,STATIC_VALUES,f"./frontend/desktop/output/success_{k.value["name"]}.xlsx")
-                
-                # Başarısız olanları ikas frame'inde doldur ve kaydet
-                saver.fill(failed_producuts,STATIC_VALUES,f"./frontend/desktop/output/failed_{k.value["name"]}.xlsx")
+        self.cancel_event = threading.Event()
+        self.worker_errors = []
+        self.running_workers = len(jobs)
+        self.status_buffer = []
+        self.deferred = 0
+        self.pending_rows = {k: deque(v) for k, v in self.queue_model.row_index.items()}
+        self.queue_model.reset_statuses()
+
+        total = sum(len(v) for v in jobs.values())
+        self.progress_bar.setMaximum(total)
+        self.progress_bar.setValue(0)
+        self.progress_bar.setVisible(True)
+        self.send_button.setEnabled(False)
+        self.clear_button.setEnabled(False)
+        self.cancel_button.setEnabled(True)
+
+        # her tedarikçi ayrı worker'da, lokal modda eşzamanlı çalışır
+        for k, v in jobs.items():
+            worker = SupplierWorker(k, v, self.cancel_event, client)
+            worker.signals.product_done.connect(self.on_product_done)
+            worker.signals.failed.connect(self.on_worker_failed)
+            worker.signals.finished.connect(self.on_worker_finished)
+            self.thread_pool.start(worker)
 
+    def get_client(self) -> "Client":
+        """Bağlantı havuzu ve health durumu gönderimler arasında korunsun diye client tekrar kullanılır"""
+        from backend.client import Client
+
+        if self.client is None or self.client.base_url != self.config["REMOTE_BASE_URL"]:
+            # öncelik verilmez, sunucu kod sayısına göre sınıflar; yapıştırılan / dosyadan gelen büyük listeler bulk sayılır
+            self.client = Client(self.config["REMOTE_BASE_URL"])
+        return self.client
+
+    def cancel(self):
+        """Kalan ürünlerin çekilmesini durdur"""
+        self.cancel_event.set()
+        self.cancel_button.setEnabled(False)
+
+    def on_product_done(self, prefix:str, code:str, status:int):
+        self.status_buffer.append((prefix, code, status))
+        if not self.flush_timer.isActive():
+            self.flush_timer.start()
+
+    def flush_status_updates(self):
+        """Biriken sonuçları tabloya tek seferde yaz"""
+        if not self.status_buffer:
+            return
+        buffer, self.status_buffer = self.status_buffer, []
+
+        updates = []
+        for prefix, code, status in buffer:
+            # aynı kodun tekrarları sırayla bir sonraki satıra yazılır
+            rows = self.pending_rows.get((prefix, code))
+            if rows:
+                updates.append((rows.popleft(), status))
+            if status == STATUS_PENDING:
+                self.deferred += 1
+        self.queue_model.set_statuses(updates)
+        self.progress_bar.setValue(self.progress_bar.value() + len(buffer))
+
+    def on_worker_failed(self, supplier_name:str, message:str):
+        self.worker_errors.append(f"{supplier_name}: {message}")
+
+    def on_worker_finished(self):
+        self.running_workers -= 1
+        if self.running_workers > 0:
+            return
+
+        self.flush_timer.stop()
+        self.flush_status_updates()
+
+        self.send_button.setEnabled(True)
+        self.clear_button.setEnabled(True)
+        self.cancel_button.setEnabled(False)
+        self.progress_bar.setVisible(False)
+
+        if self.worker_errors:
+            QMessageBox.warning(self, "Hata", "\n".join(self.worker_errors))
+        elif self.cancel_event.is_set():
+            QMessageBox.information(self, "İptal", f"İşlem iptal edildi")
+        elif self.deferred:
+            QMessageBox.information(
+                self, "Ertelendi", f"{self.deferred} ürün sunucuda denenmeden döndü, durumları \"Ertelendi\" olarak işaretlendi"
+            )
+        else:
             QMessageBox.information(self, "Başarılı", f"Ürünler başarıyla işlendi")
 
 def main():
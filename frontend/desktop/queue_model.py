@@ -0,0 +1,172 @@
+from PyQt6.QtCore import Qt, QAbstractTableModel, QModelIndex, QSortFilterProxyModel
+from typing import Dict, Iterable, List, Optional, Tuple
+from array import array
+import math
+
+from supplier_scrape_core.structers.product import PreState, Suppliers
+
+"""
+Gönderim kuyruğu için QAbstractTableModel.
+Satırlar hücre başına widget yerine kolon bazlı kompakt dizilerde tutulur,
+böylece binlerce satırlık kuyruklar hızlı eklenir ve sadece görünen satırlar çizilir.
+"""
+
+HEADERS = ["Tedarikçi", "Ürün Kodu", "Fiyat", "Adet", "Durum"]
+STATUS_COLUMN = 4
+
+# status dizisindeki değerler
+STATUS_NONE = -1
+STATUS_FALSE = 0
+STATUS_TRUE = 1
+# sunucu kodu denemeden döndürdü (süre bütçesi doldu), sonra tekrar gönderilebilir
+STATUS_PENDING = 2
+STATUS_TEXT = {STATUS_NONE: str(None), STATUS_FALSE: str(False), STATUS_TRUE: str(True), STATUS_PENDING: "Pending"}
+
+# None stok için kullanılan değer, fiyatta NaN kullanılır
+MISSING = -1
+
+
+class QueueTableModel(QAbstractTableModel):
+    """PreState kuyruğu ve her satırın durumu"""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._suppliers = list(Suppliers)
+        self._supplier_ids = array("b")
+        self._codes = array("q")
+        # ondalıklı fiyatlar (129.90) kesilmesin diye double
+        self._prices = array("d")
+        self._stocks = array("q")
+        self._statuses = array("b")
+        # (tedarikçi prefix, ürün kodu) -> satırlar
+        self.row_index: Dict[Tuple[str, str], List[int]] = {}
+
+    # Qt model arayüzü
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._codes)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(HEADERS)
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role == Qt.ItemDataRole.DisplayRole and orientation == Qt.Orientation.Horizontal:
+            return HEADERS[section]
+        return None
+
+    def data(self, index: QModelIndex, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        row, column = index.row(), index.column()
+
+        if role == Qt.ItemDataRole.DisplayRole:
+            if column == 0:
+                return self._suppliers[self._supplier_ids[row]].value["prefix"]
+            if column == 1:
+                return str(self._codes[row])
+            if column == 2:
+                return str(self._price(row))
+            if column == 3:
+                return self._optional_text(self._stocks[row])
+            if column == STATUS_COLUMN:
+                return STATUS_TEXT[self._statuses[row]]
+
+        # sıralama ve filtreleme için ham değerler
+        if role == Qt.ItemDataRole.UserRole:
+            if column == 2:
+                # NaN sıralamayı bozar, eksik fiyat stok gibi MISSING ile en başa dizilir
+                price = self._prices[row]
+                return MISSING if math.isnan(price) else price
+            return (self._supplier_ids, self._codes, self._prices, self._stocks, self._statuses)[column][row]
+        return None
+
+    @staticmethod
+    def _optional_text(value: int) -> str:
+        return str(None) if value == MISSING else str(value)
+
+    def _price(self, row: int):
+        """Satırın fiyatı: tam sayıysa int, ondalıklıysa float, yoksa None"""
+        price = self._prices[row]
+        if math.isnan(price):
+            return None
+        return int(price) if price.is_integer() else price
+
+    # kuyruk işlemleri
+    def append_rows(self, rows: Iterable[Tuple[Suppliers, PreState]]) -> int:
+        """Satırları tek bir insert ile ekler. Eklenen satır sayısını döndürür"""
+        rows = list(rows)
+        if not rows:
+            return 0
+        first = len(self._codes)
+        self.beginInsertRows(QModelIndex(), first, first + len(rows) - 1)
+        for offset, (supplier, prestate) in enumerate(rows):
+            self._supplier_ids.append(self._suppliers.index(supplier))
+            self._codes.append(int(prestate.code))
+            self._prices.append(math.nan if prestate.price is None else float(prestate.price))
+            self._stocks.append(MISSING if prestate.stock is None else int(prestate.stock))
+            self._statuses.append(STATUS_NONE)
+            key = (supplier.value["prefix"], str(int(prestate.code)))
+            self.row_index.setdefault(key, []).append(first + offset)
+        self.endInsertRows()
+        return len(rows)
+
+    def clear(self):
+        self.beginResetModel()
+        for column in (self._supplier_ids, self._codes, self._prices, self._stocks, self._statuses):
+            del column[:]
+        self.row_index = {}
+        self.endResetModel()
+
+    def reset_statuses(self):
+        if not self._statuses:
+            return
+        for row in range(len(self._statuses)):
+            self._statuses[row] = STATUS_NONE
+        self._emit_status_changed(0, len(self._statuses) - 1)
+
+    def set_statuses(self, updates: Iterable[Tuple[int, int]]):
+        """(satır, STATUS_* durumu) listesini yazar ve tek bir dataChanged sinyali yayar"""
+        first, last = None, None
+        for row, status in updates:
+            self._statuses[row] = status
+            first = row if first is None else min(first, row)
+            last = row if last is None else max(last, row)
+        if first is not None:
+            self._emit_status_changed(first, last)
+
+    def _emit_status_changed(self, first: int, last: int):
+        self.dataChanged.emit(
+            self.index(first, STATUS_COLUMN),
+            self.index(last, STATUS_COLUMN),
+            [Qt.ItemDataRole.DisplayRole, Qt.ItemDataRole.UserRole]
+        )
+
+    def prestates_by_supplier(self) -> Dict[Suppliers, List[PreState]]:
+        """Kuyruğu gönderim için tedarikçiye göre gruplar"""
+        result: Dict[Suppliers, List[PreState]] = {sup: [] for sup in self._suppliers}
+        for row, (supplier_id, code, stock) in enumerate(zip(self._supplier_ids, self._codes, self._stocks)):
+            result[self._suppliers[supplier_id]].append(PreState(
+                code=code,
+                price=self._price(row),
+                stock=None if stock == MISSING else stock,
+            ))
+        return result
+
+
+class StatusFilterProxyModel(QSortFilterProxyModel):
+    """Durum kolonuna göre filtreleyen, ham değerlerle sıralayan proxy"""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setSortRole(Qt.ItemDataRole.UserRole)
+        self._status_filter = None
+
+    def set_status_filter(self, status: Optional[int]):
+        """None tüm satırlar, aksi halde STATUS_* değerlerinden biri"""
+        self._status_filter = status
+        self.invalidateFilter()
+
+    def filterAcceptsRow(self, source_row, source_parent):
+        if self._status_filter is None:
+            return True
+        index = self.sourceModel().index(source_row, STATUS_COLUMN, source_parent)
+        return self.sourceModel().data(index, Qt.ItemDataRole.UserRole) == self._status_filter
@@ -0,0 +1,40 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+import unittest
+
+from PyQt6.QtCore import Qt
+
+from frontend.desktop.queue_model import QueueTableModel
+from supplier_scrape_core.structers.product import PreState, Suppliers
+
+"""
+    python -m unittest frontend.desktop.test_queue_model
+"""
+
+
+class QueuePriceTest(unittest.TestCase):
+
+    def setUp(self):
+        self.model = QueueTableModel()
+        self.model.append_rows([
+            (Suppliers.BALGUNES, PreState(1001, 129.90, 2)),
+            (Suppliers.BALGUNES, PreState(1002, 150, 1)),
+            (Suppliers.BABEXI, PreState(1003, None, None)),
+        ])
+
+    def test_decimal_price_kept_for_send(self):
+        prestates = self.model.prestates_by_supplier()
+        self.assertEqual([(p.price, p.stock) for p in prestates[Suppliers.BALGUNES]], [(129.9, 2), (150, 1)])
+        self.assertIsInstance(prestates[Suppliers.BALGUNES][1].price, int)
+        self.assertIsNone(prestates[Suppliers.BABEXI][0].price)
+
+    def test_price_display(self):
+        texts = [self.model.data(self.model.index(row, 2)) for row in range(3)]
+        self.assertEqual(texts, ["129.9", "150", "None"])
+        # eksik fiyat sıralamada en başa düşer
+        self.assertEqual(self.model.data(self.model.index(2, 2), Qt.ItemDataRole.UserRole), -1)
+
+
+if __name__ == "__main__":
+    unittest.main()
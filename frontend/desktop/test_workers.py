@@ -0,0 +1,123 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+import threading
+import unittest
+
+from backend.client import Client
+from frontend.desktop.queue_model import STATUS_PENDING, STATUS_TRUE
+from frontend.desktop.workers import SupplierWorker
+from supplier_scrape_core.structers.product import PreState, Product, Suppliers
+
+"""
+Uzak gönderimde sonuçların kuyruk satırlarına eşlenmesi ve iptal. Sunucu yerine sahte cevap döndüren Client kullanılır.
+
+    python -m unittest frontend.desktop.test_workers
+"""
+
+
+class FakeResponse:
+    def __init__(self, data: dict):
+        self.data = data
+
+    def json(self):
+        return self.data
+
+
+class FakeClient(Client):
+    """Her kodu sunucu gibi serialize edip döndürür, post sayısını ve kalan kod sayısını deadline'a göre ayarlar"""
+
+    def __init__(self, per_round: int, on_post=None, **kwargs):
+        self.per_round = per_round
+        self.on_post = on_post
+        self.posts = 0
+        self.waiting = {}
+        super().__init__("http://stub", **kwargs)
+
+    def _health_check(self, force: bool = False):
+        return True
+
+    def _post_chunk(self, payload, query=""):
+        self.posts += 1
+        if self.on_post is not None:
+            self.on_post(self)
+        if "continuation" in payload:
+            supplier, prestates = self.waiting.pop(payload["continuation"])
+        else:
+            supplier = next(s for s in Suppliers if s.value["prefix"] == payload["supplier"])
+            prestates = payload["prestates"]
+
+        done, rest = prestates[:self.per_round], prestates[self.per_round:]
+        products = [Product(urun_kodu=p["code"], marka=supplier).serialize() for p in done]
+        data = {"successed": {"count": len(products), "products": products}, "failed": {"count": 0, "products": []}}
+        if rest:
+            token = f"t{self.posts}"
+            self.waiting[token] = (supplier, rest)
+            data["pending"] = {"count": len(rest), "prestates": rest, "continuation": token}
+        return FakeResponse(data)
+
+
+class RemoteWorkerTest(unittest.TestCase):
+
+    def run_worker(self, client, prestates, cancel_event=None):
+        worker = SupplierWorker(Suppliers.BALGUNES, prestates, cancel_event or threading.Event(), client)
+        self.saved = []
+        worker._save = lambda successed, failed: self.saved.append((successed, failed))
+        done = []
+        worker.signals.product_done.connect(lambda prefix, code, status: done.append((prefix, code, status)))
+        worker.run()
+        return done
+
+    def test_results_map_back_to_queue_codes(self):
+        client = FakeClient(per_round=100)
+        prestates = [PreState(145204, 10, 1), PreState(1100, 20, 2)]
+        done = self.run_worker(client, prestates)
+        # satırlar (prefix, kod) ile eşlenir, kod sunucudan geldiği gibi değil kuyruktaki haliyle dönmeli
+        self.assertEqual(done, [("11", "145204", STATUS_TRUE), ("11", "1100", STATUS_TRUE)])
+
+    def test_unfetched_codes_are_pending_not_failed(self):
+        # sunucu ilerleme kaydetmezse kalan kodlar denenmemiş sayılır
+        client = FakeClient(per_round=0, retries=0)
+        prestates = [PreState(3000 + i, 10, 1) for i in range(3)]
+        done = self.run_worker(client, prestates)
+
+        self.assertEqual(done, [("11", str(p.code), STATUS_PENDING) for p in prestates])
+        self.assertEqual(self.saved, [([], [])])
+        self.assertEqual([p.code for p in client.last_pending[Suppliers.BALGUNES]], [p.code for p in prestates])
+
+    def test_supplier_down_codes_are_deferred(self):
+        client = FakeClient(per_round=100)
+        client._supplier_states = {"BALGUNES": {"state": "open", "retry_in": 20}}
+        prestates = [PreState(4000, 10, 1), PreState(4001, 10, 1)]
+        done = self.run_worker(client, prestates)
+
+        self.assertEqual(client.posts, 0)
+        self.assertEqual(self.saved, [([], [])])
+        self.assertEqual(done, [("11", "4000", STATUS_PENDING), ("11", "4001", STATUS_PENDING)])
+
+    def test_cancel_stops_continuation_rounds(self):
+        cancel_event = threading.Event()
+
+        def cancel_after_first(client):
+            if client.posts == 1:
+                cancel_event.set()
+
+        client = FakeClient(per_round=2, on_post=cancel_after_first, chunk_size=100, max_workers=1)
+        prestates = [PreState(1000 + i, 10, 1) for i in range(10)]
+        done = self.run_worker(client, prestates, cancel_event)
+
+        self.assertEqual(client.posts, 1)
+        self.assertEqual([code for _, code, _ in done], ["1000", "1001"])
+        self.assertEqual(len(client.last_pending[Suppliers.BALGUNES]), 8)
+
+    def test_cancel_stops_remaining_chunks(self):
+        cancel_event = threading.Event()
+        client = FakeClient(per_round=100, on_post=lambda c: cancel_event.set(), chunk_size=3, max_workers=1)
+        done = self.run_worker(client, [PreState(2000 + i, 10, 1) for i in range(9)], cancel_event)
+
+        self.assertEqual(client.posts, 1)
+        self.assertEqual(len(done), 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,104 @@
+from PyQt6.QtCore import QObject, QRunnable, pyqtSignal
+from typing import TYPE_CHECKING, List, Optional
+import os
+import logging
+import threading
+
+from supplier_scrape_core.processer import Processer
+from supplier_scrape_core.savers import SaverLikeIkasTemplate
+from supplier_scrape_core.structers.product import PreState, Suppliers, Product
+from supplier_scrape_core.config.config import STATIC_VALUES
+from frontend.desktop.queue_model import STATUS_FALSE, STATUS_PENDING, STATUS_TRUE
+
+if TYPE_CHECKING:
+    from backend.client import Client
+
+"""
+Gönderim işini Qt ana thread'i dışında çalıştıran worker'lar.
+Her tedarikçi ayrı bir QRunnable olarak QThreadPool'da çalışır, sonuçlar sinyallerle arayüze iletilir.
+"""
+
+
+class WorkerSignals(QObject):
+    # tedarikçi prefix'i, ürün kodu, queue_model STATUS_* durumu
+    product_done = pyqtSignal(str, str, int)
+    # tedarikçi adı, başarılı sayısı, başarısız sayısı
+    supplier_done = pyqtSignal(str, int, int)
+    # tedarikçi adı, hata mesajı
+    failed = pyqtSignal(str, str)
+    finished = pyqtSignal()
+
+
+class SupplierWorker(QRunnable):
+    """Tek bir tedarikçinin ürünlerini lokal Processer veya uzak sunucu ile çeker ve kaydeder"""
+
+    def __init__(self, supplier: Suppliers, prestates: List[PreState], cancel_event: threading.Event,
+                 client: Optional["Client"] = None, output_dir: str = "./frontend/desktop/output"):
+        super().__init__()
+        self.supplier = supplier
+        self.prestates = prestates
+        self.cancel_event = cancel_event
+        # verilirse uzak sunucu kullanılır, aynı client (ve bağlantı havuzu) worker'lar arasında paylaşılır
+        self.client = client
+        self.output_dir = output_dir
+        self.signals = WorkerSignals()
+
+    def run(self):
+        try:
+            if self.client is not None:
+                result = self._run_remote()
+            else:
+                result = self._run_local()
+            if result is None:
+                return
+            successed, failed = result
+            self._save(successed, failed)
+            self.signals.supplier_done.emit(self.supplier.value["name"], len(successed), len(failed))
+        except Exception as e:
+            logging.error(f"[{self.supplier.name}] Worker fail: {e}")
+            self.signals.failed.emit(self.supplier.value["name"], str(e))
+        finally:
+            self.signals.finished.emit()
+
+    def _on_result(self, prestate: PreState, product: Product, success: bool):
+        self.signals.product_done.emit(self.supplier.value["prefix"], str(prestate.code), STATUS_TRUE if success else STATUS_FALSE)
+
+    def _run_local(self):
+        processer = Processer()
+        return processer.get_with_code(
+            self.supplier, *self.prestates,
+            on_result=self._on_result,
+            cancel_event=self.cancel_event
+        )
+
+    def _run_remote(self):
+        if self.cancel_event.is_set():
+            return [], []
+        # iptal parçalar ve devam istekleri arasında kontrol edilir
+        successed, failed = self.client.send(self.prestates, self.supplier, cancel_event=self.cancel_event)
+        if successed is False:
+            self.signals.failed.emit(self.supplier.value["name"], "Veri çekmede bir problem meydana geldi")
+            return None
+
+        # sunucu toplu döndüğü için sonuçlar burada tek tek iletilir
+        prefix = self.supplier.value["prefix"]
+        for products, status in ((successed, STATUS_TRUE), (failed, STATUS_FALSE)):
+            for product in products:
+                code = str(product.urun_kodu)[len(prefix):]
+                self.signals.product_done.emit(prefix, code, status)
+        # denenmeyen kodlar başarısız sayılmaz; iptalde lokal gönderimdeki gibi işaretlenmez
+        if not self.cancel_event.is_set():
+            for prestate in self.client.last_pending.get(self.supplier, []):
+                self.signals.product_done.emit(prefix, str(prestate.code), STATUS_PENDING)
+        return successed, failed
+
+    def _save(self, successed: List[Product], failed: List[Product]):
+        os.makedirs(self.output_dir, exist_ok=True)
+        saver = SaverLikeIkasTemplate()
+        name = self.supplier.value["name"]
+
+        # Başarıyla çekilmiş olanları ikas frame'ine doldur ve kaydet
+        saver.write(saver.fill(successed, STATIC_VALUES), f"{self.output_dir}/success_{name}.xlsx")
+
+        # Başarısız olanları ikas frame'inde doldur ve kaydet
+        saver.write(saver.fill(failed, STATIC_VALUES), f"{self.output_dir}/failed_{name}.xlsx")
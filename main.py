@@ -1,9 +1,19 @@
 # -*- coding: utf-8 -*-
+import argparse
 import logging
-from typing import List
-from supplier_scrape_core.processer import Processer,SaverLikeIkasTemplate
+from typing import List, Optional
+from supplier_scrape_core.processer import Processer
+from supplier_scrape_core.savers import SaverLikeIkasTemplate, ExportSnapshot
 from supplier_scrape_core.structers.product import Suppliers, PreState
 from supplier_scrape_core.config.config import STATIC_VALUES
+from supplier_scrape_core.cache import load_shared
+from supplier_scrape_core.images import ImageVerifier
+from supplier_scrape_core.metrics import registry as metrics_registry
+from supplier_scrape_core.logs import setup_logging
+from supplier_scrape_core.profiling import ProfileStore
+from supplier_scrape_core.ingest import PreStateIngestor, find_supplier
+from supplier_scrape_core.store import ProductStore, DEFAULT_STORE_PATH
+from supplier_scrape_core.distributed import Coordinator, SQLiteTaskQueue
 from pathlib import Path
 
 class ColorFormatter(logging.Formatter):
@@ -22,13 +32,12 @@ class ColorFormatter(logging.Formatter):
         return f'{color}{message}{self.RESET}'
 
 
-logger = logging.getLogger()
-logger.setLevel(logging.INFO)
 handler = logging.StreamHandler()
 handler.setFormatter(ColorFormatter(
     "%(asctime)s - %(levelname)s - %(message)s"
 ))
-logger.addHandler(handler)
+# renkli handler kuyruk thread'inde çalışır, seviye / örnekleme SCRAPE_LOG_* ortam değişkenleriyle
+setup_logging(handler=handler)
 
 
 prestates  = {
@@ -61,21 +70,145 @@ prestates  = {
 }
 
 
+def parse_args():
+    parser = argparse.ArgumentParser(description="Ürün kodları ile tedarikçi sitelerinden ürün çeker")
+    parser.add_argument("--verify-images", action="store_true", help="Görsel URL'lerini arka planda doğrula")
+    parser.add_argument("--image-store", help="Verilirse doğrulanan görseller bu dizine indirilir")
+    parser.add_argument("--input", help="prestates yerine okunacak csv/xlsx/jsonl dosyası")
+    parser.add_argument("--supplier", help="Dosyada tedarikçi kolonu yoksa kullanılacak tedarikçi (prefix veya ad)")
+    parser.add_argument("--chunk-size", type=int, default=500, help="Processer'a tek seferde verilecek kod sayısı")
+    parser.add_argument("--profile", nargs="?", const="./profiles", help="Her batch'i profille ve raporu bu dizine yaz")
+    parser.add_argument("--store", default=DEFAULT_STORE_PATH, help="Sonuçların yazılacağı ürün deposu")
+    parser.add_argument("--queue", help="Verilirse kodlar bu kuyruk üzerinden worker'lara dağıtılır (distributed worker)")
+    parser.add_argument("--task-size", type=int, default=100, help="--queue ile görev başına kod sayısı")
+    parser.add_argument("--diff", action="store_true", help="Sadece son export'tan beri yeni / değişmiş ürünleri ve silinenleri yaz")
+    parser.add_argument("--stream", action="store_true", help="--input sonuçlarını tedarikçi başına tek dosyaya, ürünler geldikçe yaz (bellek sınırlı)")
+    args = parser.parse_args()
+    if args.stream and (args.diff or args.queue):
+        parser.error("--stream can't be used with --diff or --queue")
+    return args
+
+
+def fetch(p:Processer, supplier:Suppliers, prestates:List[PreState], profile_store:Optional[ProfileStore] = None):
+    """get_with_code, profile_store verilirse profillenerek"""
+    if profile_store is None:
+        return p.get_with_code(supplier,*prestates)
+    with profile_store.profile(supplier.name):
+        return p.get_with_code(supplier,*prestates)
+
+
+def export_snapshot(supplier:Suppliers) -> ExportSnapshot:
+    """Tedarikçinin son diff export'unun satır hash'leri"""
+    return ExportSnapshot(f"./output/snapshots/{supplier.name}.json")
+
+
+def process_file(p:Processer, path:str, default_supplier, chunk_size:int, profile_store:Optional[ProfileStore] = None,
+                 diff:bool = False):
+    """Büyük kod dosyasını parça parça çekip her parçayı ayrı dosyaya kaydeder"""
+    ingestor = PreStateIngestor(path, default_supplier, chunk_size)
+    S = SaverLikeIkasTemplate()
+    counters = {}
+    # diff modunda tedarikçi başına snapshot ve dosyada görülen kodlar
+    snapshots, seen = {}, {}
+    for k, chunk in ingestor.iter_chunks():
+        n = counters[k] = counters.get(k, 0) + 1
+        products, failed_producuts = fetch(p, k, chunk, profile_store)
+        # depo sadece yan kayıt; snapshot tekrar eden kodları birleştirir ve sırayı korumaz, export çekilen listeden
+        rows = S.products_frame(products)
+        if diff:
+            if k not in snapshots:
+                snapshots[k], seen[k] = export_snapshot(k), set()
+            seen[k].update(str(code) for code in rows.get("urun_kodu", []))
+            # silinenler tüm parçalar bitince belli olur
+            S.export_diff(rows, snapshots[k], f"./output/diff_{k.value['name']}_{n:04d}.xlsx", static_values=STATIC_VALUES, full=False)
+        else:
+            S.write(S.fill_frame(rows,STATIC_VALUES),f"./output/success_{k.value['name']}_{n:04d}.xlsx")
+        S.write(S.fill(failed_producuts,STATIC_VALUES),f"./output/failed_{k.value['name']}_{n:04d}.xlsx")
+
+    for k, snapshot in snapshots.items():
+        removed = sorted(set(snapshot.keys()) - seen[k])
+        if removed and S.write(S.removed_frame(removed, snapshot), f"./output/removed_{k.value['name']}.xlsx"):
+            snapshot.discard(removed)
+            snapshot.save()
+    logging.info(f"Input processed: {ingestor.report}")
+
+
+def process_file_stream(p:Processer, path:str, default_supplier, chunk_size:int):
+    """
+    process_file'ın akış hali: her tedarikçi için tek başarılı / başarısız dosyası, ürünler çekildikçe yazılır.
+    Bellekte en fazla bir parça prestate ve bir yazım parçası tutulur
+    """
+    ingestor = PreStateIngestor(path, default_supplier, chunk_size)
+    S = SaverLikeIkasTemplate()
+    # tedarikçi -> {başarılı mı: yazıcı}
+    writers = {}
+    try:
+        for k, chunk in ingestor.iter_chunks():
+            if k not in writers:
+                writers[k] = {
+                    True: S.stream_writer(f"./output/success_{k.value['name']}.xlsx", STATIC_VALUES),
+                    False: S.stream_writer(f"./output/failed_{k.value['name']}.xlsx", STATIC_VALUES),
+                }
+            for _, product, success in p.iter_with_code(k, chunk):
+                writers[k][success].add(product)
+    finally:
+        for pair in writers.values():
+            for writer in pair.values():
+                writer.close()
+    logging.info(f"Input processed: {ingestor.report}")
+
+
 if __name__ == "__main__":
+    args = parse_args()
     Path("./output").mkdir(parents=True, exist_ok=True )
 
-    p = Processer()
-    
-    for k,v in prestates.items():
+    # warm-up işi çalıştıysa hazır veriyi kullan
+    load_shared()
+
+    image_verifier = None
+    if args.verify_images:
+        image_verifier = ImageVerifier(store_dir=args.image_store)
+
+    if args.queue:
+        # çekim worker process'lerinde, burada sadece görev dağıtımı ve birleştirme
+        p = Coordinator(SQLiteTaskQueue(args.queue), task_size=args.task_size, store=ProductStore(args.store))
+    else:
+        p = Processer(image_verifier=image_verifier, store=ProductStore(args.store))
+
+    # CLI'da aralık sınırı yok, her batch profillenir; pyinstrument yoksa cProfile ile (her çağrıyı izler)
+    profile_store = ProfileStore(args.profile, min_interval=0, allow_deterministic=True) if args.profile else None
+
+    if args.input:
+        default_supplier = find_supplier(args.supplier) if args.supplier else None
+        if args.stream:
+            process_file_stream(p, args.input, default_supplier, args.chunk_size)
+        else:
+            process_file(p, args.input, default_supplier, args.chunk_size, profile_store, args.diff)
+    else:
+        for k,v in prestates.items():
         
-        # ürün kodları ile birlikte ürünleri çek
-        products, failed_producuts = p.get_with_code(k,*v)
+            # ürün kodları ile birlikte ürünleri çek
+            products, failed_producuts = fetch(p, k, v, profile_store)
 
-        # İkas templatiyle frame oluştur
-        S = SaverLikeIkasTemplate(r"supplier_scrape_core\template\ikas-urunler.xlsx")
+            # İkas templatiyle frame oluştur
+            S = SaverLikeIkasTemplate()
         
-        # Başarıyla çekilmiş olanları ikas frame'ine doldur ve kaydet
-        S.fill(products,STATIC_VALUES,f"./output/success_{k.value["name"]}.xlsx")
+            # Başarıyla çekilmiş olanları ikas frame'ine doldur ve kaydet, diff modunda sadece değişenleri
+            if args.diff:
+                S.export_diff(S.products_frame(products), export_snapshot(k), f"./output/diff_{k.value['name']}.xlsx",
+                              f"./output/removed_{k.value['name']}.xlsx", STATIC_VALUES)
+            else:
+                S.write(S.fill(products,STATIC_VALUES),f"./output/success_{k.value['name']}.xlsx")
         
-        # Başarısız olanları ikas frame'inde doldur ve kaydet
-        S.fill(failed_producuts,STATIC_VALUES,f"./output/failed_{k.value["name"]}.xlsx")
\ No newline at end of file
+            # Başarısız olanları ikas frame'inde doldur ve kaydet
+            S.write(S.fill(failed_producuts,STATIC_VALUES),f"./output/failed_{k.value['name']}.xlsx")
+
+    if image_verifier is not None:
+        image_verifier.wait()
+        logging.info(f"Image verification: {image_verifier.stats()}")
+        for url in image_verifier.broken_urls():
+            logging.warning(f"Broken image url: {url}")
+        image_verifier.shutdown()
+
+    # aşama bazlı süreler
+    logging.info("Stage timings:\n" + metrics_registry.summary())
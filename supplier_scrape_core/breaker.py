@@ -0,0 +1,124 @@
+from typing import Dict, Optional
+import logging
+import os
+import threading
+import time
+from .structers.product import Suppliers
+
+"""
+Tedarikçi bazında devre kesici (circuit breaker).
+Site çöktüğünde her kod retry + backoff + timeout beklemesin diye arka arkaya `failure_threshold`
+erişim hatasından sonra devre açılır ve kalan kodlar ağa gitmeden başarısız sayılır. `reset_timeout`
+sonra yarı açık duruma geçilir, tek bir deneme (probe) isteği geçer; başarılıysa devre kapanır,
+değilse tekrar açılır. Ürünün bulunamaması hata sayılmaz, sadece bağlantı / zaman aşımı / 5xx / 429 / 403.
+"""
+
+STATE_CLOSED = "closed"
+STATE_OPEN = "open"
+STATE_HALF_OPEN = "half_open"
+
+DEFAULT_FAILURE_THRESHOLD = int(os.environ.get("SCRAPE_BREAKER_FAILURES", 3))
+DEFAULT_RESET_TIMEOUT = float(os.environ.get("SCRAPE_BREAKER_RESET", 30))
+
+
+class CircuitBreaker:
+    """Tek tedarikçinin devre durumu, thread-safe"""
+
+    def __init__(self, name: str, failure_threshold: int = DEFAULT_FAILURE_THRESHOLD,
+                 reset_timeout: float = DEFAULT_RESET_TIMEOUT):
+        """
+        Args:
+            name: Loglarda görünen ad
+            failure_threshold: Devreyi açan arka arkaya hata sayısı
+            reset_timeout: Açık devrenin yarı açığa geçip deneme isteğine izin vermesine kadar geçen süre (saniye)
+        """
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._lock = threading.Lock()
+        self.state = STATE_CLOSED
+        self.consecutive_failures = 0
+        self.opened_at: Optional[float] = None
+        # yarı açıkta uçuştaki deneme isteğinin başladığı an
+        self._probe_started: Optional[float] = None
+        self.opens = 0
+        self.rejected = 0
+        self.last_error: Optional[str] = None
+
+    def allow(self) -> bool:
+        """İstek gönderilebilir mi. Yarı açıkta aynı anda tek deneme isteğine izin verilir"""
+        with self._lock:
+            now = time.monotonic()
+            if self.state == STATE_CLOSED:
+                return True
+            if self.state == STATE_OPEN and now - self.opened_at >= self.reset_timeout:
+                self.state = STATE_HALF_OPEN
+                self._probe_started = None
+                logging.info(f"[{self.name}] Circuit half-open, probing")
+            if self.state == STATE_HALF_OPEN:
+                # sonucu hiç kaydedilmeyen deneme isteği devreyi kilitlemesin
+                if self._probe_started is None or now - self._probe_started >= self.reset_timeout:
+                    self._probe_started = now
+                    return True
+            self.rejected += 1
+            return False
+
+    def record_success(self):
+        with self._lock:
+            if self.state != STATE_CLOSED:
+                logging.info(f"[{self.name}] Circuit closed")
+            self.state = STATE_CLOSED
+            self.consecutive_failures = 0
+            self.opened_at = None
+            self._probe_started = None
+
+    def record_failure(self, error: Optional[str] = None):
+        with self._lock:
+            self.consecutive_failures += 1
+            self.last_error = error
+            if self.state == STATE_HALF_OPEN or (
+                    self.state == STATE_CLOSED and self.consecutive_failures >= self.failure_threshold):
+                self.state = STATE_OPEN
+                self.opened_at = time.monotonic()
+                self._probe_started = None
+                self.opens += 1
+                logging.warning(f"[{self.name}] Circuit open after {self.consecutive_failures} consecutive failures: {error}")
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            retry_in = None
+            if self.state == STATE_OPEN:
+                retry_in = round(max(self.reset_timeout - (time.monotonic() - self.opened_at), 0.0), 1)
+            return {
+                "state": self.state,
+                "consecutive_failures": self.consecutive_failures,
+                "retry_in": retry_in,
+                "opens": self.opens,
+                "rejected": self.rejected,
+                "last_error": self.last_error,
+            }
+
+
+class BreakerRegistry:
+    """Tedarikçi -> CircuitBreaker"""
+
+    def __init__(self, failure_threshold: int = DEFAULT_FAILURE_THRESHOLD, reset_timeout: float = DEFAULT_RESET_TIMEOUT):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._lock = threading.Lock()
+        self._breakers: Dict[Suppliers, CircuitBreaker] = {}
+
+    def get(self, supplier: Suppliers) -> CircuitBreaker:
+        with self._lock:
+            breaker = self._breakers.get(supplier)
+            if breaker is None:
+                breaker = self._breakers[supplier] = CircuitBreaker(supplier.name, self.failure_threshold, self.reset_timeout)
+            return breaker
+
+    def snapshot(self) -> Dict[str, Dict]:
+        """Tüm tedarikçilerin devre durumu, hiç istek görmeyenler kapalı"""
+        return {supplier.name: self.get(supplier).snapshot() for supplier in Suppliers}
+
+
+# Processer örnekleri arasında paylaşılan devreler
+shared_breakers = BreakerRegistry()
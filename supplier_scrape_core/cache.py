@@ -0,0 +1,286 @@
+from typing import Dict, Iterable, Optional
+from collections import OrderedDict
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from .structers.product import Product, Suppliers
+
+"""
+Process içi, istekler arasında paylaşılan ürün önbelleği.
+Ağ isteği ve BeautifulSoup parse işlemi yapılmadan sık sorulan kodların
+ürün bilgilerini döndürmek için kullanılır.
+"""
+
+# önbellekte tutulan alanlar. fiyat ve stok PreState'e ait olduğu için tutulmaz
+CACHED_FIELDS = ("urun_ismi", "kategori", "kategori_url", "gorsel_url", "aciklama", "puan")
+
+
+def make_key(supplier: Suppliers, code) -> int:
+    """Tedarikçi prefix'i eklenmiş ürün kodu (Product.urun_kodu ile aynı biçim)"""
+    return int("".join([supplier.value["prefix"], str(code).strip()]))
+
+
+class ProductCache:
+    """TTL ve girdi/byte sınırlı, thread-safe LRU ürün önbelleği"""
+
+    def __init__(self, max_entries: int = 10000, max_bytes: int = 64 * 1024 * 1024, ttl: float = 6 * 3600):
+        """
+        Args:
+            max_entries: Tutulacak en fazla ürün sayısı
+            max_bytes: Tahmini en fazla bellek kullanımı (byte)
+            ttl: Girdilerin geçerlilik süresi (saniye)
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+
+        self._lock = threading.Lock()
+        # key -> (expires_at, supplier, code, fields, size)
+        self._data: "OrderedDict[int, tuple]" = OrderedDict()
+        self._bytes = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    @staticmethod
+    def _estimate_size(fields: Dict) -> int:
+        return sum(sys.getsizeof(v) for v in fields.values()) + sys.getsizeof(fields)
+
+    def _remove(self, key: int):
+        entry = self._data.pop(key)
+        self._bytes -= entry[4]
+
+    def get(self, supplier: Suppliers, code) -> Optional[Product]:
+        """Önbellekte varsa yeni bir Product döndürür, yoksa veya süresi dolmuşsa None"""
+        key = make_key(supplier, code)
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            if entry[0] < time.monotonic():
+                self._remove(key)
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            fields = entry[3]
+
+        # her çağırana kendi nesnesi verilir, fiyat/stok güvenle atanabilir
+        return Product(urun_kodu=code, marka=supplier, **fields)
+
+    def put(self, supplier: Suppliers, code, product: Product):
+        """Arama kodu ile çekilmiş ürünü önbelleğe ekler"""
+        key = make_key(supplier, code)
+        fields = {k: getattr(product, k) for k in CACHED_FIELDS}
+        size = self._estimate_size(fields)
+        if size > self.max_bytes:
+            return
+
+        with self._lock:
+            if key in self._data:
+                self._remove(key)
+            self._data[key] = (time.monotonic() + self.ttl, supplier, str(code).strip(), fields, size)
+            self._bytes += size
+
+            # LRU sırasıyla sınırların altına inene kadar çıkar
+            while self._data and (len(self._data) > self.max_entries or self._bytes > self.max_bytes):
+                oldest = next(iter(self._data))
+                self._remove(oldest)
+                self.evictions += 1
+
+    def invalidate(self, supplier: Optional[Suppliers] = None, codes: Optional[Iterable] = None) -> int:
+        """
+        Önbellekten girdi siler
+
+        Args:
+            supplier: Verilirse sadece bu tedarikçinin girdileri
+            codes: Verilirse sadece bu kodlar. supplier olmadan verilirse ValueError
+
+        Returns:
+            Silinen girdi sayısı
+        """
+        if codes is not None and supplier is None:
+            # kod tek başına tedarikçi belirtmez, tüm önbellek yanlışlıkla silinmesin
+            raise ValueError("codes requires supplier")
+        with self._lock:
+            if codes is not None:
+                keys = [make_key(supplier, c) for c in codes]
+            elif supplier is not None:
+                keys = [k for k, v in self._data.items() if v[1] == supplier]
+            else:
+                keys = list(self._data.keys())
+
+            removed = 0
+            for key in keys:
+                if key in self._data:
+                    self._remove(key)
+                    removed += 1
+            return removed
+
+    def stats(self) -> Dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            per_supplier = {}
+            for v in self._data.values():
+                per_supplier[v[1].name] = per_supplier.get(v[1].name, 0) + 1
+            return {
+                "entries": len(self._data),
+                "bytes": self._bytes,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "per_supplier": per_supplier,
+            }
+
+    def __len__(self):
+        return len(self._data)
+
+    def dump(self, path: str) -> int:
+        """Süresi dolmamış girdileri JSON dosyasına yazar. Yazılan girdi sayısını döndürür"""
+        now_mono, now_wall = time.monotonic(), time.time()
+        with self._lock:
+            entries = [
+                {
+                    "supplier": v[1].name,
+                    "code": v[2],
+                    "fields": v[3],
+                    # monotonic zaman process'e özel, dosyaya duvar saati yazılır
+                    "expires_at": now_wall + (v[0] - now_mono),
+                }
+                for v in self._data.values() if v[0] > now_mono
+            ]
+        _atomic_write_json(path, entries)
+        return len(entries)
+
+    def load(self, path: str) -> int:
+        """dump ile yazılmış dosyadan girdileri yükler. Yüklenen girdi sayısını döndürür"""
+        if not os.path.exists(path):
+            return 0
+        with open(path, encoding="utf-8") as f:
+            entries = json.load(f)
+
+        now_wall = time.time()
+        loaded = 0
+        for entry in entries:
+            remaining = entry["expires_at"] - now_wall
+            if remaining <= 0:
+                continue
+            supplier = Suppliers[entry["supplier"]]
+            key = make_key(supplier, entry["code"])
+            fields = entry["fields"]
+            size = self._estimate_size(fields)
+            with self._lock:
+                if key in self._data:
+                    self._remove(key)
+                self._data[key] = (time.monotonic() + remaining, supplier, entry["code"], fields, size)
+                self._bytes += size
+                while len(self._data) > self.max_entries or self._bytes > self.max_bytes:
+                    self._remove(next(iter(self._data)))
+                    self.evictions += 1
+            loaded += 1
+        return loaded
+
+
+class LinkIndex:
+    """
+    Ürün kodu -> ürün sayfası linki eşlemesi.
+    Link biliniyorsa arama sayfası isteği atlanır.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._links: Dict[int, str] = {}
+        # link -> key, sitemap keşfinde bilinen adresleri ayırmak için
+        self._keys: Dict[str, int] = {}
+
+    def get(self, supplier: Suppliers, code) -> Optional[str]:
+        with self._lock:
+            return self._links.get(make_key(supplier, code))
+
+    def _set(self, key: int, link: str):
+        old = self._links.get(key)
+        if old is not None and self._keys.get(old) == key:
+            del self._keys[old]
+        self._links[key] = link
+        self._keys[link] = key
+
+    def put(self, supplier: Suppliers, code, link: str):
+        with self._lock:
+            self._set(make_key(supplier, code), link)
+
+    def discard(self, supplier: Suppliers, code):
+        with self._lock:
+            link = self._links.pop(make_key(supplier, code), None)
+            if link is not None:
+                self._keys.pop(link, None)
+
+    def knows(self, link: str) -> bool:
+        """Link herhangi bir koda bağlı mı"""
+        with self._lock:
+            return link in self._keys
+
+    def __len__(self):
+        return len(self._links)
+
+    def dump(self, path: str) -> int:
+        with self._lock:
+            links = {str(k): v for k, v in self._links.items()}
+        _atomic_write_json(path, links)
+        return len(links)
+
+    def load(self, path: str) -> int:
+        if not os.path.exists(path):
+            return 0
+        with open(path, encoding="utf-8") as f:
+            links = json.load(f)
+        with self._lock:
+            for k, v in links.items():
+                self._set(int(k), v)
+        return len(links)
+
+
+def _atomic_write_json(path: str, data):
+    """Okuyan process yarım dosya görmesin diye geçici dosyaya yazıp yer değiştirir"""
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+
+# backend istekleri arasında paylaşılan varsayılan önbellek ve link indeksi
+shared_cache = ProductCache()
+shared_link_index = LinkIndex()
+
+# warm-up işinin yazdığı, backend/GUI'nin başlangıçta okuduğu dizin
+DEFAULT_CACHE_DIR = os.environ.get("SCRAPE_CACHE_DIR", "./cache")
+
+
+def load_shared(cache_dir: str = DEFAULT_CACHE_DIR):
+    """Paylaşılan önbellek ve link indeksini diskteki warm-up verisiyle doldurur"""
+    try:
+        products = shared_cache.load(os.path.join(cache_dir, "products.json"))
+        links = shared_link_index.load(os.path.join(cache_dir, "links.json"))
+        logging.info(f"Warm data loaded from {cache_dir}: {products} products, {links} links")
+    except Exception as e:
+        logging.error(f"Warm data could'nt load from {cache_dir}: {e}")
+
+
+def save_shared(cache_dir: str = DEFAULT_CACHE_DIR):
+    """Paylaşılan önbellek ve link indeksini diske yazar"""
+    products = shared_cache.dump(os.path.join(cache_dir, "products.json"))
+    links = shared_link_index.dump(os.path.join(cache_dir, "links.json"))
+    logging.info(f"Warm data saved to {cache_dir}: {products} products, {links} links")
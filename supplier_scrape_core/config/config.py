@@ -0,0 +1 @@
+STATIC_VALUES = {"Tip": "PHYSICAL"}
@@ -0,0 +1,287 @@
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
+import logging
+import os
+import socket
+import threading
+import time
+from urllib.parse import urlsplit
+from .structers.product import Suppliers
+
+if TYPE_CHECKING:
+    import requests
+
+"""
+Tedarikçi host'larına bağlantı ön ısıtma ve DNS önbelleği.
+Bir batch'teki ilk istek DNS çözümleme, TCP ve TLS el sıkışmasını bekler; küçük interaktif batch'lerde
+bu süre toplamın büyük kısmıdır. Processer'lar paylaşılan session havuzlarını kullanır, backend açılışta
+host'ları çözüp bu havuzlarda bağlantı açar ve keep-alive için aralıklarla HEAD isteği atar.
+DNS sonuçları TTL ile önbelleklenir.
+
+    python -m supplier_scrape_core.connections                 # soğuk / sıcak ilk byte süresi raporu
+    python -m supplier_scrape_core.connections --samples 5 --output first_byte.json
+"""
+
+DEFAULT_DNS_TTL = float(os.environ.get("SCRAPE_DNS_TTL", 300))
+DEFAULT_POOL_SIZE = int(os.environ.get("SCRAPE_POOL_SIZE", 16))
+DEFAULT_KEEPALIVE_INTERVAL = float(os.environ.get("SCRAPE_KEEPALIVE_INTERVAL", 30))
+
+SESSION_SEARCH = "search"
+SESSION_PRODUCT = "product"
+# havuz anahtarı sertifika doğrulamasını da içerir, ısıtma gerçek isteklerle aynı verify ile yapılmalı
+SESSION_VERIFY = {SESSION_SEARCH: False, SESSION_PRODUCT: True}
+
+
+class DNSCache:
+    """TTL'li getaddrinfo önbelleği. install() ile process genelinde socket.getaddrinfo yerine geçer"""
+
+    def __init__(self, ttl: float = DEFAULT_DNS_TTL):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries: Dict[tuple, Tuple[float, list]] = {}
+        self._original = None
+        self.hits = 0
+        self.misses = 0
+
+    def getaddrinfo(self, host, port, family=0, type=0, proto=0, flags=0):
+        key = (host, port, family, type, proto, flags)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > now:
+                self.hits += 1
+                return list(entry[1])
+        # hata (gaierror) önbelleğe alınmaz, bir sonraki istek tekrar dener
+        result = (self._original or socket.getaddrinfo)(host, port, family, type, proto, flags)
+        with self._lock:
+            self.misses += 1
+            self._entries[key] = (now + self.ttl, result)
+        return list(result)
+
+    def resolve(self, host: str, port: int) -> list:
+        """urllib3'ün bağlantı açarken kullandığı anahtarla çözer, böylece önbellek isabet eder"""
+        from urllib3.util.connection import allowed_gai_family
+        return self.getaddrinfo(host, port, allowed_gai_family(), socket.SOCK_STREAM)
+
+    def install(self):
+        if self._original is None:
+            self._original = socket.getaddrinfo
+            socket.getaddrinfo = self.getaddrinfo
+
+    def uninstall(self):
+        if self._original is not None:
+            socket.getaddrinfo = self._original
+            self._original = None
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses, "ttl": self.ttl}
+
+
+# process genelinde paylaşılan DNS önbelleği ve session havuzları
+dns_cache = DNSCache()
+_sessions: Dict[str, "requests.Session"] = {}
+_sessions_lock = threading.Lock()
+
+
+def _create_session(kind: str, pool_size: int) -> "requests.Session":
+    if kind == SESSION_SEARCH:
+        from .processer import create_session_with_retries
+        return create_session_with_retries(pool_maxsize=pool_size)
+    # ürün sayfaları retry'sız çekilir (ProductScraper davranışı), sadece bağlantılar paylaşılır
+    import requests
+    from requests.adapters import HTTPAdapter
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=len(Suppliers), pool_maxsize=pool_size)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def shared_session(kind: str = SESSION_SEARCH, pool_size: int = DEFAULT_POOL_SIZE) -> "requests.Session":
+    """
+    Processer örnekleri arasında paylaşılan session, bağlantılar istekler ve batch'ler arasında açık kalır
+
+    Args:
+        kind: SESSION_SEARCH (retry'lı arama) veya SESSION_PRODUCT (ürün sayfası)
+        pool_size: Host başına açık tutulacak en fazla bağlantı
+    """
+    with _sessions_lock:
+        session = _sessions.get(kind)
+        if session is None:
+            session = _sessions[kind] = _create_session(kind, pool_size)
+        return session
+
+
+def supplier_hosts() -> List[str]:
+    """Suppliers arama adreslerindeki (SCRAPE_SUPPLIER_BASE_URL dahil) tekil host kökleri"""
+    from .processer import search_link_template
+    hosts = []
+    for supplier in Suppliers:
+        parts = urlsplit(search_link_template(supplier))
+        root = f"{parts.scheme}://{parts.netloc}/"
+        if root not in hosts:
+            hosts.append(root)
+    return hosts
+
+
+def first_byte(session: "requests.Session", url: str, verify: bool = True, timeout: float = 5) -> Optional[float]:
+    """HEAD isteğinin başlıkları gelene kadar geçen süre (saniye), bağlantı kurulumu dahil. Hatada None"""
+    start = time.perf_counter()
+    try:
+        response = session.head(url, timeout=timeout, verify=verify, allow_redirects=False)
+    except Exception as e:
+        logging.warning(f"First byte fail {url}: {e}")
+        return None
+    elapsed = time.perf_counter() - start
+    # gövdesiz cevap, bağlantı havuza geri döner
+    response.close()
+    return elapsed
+
+
+class ConnectionWarmer:
+    """Host'ları önceden çözer, paylaşılan havuzlarda bağlantı açar ve aralıklarla canlı tutar"""
+
+    def __init__(self, hosts: Optional[List[str]] = None, kinds: Tuple[str, ...] = (SESSION_SEARCH, SESSION_PRODUCT),
+                 dns: Optional[DNSCache] = None, interval: float = DEFAULT_KEEPALIVE_INTERVAL, timeout: float = 5):
+        """
+        Args:
+            hosts: Isıtılacak kök adresler, verilmezse supplier_hosts()
+            kinds: Isıtılacak paylaşılan session'lar
+            dns: DNS önbelleği, verilmezse paylaşılan önbellek
+            interval: Keep-alive aralığı (saniye), sunucuların boşta bağlantı kapatma süresinden kısa olmalı
+            timeout: Isıtma isteği zaman aşımı (saniye)
+        """
+        self.hosts = hosts if hosts is not None else supplier_hosts()
+        self.kinds = kinds
+        self.dns = dns if dns is not None else dns_cache
+        self.interval = interval
+        self.timeout = timeout
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        # host -> son ısıtma sonucu
+        self.last: Dict[str, Dict] = {}
+        self.rounds = 0
+
+    def warm_host(self, url: str) -> Dict:
+        parts = urlsplit(url)
+        port = parts.port or (443 if parts.scheme == "https" else 80)
+        result = {"resolve_ms": None, "at": time.time()}
+        start = time.perf_counter()
+        try:
+            self.dns.resolve(parts.hostname, port)
+            result["resolve_ms"] = round((time.perf_counter() - start) * 1000, 2)
+        except OSError as e:
+            logging.warning(f"DNS resolve fail {parts.hostname}: {e}")
+            result["error"] = str(e)
+            return result
+        for kind in self.kinds:
+            elapsed = first_byte(shared_session(kind), url, SESSION_VERIFY[kind], self.timeout)
+            result[f"{kind}_first_byte_ms"] = round(elapsed * 1000, 2) if elapsed is not None else None
+        return result
+
+    def warm(self) -> Dict[str, Dict]:
+        """Tüm host'ları bir kez ısıtır"""
+        # ilk turda urllib3 import süresi resolve_ms'e karışmasın
+        import urllib3.util.connection
+        results = {url: self.warm_host(url) for url in self.hosts}
+        with self._lock:
+            self.last.update(results)
+            self.rounds += 1
+        logging.debug(f"Connections warmed: {results}")
+        return results
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.warm()
+            except Exception as e:
+                logging.error(f"Connection warm fail: {e}")
+            self._stop.wait(self.interval)
+
+    def start(self) -> "ConnectionWarmer":
+        """Arka planda hemen ısıtır, sonra interval aralıklarla tekrarlar"""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="connection-warmer", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(self.timeout * 2)
+            self._thread = None
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {"rounds": self.rounds, "interval": self.interval, "hosts": dict(self.last), "dns": self.dns.stats()}
+
+
+def first_byte_report(hosts: Optional[List[str]] = None, samples: int = 3, timeout: float = 5) -> Dict[str, Dict]:
+    """
+    Host başına soğuk (DNS + TCP + TLS + ilk byte) ve sıcak (önbellekli DNS, açık bağlantı) ilk byte süresi.
+    Her örnekte soğuk ölçüm yeni session ve boş DNS önbelleğiyle yapılır
+
+    Returns:
+        {host: {"cold_ms", "warm_ms", "saved_ms"}}, ölçülemeyen değerler None
+    """
+    import statistics
+    from .processer import create_session_with_retries
+
+    report = {}
+    dns = DNSCache()
+    dns.install()
+    try:
+        for url in hosts if hosts is not None else supplier_hosts():
+            cold, warm = [], []
+            for _ in range(samples):
+                dns.clear()
+                session = create_session_with_retries()
+                elapsed = first_byte(session, url, False, timeout)
+                if elapsed is not None:
+                    cold.append(elapsed)
+                    # aynı session'da bağlantı açık, DNS önbellekte
+                    elapsed = first_byte(session, url, False, timeout)
+                    if elapsed is not None:
+                        warm.append(elapsed)
+                session.close()
+            cold_ms = round(statistics.median(cold) * 1000, 2) if cold else None
+            warm_ms = round(statistics.median(warm) * 1000, 2) if warm else None
+            report[url] = {
+                "cold_ms": cold_ms,
+                "warm_ms": warm_ms,
+                "saved_ms": round(cold_ms - warm_ms, 2) if cold and warm else None,
+                "samples": len(cold),
+            }
+    finally:
+        dns.uninstall()
+    return report
+
+
+def main(argv: Optional[List[str]] = None):
+    import argparse
+    import json
+
+    parser = argparse.ArgumentParser(description="Tedarikçi host'ları için soğuk / sıcak ilk byte süresi")
+    parser.add_argument("--host", action="append", help="Ölçülecek kök adres, verilmezse tüm tedarikçiler")
+    parser.add_argument("--samples", type=int, default=3)
+    parser.add_argument("--timeout", type=float, default=5)
+    parser.add_argument("--output", help="Sonucun yazılacağı json dosyası")
+    args = parser.parse_args(argv)
+
+    from .logs import setup_logging
+    setup_logging()
+    report = first_byte_report(args.host, args.samples, args.timeout)
+    for url, row in report.items():
+        print(f"{url:50s} cold {row['cold_ms']} ms  warm {row['warm_ms']} ms  saved {row['saved_ms']} ms")
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
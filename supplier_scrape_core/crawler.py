@@ -0,0 +1,268 @@
+from typing import TYPE_CHECKING, List, Optional, Tuple
+from collections import deque
+from urllib.parse import urljoin, urlsplit, urlunsplit, parse_qsl, urlencode
+import argparse
+import logging
+import re
+from .cache import ProductCache, LinkIndex, shared_cache, shared_link_index, save_shared, load_shared, DEFAULT_CACHE_DIR
+from .ingest import find_supplier
+from .logs import setup_logging
+from .metrics import span
+from .processer import create_session_with_retries, supplier_base_url
+from .ratelimit import HostRateLimiter
+from .store import ProductStore, DEFAULT_STORE_PATH
+from .structers.product import Product, Suppliers
+
+if TYPE_CHECKING:
+    from bs4 import BeautifulSoup
+
+"""
+Tedarikçi kategori ağacını gezerek ürünleri toplu toplayan crawler.
+Liste sayfalarındaki her ürün kartından kod, isim, görsel ve link alınır; kod -> link indeksi ve
+ürün önbelleği (ve verilirse ürün deposu) doldurulur. Tüm katalog binlerce arama + detay isteği yerine birkaç yüz liste isteğiyle yüklenir.
+
+    python -m supplier_scrape_core.crawler --supplier 11 --interval 1.0
+    python -m supplier_scrape_core.crawler --supplier 12 --category https://www.toptanbebegiyim.com/tr/category/zibin--40
+"""
+
+CATEGORY_LINK = re.compile(r"/category/")
+
+
+class CrawlReport:
+    def __init__(self):
+        self.categories = 0
+        self.pages = 0
+        self.products = 0
+        self.new_links = 0
+        self.skipped_cards = 0
+        self.errors = 0
+
+    def to_dict(self):
+        return dict(self.__dict__)
+
+    def __repr__(self):
+        return (f"CrawlReport categories={self.categories} pages={self.pages} products={self.products} "
+                f"new_links={self.new_links} skipped_cards={self.skipped_cards} errors={self.errors}")
+
+
+def _normalize(url: str) -> str:
+    """Sayfa parametresi ve fragment olmadan kategori adresi, ziyaret kontrolü için"""
+    parts = urlsplit(url)
+    query = [(k, v) for k, v in parse_qsl(parts.query) if k.lower() not in ("page", "sayfa")]
+    return urlunsplit((parts.scheme, parts.netloc, parts.path.rstrip("/"), urlencode(query), ""))
+
+
+class CategoryCrawler:
+    """Bir tedarikçinin kategori liste sayfalarını sayfalamasıyla birlikte gezer"""
+
+    def __init__(self, supplier: Suppliers, cache: Optional[ProductCache] = None, link_index: Optional[LinkIndex] = None,
+                 rate_limiter: Optional[HostRateLimiter] = None, max_pages: int = 200, max_categories: Optional[int] = None,
+                 timeout: float = 15, store: Optional[ProductStore] = None):
+        """
+        Args:
+            supplier: Gezilecek tedarikçi
+            cache: Kartlardan oluşturulan ürünlerin yazılacağı önbellek, verilmezse paylaşılan önbellek
+            link_index: Kod -> ürün linki indeksi, verilmezse paylaşılan indeks
+            rate_limiter: Verilirse her istekten önce host bazında beklenir
+            max_pages: Tek kategoride gidilecek en fazla sayfa
+            max_categories: Gezilecek en fazla kategori, None ise sınırsız
+            timeout: İstek zaman aşımı (saniye)
+            store: Verilirse her liste sayfasının kartları depoya toplu yazılır
+        """
+        self.supplier = supplier
+        self.cache = cache if cache is not None else shared_cache
+        self.link_index = link_index if link_index is not None else shared_link_index
+        self.rate_limiter = rate_limiter
+        self.max_pages = max_pages
+        self.max_categories = max_categories
+        self.timeout = timeout
+        self.session = create_session_with_retries()
+        self.store = store
+        self._scrape_id = None
+        self.report = CrawlReport()
+
+    def _get(self, url: str) -> Optional[str]:
+        if self.rate_limiter is not None:
+            self.rate_limiter.wait(url)
+        try:
+            with span("listing_fetch", self.supplier):
+                response = self.session.get(url, timeout=self.timeout, verify=False)
+        except Exception as e:
+            logging.error(f"[{self.supplier.name}] Listing fetch fail {url}: {e}")
+            self.report.errors += 1
+            return None
+        if response.status_code != 200:
+            logging.error(f"[{self.supplier.name}] Listing fetch status {response.status_code}: {url}")
+            self.report.errors += 1
+            return None
+        return response.text
+
+    def discover_categories(self) -> List[str]:
+        """Ana sayfadaki menüden kategori adreslerini toplar"""
+        home = supplier_base_url(self.supplier) + "/"
+        html = self._get(home)
+        if html is None:
+            return []
+        from bs4 import BeautifulSoup
+        soup = BeautifulSoup(html, "html.parser")
+        return self._category_links(soup, home)
+
+    @staticmethod
+    def _category_links(soup: "BeautifulSoup", page_url: str) -> List[str]:
+        links, seen = [], set()
+        for a in soup.find_all("a", href=CATEGORY_LINK):
+            url = _normalize(urljoin(page_url, a["href"]))
+            if url not in seen:
+                seen.add(url)
+                links.append(url)
+        return links
+
+    @staticmethod
+    def _card_code(card) -> Optional[str]:
+        """
+        Kartın ürün kodu, sadece kart içeriğinden alınır. Linkteki sayılar (veritabanı id'si, tarih) koda
+        benzeyebilir; yanlış kodla önbelleğe / indekse yazılan kart o koddaki aramaları bozar, bu yüzden kart atlanır
+        """
+        for selector in (".pro-code", ".pro-detail-urun-kodu", "[data-code]"):
+            element = card.select_one(selector)
+            if element is not None:
+                code = element.get("data-code") or element.get_text(strip=True)
+                if code and code.isdigit():
+                    return code
+        return None
+
+    def parse_listing(self, html: str, page_url: str) -> Tuple[List[Tuple[str, str, Product]], List[str], Optional[str]]:
+        """
+        Liste sayfasını ayrıştırır
+
+        Returns:
+            ([(kod, ürün linki, Product)], sayfadaki kategori linkleri, sonraki sayfa adresi veya None)
+        """
+        from bs4 import BeautifulSoup
+        soup = BeautifulSoup(html, "html.parser")
+
+        heading = soup.find("h1")
+        category = heading.get_text(strip=True) if heading else None
+        category_url = _normalize(page_url)
+
+        items = []
+        for card in soup.select("div.pro.card"):
+            code = self._card_code(card)
+            link = card.find("a", href=True)
+            if code is None or link is None:
+                self.report.skipped_cards += 1
+                continue
+            image = card.find("img", class_="mainImg") or card.find("img")
+            name = card.select_one(".pro-name")
+            product = Product(
+                urun_kodu=code,
+                urun_ismi=name.get_text(strip=True) if name else (image.get("alt") if image else None),
+                kategori=category,
+                kategori_url=category_url,
+                gorsel_url=(image.get("data-src") or image.get("src")) if image else None,
+                marka=self.supplier
+            )
+            items.append((code, urljoin(page_url, link["href"]), product))
+
+        next_link = soup.find("a", rel="next", href=True) or soup.select_one(".pagination .next a[href]")
+        next_url = urljoin(page_url, next_link["href"]) if next_link else None
+        return items, self._category_links(soup, page_url), next_url
+
+    def crawl_category(self, url: str) -> List[str]:
+        """
+        Kategoriyi sayfa sayfa gezer, kartları indekse ve önbelleğe yazar
+
+        Returns:
+            Sayfalarda görülen (alt) kategori linkleri
+        """
+        found_links: List[str] = []
+        seen_codes = set()
+        page_url, pages = url, 0
+        while page_url and pages < self.max_pages:
+            html = self._get(page_url)
+            if html is None:
+                break
+            pages += 1
+            self.report.pages += 1
+
+            with span("listing_parse", self.supplier):
+                items, links, next_url = self.parse_listing(html, page_url)
+            found_links.extend(links)
+
+            new_products = []
+            for code, link, product in items:
+                if code in seen_codes:
+                    continue
+                seen_codes.add(code)
+                new_products.append(product)
+                if self.link_index.get(self.supplier, code) != link:
+                    self.report.new_links += 1
+                self.link_index.put(self.supplier, code, link)
+                self.cache.put(self.supplier, code, product)
+            new_codes = len(new_products)
+            self.report.products += new_codes
+            if self.store is not None and new_products:
+                self.store.upsert(new_products, self._scrape_id)
+
+            # sayfalama aynı sayfayı döndürmeye başladıysa dur
+            if not new_codes:
+                break
+            page_url = next_url
+        logging.info(f"[{self.supplier.name}] {url}: {len(seen_codes)} products in {pages} pages")
+        return found_links
+
+    def crawl(self, category_urls: Optional[List[str]] = None) -> CrawlReport:
+        """
+        Kategori ağacını genişlik öncelikli gezer. Adres verilmezse ana sayfa menüsünden başlar,
+        liste sayfalarında görülen alt kategoriler de kuyruğa eklenir
+        """
+        if self.store is not None:
+            self._scrape_id = self.store.begin_scrape(self.supplier, "crawl")
+        start = [_normalize(url) for url in category_urls] if category_urls else self.discover_categories()
+        queue = deque(start)
+        visited = set(start)
+        while queue:
+            if self.max_categories is not None and self.report.categories >= self.max_categories:
+                break
+            url = queue.popleft()
+            self.report.categories += 1
+            for link in self.crawl_category(url):
+                if link not in visited:
+                    visited.add(link)
+                    queue.append(link)
+        if self.store is not None:
+            self.store.finish_scrape(self._scrape_id, self.report.products)
+        logging.info(f"[{self.supplier.name}] Crawl finished: {self.report}")
+        return self.report
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Tedarikçi kategori sayfalarından toplu ürün toplama")
+    parser.add_argument("--supplier", required=True, help="Tedarikçi (prefix veya ad)")
+    parser.add_argument("--category", action="append", help="Başlangıç kategori adresi, verilmezse ana sayfa menüsü kullanılır")
+    parser.add_argument("--max-pages", type=int, default=200, help="Kategori başına en fazla sayfa")
+    parser.add_argument("--max-categories", type=int, help="En fazla kategori")
+    parser.add_argument("--interval", type=float, default=1.0, help="Host başına istekler arası en kısa süre (saniye)")
+    parser.add_argument("--cache-dir", default=DEFAULT_CACHE_DIR)
+    parser.add_argument("--store", default=DEFAULT_STORE_PATH, help="Ürünlerin yazılacağı depo")
+    args = parser.parse_args(argv)
+
+    setup_logging()
+    supplier = find_supplier(args.supplier)
+    if supplier is None:
+        parser.error(f"Invalid supplier: {args.supplier}")
+
+    load_shared(args.cache_dir)
+    crawler = CategoryCrawler(
+        supplier,
+        rate_limiter=HostRateLimiter(args.interval),
+        max_pages=args.max_pages,
+        max_categories=args.max_categories,
+        store=ProductStore(args.store),
+    )
+    crawler.crawl(args.category)
+    save_shared(args.cache_dir)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,494 @@
+from typing import Callable, Dict, List, Optional, Tuple, TYPE_CHECKING
+import argparse
+import json
+import logging
+import multiprocessing
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from .structers.product import Product, PreState, Suppliers
+
+if TYPE_CHECKING:
+    from .processer import Processer
+    from .store import ProductStore
+
+"""
+Birden fazla process / makineye dağıtılmış scrape.
+Coordinator PreState listesini görevlere böler ve kuyruğa yazar; worker'lar görevi kiralar (lease),
+Processer ile çeker ve sonucu yazar. Kuyruk paylaşılan bir SQLite dosyasıdır (yerel test ve tek
+makinede çok process için; makineler arası ortak diskte de çalışır).
+
+Exactly-once: Sonuç sadece görevi o an kiralamış olan lease token'ı ile kabul edilir. Kira süresi
+dolup başka worker'a verilmiş bir görevin geç gelen sonucu reddedilir ve late_results'a sayılır.
+Deneme hakkı biten görevlerin kodları başarısız sayılır; her kod sonuçta tam bir kez yer alır.
+
+    python -m supplier_scrape_core.distributed worker --queue ./queue/tasks.db --processes 4 --interval 1.0
+    python main.py --queue ./queue/tasks.db
+"""
+
+DEFAULT_QUEUE_PATH = os.environ.get("SCRAPE_QUEUE_PATH", "./queue/tasks.db")
+
+TASK_PENDING = "pending"
+TASK_LEASED = "leased"
+TASK_DONE = "done"
+TASK_FAILED = "failed"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS tasks (
+    id TEXT PRIMARY KEY,
+    job_id TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    supplier TEXT NOT NULL,
+    prestates TEXT NOT NULL,
+    status TEXT NOT NULL,
+    attempts INTEGER DEFAULT 0,
+    token TEXT,
+    worker TEXT,
+    lease_expires REAL,
+    result TEXT,
+    error TEXT,
+    late_results INTEGER DEFAULT 0,
+    created_at REAL NOT NULL,
+    finished_at REAL
+);
+CREATE INDEX IF NOT EXISTS idx_tasks_status ON tasks (status, created_at, seq);
+CREATE INDEX IF NOT EXISTS idx_tasks_job ON tasks (job_id, seq);
+"""
+
+
+def product_to_row(product: Product) -> Dict:
+    # serialize() "-" ayraçlı, isimlerde "-" olabileceği için JSON kullanılır
+    return product.to_dict()
+
+
+def product_from_row(row: Dict, supplier: Suppliers) -> Product:
+    fields = {k: v for k, v in row.items() if k not in ("urun_kodu", "marka")}
+    return Product(urun_kodu=str(row["urun_kodu"])[len(supplier.value["prefix"]):], marka=supplier, **fields)
+
+
+class Task:
+    def __init__(self, id: str, job_id: str, seq: int, supplier: Suppliers, prestates: List[PreState],
+                 attempts: int, token: str):
+        self.id = id
+        self.job_id = job_id
+        self.seq = seq
+        self.supplier = supplier
+        self.prestates = prestates
+        self.attempts = attempts
+        self.token = token
+
+    def __repr__(self):
+        return f"Task {self.job_id}/{self.seq} {self.supplier.name} {len(self.prestates)} codes (attempt {self.attempts})"
+
+
+class SQLiteTaskQueue:
+    """Process'ler ve makineler arasında paylaşılan, lease tabanlı görev kuyruğu"""
+
+    def __init__(self, path: str = DEFAULT_QUEUE_PATH, max_attempts: int = 3, busy_timeout: float = 30):
+        """
+        Args:
+            path: Kuyruk veritabanı dosyası
+            max_attempts: Bir görevin en fazla kiralanma sayısı, sonra başarısız sayılır
+            busy_timeout: Kilitli veritabanında beklenecek en uzun süre (saniye)
+        """
+        self.path = path
+        self.max_attempts = max_attempts
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._lock = threading.Lock()
+        # transaction'lar elle açılır (BEGIN IMMEDIATE), lease yarışları yazma kilidiyle çözülür
+        self._conn = sqlite3.connect(path, timeout=busy_timeout, isolation_level=None, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(SCHEMA)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def _transaction(self, fn: Callable):
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                result = fn(self._conn)
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+            return result
+
+    def create_job(self, supplier: Suppliers, batches: List[List[PreState]]) -> str:
+        """Her batch bir görev olarak kuyruğa yazılır. Job id döndürür"""
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        rows = [
+            (f"{job_id}-{seq}", job_id, seq, supplier.name, json.dumps([dict(p) for p in batch]), TASK_PENDING, now)
+            for seq, batch in enumerate(batches)
+        ]
+        self._transaction(lambda conn: conn.executemany(
+            "INSERT INTO tasks (id, job_id, seq, supplier, prestates, status, created_at) VALUES (?, ?, ?, ?, ?, ?, ?)",
+            rows
+        ))
+        return job_id
+
+    def lease(self, worker: str, lease_seconds: float = 300) -> Optional[Task]:
+        """Bekleyen veya kirası dolmuş en eski görevi kiralar, yoksa None"""
+        def _lease(conn):
+            now = time.time()
+            # deneme hakkı biten ve kirası dolan görevler bırakılır
+            conn.execute(
+                "UPDATE tasks SET status = ?, error = 'lease expired', finished_at = ? "
+                "WHERE status = ? AND lease_expires < ? AND attempts >= ?",
+                (TASK_FAILED, now, TASK_LEASED, now, self.max_attempts)
+            )
+            row = conn.execute(
+                "SELECT id, job_id, seq, supplier, prestates, attempts FROM tasks "
+                "WHERE status = ? OR (status = ? AND lease_expires < ?) ORDER BY created_at, seq LIMIT 1",
+                (TASK_PENDING, TASK_LEASED, now)
+            ).fetchone()
+            if row is None:
+                return None
+            token = uuid.uuid4().hex
+            conn.execute(
+                "UPDATE tasks SET status = ?, token = ?, worker = ?, lease_expires = ?, attempts = attempts + 1 WHERE id = ?",
+                (TASK_LEASED, token, worker, now + lease_seconds, row[0])
+            )
+            return Task(row[0], row[1], row[2], Suppliers[row[3]],
+                        [PreState.from_dict(p) for p in json.loads(row[4])], row[5] + 1, token)
+        return self._transaction(_lease)
+
+    def heartbeat(self, task: Task, lease_seconds: float = 300) -> bool:
+        """Kirayı uzatır. Görev artık bu worker'da değilse False"""
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE tasks SET lease_expires = ? WHERE id = ? AND status = ? AND token = ?",
+                (time.time() + lease_seconds, task.id, TASK_LEASED, task.token)
+            )
+            return cursor.rowcount == 1
+
+    def complete(self, task: Task, result: Dict) -> bool:
+        """
+        Sonucu yazar. Görev bu token ile kiralı değilse (kira başkasına geçmiş veya görev bitmiş) reddedilir
+
+        Returns:
+            Sonuç kabul edildiyse True
+        """
+        def _complete(conn):
+            cursor = conn.execute(
+                "UPDATE tasks SET status = ?, result = ?, finished_at = ? WHERE id = ? AND status = ? AND token = ?",
+                (TASK_DONE, json.dumps(result, ensure_ascii=False), time.time(), task.id, TASK_LEASED, task.token)
+            )
+            if cursor.rowcount == 1:
+                return True
+            conn.execute("UPDATE tasks SET late_results = late_results + 1 WHERE id = ?", (task.id,))
+            return False
+        return self._transaction(_complete)
+
+    def fail(self, task: Task, error: str):
+        """Görevi tekrar bekleyene alır, deneme hakkı bittiyse başarısız sayar"""
+        def _fail(conn):
+            conn.execute(
+                "UPDATE tasks SET status = CASE WHEN attempts >= ? THEN ? ELSE ? END, error = ?, token = NULL, "
+                "finished_at = CASE WHEN attempts >= ? THEN ? END WHERE id = ? AND status = ? AND token = ?",
+                (self.max_attempts, TASK_FAILED, TASK_PENDING, error, self.max_attempts, time.time(),
+                 task.id, TASK_LEASED, task.token)
+            )
+        self._transaction(_fail)
+
+    def job(self, job_id: str) -> Dict:
+        """Görevlerin durum sayıları ve reddedilen geç sonuçlar"""
+        with self._lock:
+            counts = dict(self._conn.execute(
+                "SELECT status, COUNT(*) FROM tasks WHERE job_id = ? GROUP BY status", (job_id,)
+            ).fetchall())
+            late = self._conn.execute(
+                "SELECT COALESCE(SUM(late_results), 0), COALESCE(SUM(attempts), 0) FROM tasks WHERE job_id = ?", (job_id,)
+            ).fetchone()
+        tasks = sum(counts.values())
+        return {
+            "tasks": tasks,
+            **{status: counts.get(status, 0) for status in (TASK_PENDING, TASK_LEASED, TASK_DONE, TASK_FAILED)},
+            "finished": tasks > 0 and counts.get(TASK_DONE, 0) + counts.get(TASK_FAILED, 0) == tasks,
+            "late_results": late[0],
+            "attempts": late[1],
+        }
+
+    def results(self, job_id: str) -> List[Tuple[str, List[PreState], Optional[Dict]]]:
+        """Bitmiş görevler sıra numarasına göre: (durum, prestate'ler, sonuç veya None)"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT status, prestates, result FROM tasks WHERE job_id = ? AND status IN (?, ?) ORDER BY seq",
+                (job_id, TASK_DONE, TASK_FAILED)
+            ).fetchall()
+        return [
+            (status, [PreState.from_dict(p) for p in json.loads(prestates)], json.loads(result) if result else None)
+            for status, prestates, result in rows
+        ]
+
+    def purge(self, job_id: str):
+        """Birleştirilmiş job'un görevlerini siler"""
+        self._transaction(lambda conn: conn.execute("DELETE FROM tasks WHERE job_id = ?", (job_id,)))
+
+
+class Coordinator:
+    """
+    PreState listesini görevlere bölüp kuyruğa yazan ve sonuçları birleştiren taraf.
+    get_with_code imzası Processer ile aynıdır, main.py / backend Processer yerine kullanabilir
+    """
+
+    def __init__(self, queue: SQLiteTaskQueue, task_size: int = 100, poll_interval: float = 0.5,
+                 timeout: Optional[float] = None, store: Optional["ProductStore"] = None):
+        """
+        Args:
+            queue: Görev kuyruğu
+            task_size: Görev başına kod sayısı
+            poll_interval: Sonuç kontrolü aralığı (saniye)
+            timeout: get_with_code'un en fazla bekleyeceği süre, None ise sınırsız
+            store: Verilirse birleştirilen sonuç depoya yazılır
+        """
+        self.queue = queue
+        self.task_size = task_size
+        self.poll_interval = poll_interval
+        self.timeout = timeout
+        self.store = store
+
+    def submit(self, supplier: Suppliers, prestates: List[PreState]) -> str:
+        batches = [prestates[i:i + self.task_size] for i in range(0, len(prestates), self.task_size)]
+        job_id = self.queue.create_job(supplier, batches)
+        logging.info(f"[{supplier.name}] Job {job_id}: {len(prestates)} codes in {len(batches)} tasks")
+        return job_id
+
+    def wait(self, job_id: str, timeout: Optional[float] = None) -> Dict:
+        """Tüm görevler bitene kadar bekler. Süre dolarsa TimeoutError"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            status = self.queue.job(job_id)
+            if status["finished"]:
+                return status
+            if deadline is not None and time.monotonic() > deadline:
+                raise TimeoutError(f"Job {job_id} not finished in {timeout}s: {status}")
+            time.sleep(self.poll_interval)
+
+    def merge(self, job_id: str, supplier: Suppliers, expected: int,
+              partial: bool = False) -> Tuple[List[Product], List[Product], Dict]:
+        """
+        Görev sonuçlarını sırayla birleştirir, her kodun tam bir kez sayıldığını kontrol eder.
+        partial ise sadece bitmiş görevler alınır, kalan kodlar rapora pending olarak yazılır
+        """
+        products, failed_products = [], []
+        for status, prestates, result in self.queue.results(job_id):
+            if status == TASK_DONE:
+                products.extend(product_from_row(row, supplier) for row in result["successed"])
+                failed_products.extend(product_from_row(row, supplier) for row in result["failed"])
+            else:
+                # deneme hakkı biten görevin kodları başarısız sayılır
+                failed_products.extend(
+                    Product(urun_kodu=p.code, marka=supplier, fiyat=p.price, stok=p.stock) for p in prestates
+                )
+
+        job = self.queue.job(job_id)
+        report = {
+            "codes": expected,
+            "successed": len(products),
+            "failed": len(failed_products),
+            "tasks": job["tasks"],
+            "failed_tasks": job[TASK_FAILED],
+            "attempts": job["attempts"],
+            "late_results": job["late_results"],
+            "pending": expected - len(products) - len(failed_products) if partial else 0,
+        }
+        if not partial and len(products) + len(failed_products) != expected:
+            logging.error(f"[{supplier.name}] Job {job_id} accounting mismatch: {report}")
+        return products, failed_products, report
+
+    def get_with_code(self, supplier: Suppliers, *prestates: PreState, deadline: Optional[float] = None,
+                      report: Optional[Dict] = None, **kwargs) -> tuple:
+        """
+        Kodları kuyruğa verir, worker'lar bitirince sonucu döndürür
+
+        Args:
+            deadline: time.monotonic() cinsinden son an. Geçince bitmiş görevlerin sonucu döner, kalan görevler
+                kuyruktan silinir ve kodları iki listede de yer almaz (Processer.get_with_code ile aynı)
+            report: Verilirse merge raporu ve depodaki scrape_id bu sözlüğe yazılır. Coordinator istekler arasında
+                paylaşıldığı için sonuç örnekte tutulmaz
+
+        Returns:
+            (başarılı ürünler, başarısız ürünler)
+        """
+        prestates = list(prestates)
+        if not prestates:
+            return [], []
+        job_id = self.submit(supplier, prestates)
+        timeout, by_deadline = self.timeout, False
+        if deadline is not None:
+            remaining = max(deadline - time.monotonic(), 0.0)
+            by_deadline = timeout is None or remaining <= timeout
+            timeout = remaining if by_deadline else timeout
+        partial = False
+        try:
+            try:
+                self.wait(job_id, timeout)
+            except TimeoutError:
+                # sadece deadline'a takılındıysa kısmi sonuç, Coordinator timeout'u hata olarak kalır
+                if not by_deadline:
+                    raise
+                partial = True
+            products, failed_products, merged = self.merge(job_id, supplier, len(prestates), partial)
+        finally:
+            # hata / timeout'ta da görevler kuyrukta sahipsiz kalmasın, geç gelen sonuçlar reddedilir
+            self.queue.purge(job_id)
+        logging.info(f"[{supplier.name}] Job {job_id} merged: {merged}")
+        scrape_id = None
+        if self.store is not None:
+            scrape_id = self.store.record(supplier, products, len(failed_products), source="distributed")
+        if report is not None:
+            report.update(merged, scrape_id=scrape_id)
+        return products, failed_products
+
+
+class Worker:
+    """Kuyruktan görev kiralayıp Processer ile çeken döngü"""
+
+    def __init__(self, queue: SQLiteTaskQueue, processer: "Processer", worker_id: Optional[str] = None,
+                 lease_seconds: float = 300, idle_sleep: float = 1.0):
+        """
+        Args:
+            queue: Görev kuyruğu
+            processer: Görevleri çekecek Processer
+            worker_id: Kuyrukta görünen ad, verilmezse host:pid
+            lease_seconds: Görev kira süresi, çekim sürerken kod bittikçe uzatılır
+            idle_sleep: Kuyruk boşken bekleme (saniye)
+        """
+        self.queue = queue
+        self.processer = processer
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}"
+        self.lease_seconds = lease_seconds
+        self.idle_sleep = idle_sleep
+        self.completed = 0
+        self.rejected = 0
+
+    def run_once(self) -> bool:
+        """Tek görev çalıştırır. Kuyruk boşsa False"""
+        task = self.queue.lease(self.worker_id, self.lease_seconds)
+        if task is None:
+            return False
+        logging.info(f"[{self.worker_id}] Leased {task}")
+
+        last_beat = [time.monotonic()]
+
+        def on_result(prestate, product, success):
+            # kod bittikçe, kira süresinin üçte biri geçtiyse uzat
+            if time.monotonic() - last_beat[0] > self.lease_seconds / 3:
+                last_beat[0] = time.monotonic()
+                self.queue.heartbeat(task, self.lease_seconds)
+
+        try:
+            products, failed_products = self.processer.get_with_code(task.supplier, *task.prestates, on_result=on_result)
+        except Exception as e:
+            logging.error(f"[{self.worker_id}] Task fail {task}: {e}")
+            self.queue.fail(task, str(e))
+            return True
+
+        accepted = self.queue.complete(task, {
+            "successed": [product_to_row(p) for p in products],
+            "failed": [product_to_row(p) for p in failed_products],
+        })
+        if accepted:
+            self.completed += 1
+        else:
+            self.rejected += 1
+            logging.warning(f"[{self.worker_id}] Result rejected, lease lost: {task}")
+        return True
+
+    def run(self, stop_event: Optional[threading.Event] = None, max_idle: Optional[float] = None):
+        """
+        Görevleri sırayla çalıştırır
+
+        Args:
+            stop_event: Set edilince mevcut görev bittikten sonra durur
+            max_idle: Kuyruk bu kadar saniye boş kalırsa durur, None ise sürekli bekler
+        """
+        idle_since = None
+        while stop_event is None or not stop_event.is_set():
+            if self.run_once():
+                idle_since = None
+                continue
+            idle_since = idle_since or time.monotonic()
+            if max_idle is not None and time.monotonic() - idle_since >= max_idle:
+                break
+            time.sleep(self.idle_sleep)
+        logging.info(f"[{self.worker_id}] Worker stopped: {self.completed} completed, {self.rejected} rejected")
+
+
+def run_worker(queue_path: str, interval: float = 1.0, lease_seconds: float = 300, max_idle: Optional[float] = None,
+               stop_event=None, idle_sleep: float = 1.0):
+    """Worker process giriş noktası"""
+    from .cache import load_shared
+    from .logs import setup_logging
+    from .processer import Processer
+    from .ratelimit import HostRateLimiter
+
+    setup_logging()
+    load_shared()
+    processer = Processer(rate_limiter=HostRateLimiter(interval) if interval else None)
+    worker = Worker(SQLiteTaskQueue(queue_path), processer, lease_seconds=lease_seconds, idle_sleep=idle_sleep)
+    worker.run(stop_event, max_idle)
+
+
+def start_workers(count: int, queue_path: str, interval: float = 1.0, lease_seconds: float = 300,
+                  max_idle: Optional[float] = None, idle_sleep: float = 1.0) -> Tuple[List[multiprocessing.Process], "multiprocessing.Event"]:
+    """
+    Yerel worker process'leri başlatır
+
+    Returns:
+        (process'ler, durdurma event'i)
+    """
+    context = multiprocessing.get_context("spawn")
+    stop_event = context.Event()
+    processes = [
+        context.Process(target=run_worker, args=(queue_path, interval, lease_seconds, max_idle, stop_event, idle_sleep),
+                        name=f"scrape-worker-{n}", daemon=True)
+        for n in range(count)
+    ]
+    for process in processes:
+        process.start()
+    return processes, stop_event
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Dağıtık scrape worker'ı ve kuyruk durumu")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    worker = sub.add_parser("worker", help="Kuyruktaki görevleri çalıştır")
+    worker.add_argument("--queue", default=DEFAULT_QUEUE_PATH)
+    worker.add_argument("--processes", type=int, default=1, help="Bu makinede çalışacak worker process sayısı")
+    worker.add_argument("--interval", type=float, default=1.0, help="Process başına, host başına istekler arası en kısa süre")
+    worker.add_argument("--lease", type=float, default=300, help="Görev kira süresi (saniye)")
+    worker.add_argument("--max-idle", type=float, help="Kuyruk bu kadar saniye boş kalırsa çık")
+
+    status = sub.add_parser("status", help="Job durumunu yazdır")
+    status.add_argument("job_id")
+    status.add_argument("--queue", default=DEFAULT_QUEUE_PATH)
+    args = parser.parse_args(argv)
+
+    if args.command == "status":
+        print(json.dumps(SQLiteTaskQueue(args.queue).job(args.job_id), indent=2))
+        return
+
+    if args.processes <= 1:
+        run_worker(args.queue, args.interval, args.lease, args.max_idle)
+        return
+
+    processes, stop_event = start_workers(args.processes, args.queue, args.interval, args.lease, args.max_idle)
+    try:
+        for process in processes:
+            process.join()
+    except KeyboardInterrupt:
+        stop_event.set()
+        for process in processes:
+            process.join()
+
+
+if __name__ == "__main__":
+    main()
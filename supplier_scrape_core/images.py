@@ -0,0 +1,256 @@
+from typing import Dict, List, Optional
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+import hashlib
+import logging
+import os
+import tempfile
+import threading
+import time
+
+"""
+Ürün görsel URL'lerini (gorsel_url) ikas'a gönderilmeden önce doğrulayan,
+istenirse görselleri içerik adresli (sha256) yerel bir depoya indirip küçülten aşama.
+Scrape akışını yavaşlatmamak için kendi sınırlı thread havuzunda ve kendi session havuzunda çalışır.
+"""
+
+IMAGE_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36",
+    "Accept": "image/avif,image/webp,image/apng,image/*,*/*;q=0.8",
+}
+
+
+class ImageCheck:
+    """Bir görsel URL'sinin doğrulama sonucu"""
+
+    def __init__(self, url: str, ok: bool, status: Optional[int] = None, content_type: Optional[str] = None,
+                 size: Optional[int] = None, path: Optional[str] = None, thumbnail_path: Optional[str] = None,
+                 error: Optional[str] = None):
+        self.url = url
+        self.ok = ok
+        self.status = status
+        self.content_type = content_type
+        self.size = size
+        self.path = path
+        self.thumbnail_path = thumbnail_path
+        self.error = error
+
+    def to_dict(self) -> Dict:
+        return {
+            "url": self.url,
+            "ok": self.ok,
+            "status": self.status,
+            "content_type": self.content_type,
+            "size": self.size,
+            "path": self.path,
+            "thumbnail_path": self.thumbnail_path,
+            "error": self.error,
+        }
+
+    def __repr__(self):
+        return f"ImageCheck({self.url} ok={self.ok} status={self.status})"
+
+
+class ImageVerifier:
+    """Görsel URL'lerini eşzamanlı olarak HEAD (gerekirse range GET) ile kontrol eder"""
+
+    def __init__(self, max_workers: int = 8, timeout: float = 10, store_dir: Optional[str] = None,
+                 thumbnail_size: Optional[tuple] = None, max_results: int = 10000, ttl: float = 6 * 3600):
+        """
+        Args:
+            max_workers: Doğrulama havuzundaki en fazla thread sayısı
+            timeout: İstek zaman aşımı (saniye)
+            store_dir: Verilirse görseller bu dizine sha256 adıyla indirilir
+            thumbnail_size: (genişlik, yükseklik) verilirse indirilen görselden küçük kopya oluşturulur (Pillow gerekir)
+            max_results: Tutulacak en fazla doğrulama sonucu, aşılırsa en eski kullanılan çıkarılır
+            ttl: Sonucun geçerlilik süresi (saniye), dolunca URL yeniden kontrol edilir
+        """
+        self.timeout = timeout
+        self.max_results = max_results
+        self.ttl = ttl
+        self.store_dir = store_dir
+        self.thumbnail_size = thumbnail_size
+
+        import requests
+        from requests.adapters import HTTPAdapter
+
+        self.session = requests.Session()
+        self.session.headers.update(IMAGE_HEADERS)
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=max_workers)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="image-verify")
+        self._lock = threading.Lock()
+        # url -> (expires_at, ImageCheck), LRU sırasında
+        self._results: "OrderedDict[str, tuple]" = OrderedDict()
+        # sadece sürmekte olan kontroller, biten _run içinde çıkarılır
+        self._futures: Dict[str, Future] = {}
+
+        # throughput istatistikleri, scrape'ten bağımsız raporlanır
+        self.checked = 0
+        self.broken = 0
+        self.downloaded_bytes = 0
+        self._busy_seconds = 0.0
+        self._first_submit = None
+        self._last_done = None
+
+    def _cached(self, url: str) -> Optional[ImageCheck]:
+        """Kilit altında çağrılır. Süresi dolmamış sonuç, yoksa None"""
+        entry = self._results.get(url)
+        if entry is None:
+            return None
+        if entry[0] < time.monotonic():
+            del self._results[url]
+            return None
+        self._results.move_to_end(url)
+        return entry[1]
+
+    def submit(self, url: Optional[str]) -> Optional[Future]:
+        """URL'yi kuyruğa ekler ve hemen döner. Aynı URL ttl süresince yalnızca bir kez kontrol edilir"""
+        if not url:
+            return None
+        with self._lock:
+            check = self._cached(url)
+            if check is not None:
+                future = Future()
+                future.set_result(check)
+                return future
+            future = self._futures.get(url)
+            if future is None:
+                if self._first_submit is None:
+                    self._first_submit = time.monotonic()
+                future = self._executor.submit(self._run, url)
+                self._futures[url] = future
+            return future
+
+    def result(self, url: str) -> Optional[ImageCheck]:
+        """Tamamlanmışsa URL'nin sonucu, değilse None"""
+        with self._lock:
+            return self._cached(url)
+
+    def wait(self, timeout: Optional[float] = None) -> Dict[str, ImageCheck]:
+        """Kuyruktaki tüm kontrollerin bitmesini bekler ve sonuçları döndürür"""
+        with self._lock:
+            futures = list(self._futures.values())
+        wait(futures, timeout=timeout)
+        with self._lock:
+            return {url: check for url, (_, check) in self._results.items()}
+
+    def broken_urls(self) -> List[str]:
+        with self._lock:
+            return [url for url, (_, check) in self._results.items() if not check.ok]
+
+    def stats(self) -> Dict:
+        with self._lock:
+            pending = len(self._futures)
+            elapsed = (self._last_done - self._first_submit) if self._last_done and self._first_submit else 0.0
+            return {
+                "checked": self.checked,
+                "broken": self.broken,
+                "pending": pending,
+                "results": len(self._results),
+                "downloaded_bytes": self.downloaded_bytes,
+                "elapsed": round(elapsed, 3),
+                "per_second": round(self.checked / elapsed, 2) if elapsed else 0.0,
+                "avg_check_seconds": round(self._busy_seconds / self.checked, 4) if self.checked else 0.0,
+            }
+
+    def shutdown(self, wait_pending: bool = True):
+        self._executor.shutdown(wait=wait_pending, cancel_futures=not wait_pending)
+        self.session.close()
+
+    def _run(self, url: str) -> ImageCheck:
+        started = time.monotonic()
+        try:
+            check = self.verify(url)
+            if check.ok and self.store_dir:
+                self._store(check)
+        except Exception as e:
+            check = ImageCheck(url, ok=False, error=str(e))
+
+        with self._lock:
+            self._results.pop(url, None)
+            self._results[url] = (time.monotonic() + self.ttl, check)
+            while len(self._results) > self.max_results:
+                self._results.popitem(last=False)
+            self._futures.pop(url, None)
+            self.checked += 1
+            if not check.ok:
+                self.broken += 1
+            self._busy_seconds += time.monotonic() - started
+            self._last_done = time.monotonic()
+
+        if not check.ok:
+            logging.warning(f"Broken image: {url} status={check.status} error={check.error}")
+        return check
+
+    def verify(self, url: str) -> ImageCheck:
+        """HEAD isteği ile kontrol eder, sunucu HEAD desteklemiyorsa ilk 1KB için range GET atar"""
+        import requests
+
+        try:
+            response = self.session.head(url, timeout=self.timeout, allow_redirects=True)
+            if response.status_code in (403, 405, 501) or not response.headers.get("Content-Type"):
+                response = self.session.get(url, timeout=self.timeout, headers={"Range": "bytes=0-1023"}, stream=True)
+                response.close()
+        except requests.exceptions.RequestException as e:
+            return ImageCheck(url, ok=False, error=str(e))
+
+        content_type = response.headers.get("Content-Type", "")
+        size = response.headers.get("Content-Length")
+        ok = response.status_code in (200, 206) and content_type.startswith("image/")
+        return ImageCheck(
+            url,
+            ok=ok,
+            status=response.status_code,
+            content_type=content_type,
+            size=int(size) if size and size.isdigit() else None,
+            error=None if ok else f"unexpected response: {response.status_code} {content_type}",
+        )
+
+    def _store(self, check: ImageCheck):
+        """Görseli indirir, içeriğin sha256'sı ile kaydeder. Aynı içerik bir kez saklanır"""
+        response = self.session.get(check.url, timeout=self.timeout)
+        response.raise_for_status()
+        content = response.content
+
+        digest = hashlib.sha256(content).hexdigest()
+        ext = os.path.splitext(check.url.split("?")[0])[1].lower() or ".img"
+        directory = os.path.join(self.store_dir, digest[:2])
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, digest + ext)
+        if not os.path.exists(path):
+            # aynı görseli indiren thread'ler birbirinin geçici dosyasını ezmesin
+            with tempfile.NamedTemporaryFile(dir=directory, suffix=".tmp", delete=False) as f:
+                f.write(content)
+            try:
+                os.replace(f.name, path)
+            except OSError:
+                os.remove(f.name)
+                raise
+
+        check.path = path
+        check.size = len(content)
+        with self._lock:
+            self.downloaded_bytes += len(content)
+
+        if self.thumbnail_size:
+            check.thumbnail_path = self._make_thumbnail(path, digest)
+
+    def _make_thumbnail(self, path: str, digest: str) -> Optional[str]:
+        try:
+            from PIL import Image
+        except ImportError:
+            logging.warning("Pillow is not installed, thumbnails are skipped")
+            self.thumbnail_size = None
+            return None
+
+        width, height = self.thumbnail_size
+        thumb_path = os.path.join(os.path.dirname(path), f"{digest}_{width}x{height}.jpg")
+        if os.path.exists(thumb_path):
+            return thumb_path
+        with Image.open(path) as image:
+            image.thumbnail((width, height))
+            image.convert("RGB").save(thumb_path, "JPEG", quality=85)
+        return thumb_path
@@ -0,0 +1,217 @@
+from typing import TYPE_CHECKING, Dict, Iterator, List, Optional, Tuple
+import itertools
+import json
+import logging
+from .structers.product import PreState, Suppliers
+
+# pandas ilk okumada yüklenir
+if TYPE_CHECKING:
+    import pandas as pd
+
+"""
+Katalog boyutundaki (on binlerce kod) CSV / xlsx / JSONL dosyalarından PreState okuyan akış.
+Dosya parça parça okunur, her parça pandas ile toplu doğrulanır, tekrar eden kodlar atılır
+ve Processer'a tek seferde değil parça parça verilir.
+"""
+
+COLUMN_ALIASES = {
+    "code": ("code", "kod", "urun_kodu", "ürün kodu"),
+    "price": ("price", "fiyat"),
+    "stock": ("stock", "stok", "adet"),
+    "supplier": ("supplier", "tedarikci", "tedarikçi"),
+}
+
+
+def _number(value):
+    """Tam sayıysa int, ondalıklıysa float (29.90 kesilmez), boşsa None"""
+    if value is None or value != value:
+        return None
+    return int(value) if float(value).is_integer() else float(value)
+
+
+def find_supplier(value) -> Optional[Suppliers]:
+    """Prefix ("11"), enum adı ("BALGUNES") veya görünen ad ile tedarikçiyi bulur"""
+    value = str(value).strip()
+    for sup in Suppliers:
+        if value in (sup.value["prefix"], sup.name, sup.value["name"]):
+            return sup
+    return None
+
+
+def _supplier_aliases() -> Dict[str, str]:
+    """Prefix, enum adı ve görünen ad -> prefix"""
+    aliases = {}
+    for sup in Suppliers:
+        for alias in (sup.value["prefix"], sup.name, sup.value["name"]):
+            aliases[alias.upper()] = sup.value["prefix"]
+    return aliases
+
+
+class IngestReport:
+    """Okuma sırasında tutulan sayaçlar"""
+
+    def __init__(self):
+        self.rows = 0
+        self.valid = 0
+        self.invalid = 0
+        self.duplicates = 0
+        self.chunks = 0
+        # geçersizlik nedeni -> satır sayısı, bir satır birden fazla nedende sayılabilir
+        self.reasons: Dict[str, int] = {}
+
+    def to_dict(self) -> Dict:
+        return {
+            "rows": self.rows,
+            "valid": self.valid,
+            "invalid": self.invalid,
+            "duplicates": self.duplicates,
+            "chunks": self.chunks,
+            "reasons": dict(self.reasons),
+        }
+
+    def __repr__(self):
+        return f"IngestReport {self.to_dict()}"
+
+
+class PreStateIngestor:
+    """Büyük PreState dosyalarını parça parça okuyup doğrulayan sınıf"""
+
+    def __init__(self, path: str, default_supplier: Optional[Suppliers] = None, chunk_size: int = 1000):
+        """
+        Args:
+            path: .csv, .xlsx veya .jsonl dosya yolu
+            default_supplier: Dosyada tedarikçi kolonu yoksa kullanılacak tedarikçi
+            chunk_size: Bir parçadaki satır sayısı
+        """
+        self.path = path
+        self.default_supplier = default_supplier
+        self.chunk_size = chunk_size
+        self.report = IngestReport()
+        self._seen = set()
+        self._supplier_aliases = _supplier_aliases()
+        self._suppliers_by_prefix = {sup.value["prefix"]: sup for sup in Suppliers}
+
+    def _read_frames(self) -> Iterator["pd.DataFrame"]:
+        import pandas as pd
+        lower = self.path.lower()
+        if lower.endswith(".csv"):
+            yield from pd.read_csv(self.path, dtype=str, chunksize=self.chunk_size, encoding="utf-8-sig")
+        elif lower.endswith(".jsonl"):
+            with open(self.path, encoding="utf-8") as f:
+                lines = (line for line in f if line.strip())
+                while True:
+                    batch = list(itertools.islice(lines, self.chunk_size))
+                    if not batch:
+                        break
+                    yield pd.DataFrame([json.loads(line) for line in batch], dtype=str)
+        elif lower.endswith(".xlsx"):
+            from openpyxl import load_workbook
+            workbook = load_workbook(self.path, read_only=True, data_only=True)
+            try:
+                rows = workbook.active.iter_rows(values_only=True)
+                header = [str(c) if c is not None else "" for c in next(rows)]
+                while True:
+                    batch = list(itertools.islice(rows, self.chunk_size))
+                    if not batch:
+                        break
+                    yield pd.DataFrame(batch, columns=header, dtype=str)
+            finally:
+                workbook.close()
+        else:
+            raise ValueError(f"Unsupported prestate file type: {self.path}")
+
+    def _normalize_columns(self, frame: "pd.DataFrame") -> "pd.DataFrame":
+        rename = {}
+        for column in frame.columns:
+            key = str(column).strip().lower()
+            for target, aliases in COLUMN_ALIASES.items():
+                if key in aliases:
+                    rename[column] = target
+        frame = frame.rename(columns=rename)
+        if "code" not in frame.columns:
+            # başlık tanınmadıysa ilk kolon ürün kodu kabul edilir
+            frame = frame.rename(columns={frame.columns[0]: "code"})
+        for column in ("price", "stock", "supplier"):
+            if column not in frame.columns:
+                frame[column] = None
+        return frame[["code", "price", "stock", "supplier"]]
+
+    def validate(self, frame: "pd.DataFrame") -> "pd.DataFrame":
+        """
+        Parçayı toplu olarak doğrular.
+        Kod sadece rakam olmalı, fiyat boş ya da negatif olmayan sayı (ondalıklı olabilir), stok boş ya da
+        negatif olmayan tam sayı olmalı, tedarikçi bilinen bir tedarikçi olmalı.
+        Geçersiz satırların nedenleri report.reasons'ta sayılır.
+        """
+        import pandas as pd
+
+        frame = self._normalize_columns(frame)
+
+        # excel'den gelen 145204.0 gibi değerleri düzelt
+        code = frame["code"].astype("string").str.strip().str.replace(r"\.0+$", "", regex=True)
+        price = pd.to_numeric(frame["price"], errors="coerce")
+        stock = pd.to_numeric(frame["stock"], errors="coerce")
+
+        supplier = frame["supplier"].astype("string").str.strip().str.upper().map(self._supplier_aliases)
+        if self.default_supplier is not None:
+            supplier = supplier.fillna(self.default_supplier.value["prefix"])
+
+        checks = {
+            "invalid_code": code.str.fullmatch(r"\d+").fillna(False).astype(bool),
+            "unknown_supplier": supplier.notna(),
+            "invalid_price": frame["price"].isna() | (price >= 0),
+            # 2.5 adet gibi değerler sessizce 2'ye yuvarlanmasın
+            "invalid_stock": frame["stock"].isna() | ((stock >= 0) & (stock % 1 == 0)),
+        }
+        valid = pd.Series(True, index=frame.index)
+        for reason, ok in checks.items():
+            failed = int((~ok).sum())
+            if failed:
+                self.report.reasons[reason] = self.report.reasons.get(reason, 0) + failed
+            valid &= ok
+
+        self.report.rows += len(frame)
+        self.report.invalid += int((~valid).sum())
+
+        return pd.DataFrame({
+            "supplier": supplier[valid],
+            "code": code[valid],
+            "price": price[valid],
+            "stock": stock[valid],
+        })
+
+    def _dedup(self, frame: "pd.DataFrame") -> "pd.DataFrame":
+        """Hem parça içinde hem önceki parçalarla tekrar eden kodları at, ilk geleni tut"""
+        import pandas as pd
+        before = len(frame)
+        frame = frame.drop_duplicates(subset=["supplier", "code"], keep="first")
+        keys = list(zip(frame["supplier"], frame["code"]))
+        fresh = pd.Series([key not in self._seen for key in keys], index=frame.index, dtype=bool)
+        frame = frame[fresh]
+        self._seen.update(key for key, is_fresh in zip(keys, fresh) if is_fresh)
+        self.report.duplicates += before - len(frame)
+        return frame
+
+    def iter_chunks(self) -> Iterator[Tuple[Suppliers, List[PreState]]]:
+        """Her parça için tedarikçiye göre gruplanmış (supplier, prestates) çiftleri üretir"""
+        for raw in self._read_frames():
+            frame = self._dedup(self.validate(raw))
+            self.report.chunks += 1
+            self.report.valid += len(frame)
+
+            for prefix, group in frame.groupby("supplier", sort=False):
+                prestates = [
+                    PreState(int(code), _number(price), _number(stock))
+                    for code, price, stock in zip(group["code"], group["price"], group["stock"])
+                ]
+                yield self._suppliers_by_prefix[prefix], prestates
+
+        logging.info(f"Ingest finished for {self.path}: {self.report}")
+
+
+def read_grouped(path: str, default_supplier: Optional[Suppliers] = None) -> Dict[Suppliers, List[PreState]]:
+    """Tüm dosyayı tedarikçiye göre gruplanmış tek bir sözlük olarak okur (küçük listeler için)"""
+    result: Dict[Suppliers, List[PreState]] = {}
+    for supplier, prestates in PreStateIngestor(path, default_supplier).iter_chunks():
+        result.setdefault(supplier, []).extend(prestates)
+    return result
@@ -0,0 +1,167 @@
+from logging.handlers import QueueHandler, QueueListener
+from typing import Optional
+import atexit
+import itertools
+import logging
+import os
+import queue
+import threading
+import time
+
+"""
+Sıcak döngüler için düşük maliyetli loglama.
+- Kod başına satırlar ayrı bir logger'a, %-formatıyla (tembel) yazılır ve örneklenebilir.
+  Örneklemeye girmeyen kodların INFO/DEBUG satırları hiç formatlanmaz.
+- Her get_with_code çağrısı sonunda tek satırlık batch özeti yazılır.
+- setup_logging handler'ları bir QueueListener thread'ine taşır, scrape thread'leri log I/O'da beklemez.
+
+Ortam değişkenleri:
+    SCRAPE_LOG_LEVEL   root seviye (varsayılan INFO)
+    SCRAPE_LOG_SAMPLE  kod satırlarının yazılacağı oran, 0-1 (varsayılan 1 = hepsi)
+    SCRAPE_LOG_ASYNC   "false" ise kuyruk kullanılmaz
+"""
+
+DEFAULT_FORMAT = "%(asctime)s - %(levelname)s - %(message)s"
+
+# kod başına satırların logger'ı, seviyesi ayrıca ayarlanabilir
+code_logger = logging.getLogger("supplier_scrape_core.codes")
+
+
+class CodeSampler:
+    """Her 1/rate koddan birini seçer. Aynı kodun tüm satırları birlikte yazılır ya da hiç yazılmaz"""
+
+    def __init__(self, rate: float = 1.0):
+        self.set_rate(rate)
+        self._counter = itertools.count()
+
+    def set_rate(self, rate: float):
+        rate = min(max(float(rate), 0.0), 1.0)
+        self.rate = rate
+        self._every = round(1 / rate) if rate > 0 else 0
+
+    def keep(self) -> bool:
+        if self._every == 1:
+            return True
+        if self._every == 0:
+            return False
+        return next(self._counter) % self._every == 0
+
+
+sampler = CodeSampler(float(os.environ.get("SCRAPE_LOG_SAMPLE", 1.0)))
+
+
+class CodeLog:
+    """
+    Tek bir kodun log satırları, başında [sıra][kod] etiketiyle.
+    info/debug örneklemeye tabidir, warning/error her zaman yazılır
+    """
+
+    __slots__ = ("tag", "sampled")
+
+    def __init__(self, index: int, code, sampled: Optional[bool] = None):
+        self.tag = f"[{index}][{code}]"
+        self.sampled = sampler.keep() if sampled is None else sampled
+
+    def debug(self, msg: str, *args):
+        if self.sampled and code_logger.isEnabledFor(logging.DEBUG):
+            code_logger.debug("%s " + msg, self.tag, *args)
+
+    def info(self, msg: str, *args):
+        if self.sampled and code_logger.isEnabledFor(logging.INFO):
+            code_logger.info("%s " + msg, self.tag, *args)
+
+    def warning(self, msg: str, *args):
+        code_logger.warning("%s " + msg, self.tag, *args)
+
+    def error(self, msg: str, *args):
+        code_logger.error("%s " + msg, self.tag, *args)
+
+
+class BatchSummary:
+    """get_with_code çağrısı boyunca sayaçları toplar, sonunda tek satır yazar"""
+
+    def __init__(self, supplier, total: int):
+        self.supplier = supplier
+        self.total = total
+        self.successed = 0
+        self.failed = 0
+        self.cache_hits = 0
+        self.duplicates = 0
+        self.skipped = 0
+        self._started = time.perf_counter()
+
+    def log(self):
+        elapsed = time.perf_counter() - self._started
+        logging.info(
+            "[%s] batch done: %d codes, %d successed, %d failed, %d cache hits, %d duplicates, %d skipped in %.2fs (%.1f codes/s)",
+            self.supplier.name, self.total, self.successed, self.failed, self.cache_hits,
+            self.duplicates, self.skipped, elapsed, (self.successed + self.failed) / elapsed if elapsed else 0.0
+        )
+
+
+class _RecordQueueHandler(QueueHandler):
+    # Kuyruk aynı process içinde, kayıt pickle edilmez; formatlama listener thread'ine bırakılır
+    def prepare(self, record):
+        return record
+
+
+_listener: Optional[QueueListener] = None
+_listener_lock = threading.Lock()
+
+
+def setup_logging(level=None, handler: Optional[logging.Handler] = None, use_queue: Optional[bool] = None,
+                  sample_rate: Optional[float] = None) -> Optional[QueueListener]:
+    """
+    Root logger'ı kurar. Tekrar çağrılırsa önceki kurulumu değiştirir
+
+    Args:
+        level: Root seviye, verilmezse SCRAPE_LOG_LEVEL veya INFO
+        handler: Çıktı handler'ı, verilmezse DEFAULT_FORMAT ile stderr
+        use_queue: Handler'ı QueueListener thread'inde çalıştır, verilmezse SCRAPE_LOG_ASYNC (varsayılan açık)
+        sample_rate: Kod satırlarının örnekleme oranı, verilmezse SCRAPE_LOG_SAMPLE
+
+    Returns:
+        Başlatılan QueueListener veya kuyruk kullanılmıyorsa None
+    """
+    global _listener
+    if level is None:
+        level = os.environ.get("SCRAPE_LOG_LEVEL", "INFO").upper()
+    if use_queue is None:
+        use_queue = os.environ.get("SCRAPE_LOG_ASYNC", "true").lower() != "false"
+    if sample_rate is not None:
+        sampler.set_rate(sample_rate)
+    if handler is None:
+        handler = logging.StreamHandler()
+        handler.setFormatter(logging.Formatter(DEFAULT_FORMAT))
+
+    root = logging.getLogger()
+    root.setLevel(level)
+
+    with _listener_lock:
+        if _listener is not None:
+            _listener.stop()
+            _listener = None
+        for old in list(root.handlers):
+            root.removeHandler(old)
+
+        if not use_queue:
+            root.addHandler(handler)
+            return None
+
+        log_queue = queue.SimpleQueue()
+        root.addHandler(_RecordQueueHandler(log_queue))
+        _listener = QueueListener(log_queue, handler, respect_handler_level=True)
+        _listener.start()
+        return _listener
+
+
+def shutdown_logging():
+    """Kuyrukta kalan kayıtları yazar ve listener thread'ini durdurur"""
+    global _listener
+    with _listener_lock:
+        if _listener is not None:
+            _listener.stop()
+            _listener = None
+
+
+atexit.register(shutdown_logging)
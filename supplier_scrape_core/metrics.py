@@ -0,0 +1,182 @@
+from contextlib import contextmanager
+from typing import Dict, Iterable, Optional, Tuple
+import threading
+import time
+
+"""
+Aşama bazlı süre ölçümü.
+search_fetch, search_parse, product_fetch, product_parse, fill ve export aşamaları tedarikçi bazında
+histogramlarda toplanır; backend /metrics ile Prometheus formatında, main.py sonunda özet olarak verilir.
+"""
+
+STAGES = ("search_fetch", "search_parse", "product_fetch", "product_parse", "listing_fetch", "listing_parse", "fill", "diff", "export")
+
+# saniye
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# tedarikçisi belli olmayan ölçümler için etiket
+ALL_SUPPLIERS = "all"
+
+
+class Histogram:
+    """Kümülatif olmayan kova sayaçları, toplam ve en büyük değer"""
+
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+        self.errors = 0
+
+    def observe(self, value: float):
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+        else:
+            self.counts[-1] += 1
+        self.count += 1
+        self.sum += value
+        if value > self.max:
+            self.max = value
+
+    def quantile(self, q: float) -> float:
+        """Kova sınırlarından yaklaşık yüzdelik, +Inf kovasında en büyük değer döner"""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            seen += n
+            if seen >= rank and n:
+                return min(self.buckets[i], self.max) if i < len(self.buckets) else self.max
+        return self.max
+
+
+class MetricsRegistry:
+    """(aşama, tedarikçi) anahtarlı histogramlar. Thread-safe"""
+
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        self._histograms: Dict[Tuple[str, str], Histogram] = {}
+
+    @staticmethod
+    def _label(supplier) -> str:
+        if supplier is None:
+            return ALL_SUPPLIERS
+        return getattr(supplier, "name", str(supplier))
+
+    def observe(self, stage: str, supplier, seconds: float, error: bool = False):
+        key = (stage, self._label(supplier))
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram(self.buckets)
+            histogram.observe(seconds)
+            if error:
+                histogram.errors += 1
+
+    @contextmanager
+    def span(self, stage: str, supplier=None):
+        """
+        Bloğun süresini ölçer. Exception fırlarsa süre yine kaydedilir ve hata sayılır
+
+        Args:
+            stage: STAGES içindeki aşama adı
+            supplier: Suppliers üyesi, None ise "all"
+        """
+        started = time.perf_counter()
+        error = False
+        try:
+            yield
+        except BaseException:
+            error = True
+            raise
+        finally:
+            self.observe(stage, supplier, time.perf_counter() - started, error)
+
+    def reset(self):
+        with self._lock:
+            self._histograms = {}
+
+    def _items(self):
+        with self._lock:
+            return sorted(
+                (key, h.count, h.sum, h.max, h.errors, list(h.counts), h)
+                for key, h in self._histograms.items()
+            )
+
+    def snapshot(self) -> Dict[str, Dict]:
+        """JSON'a çevrilebilir özet. Anahtar "aşama/tedarikçi" """
+        result = {}
+        for (stage, supplier), count, total, maximum, errors, _, histogram in self._items():
+            result[f"{stage}/{supplier}"] = {
+                "count": count,
+                "errors": errors,
+                "total_s": round(total, 4),
+                "mean_ms": round(total / count * 1000, 2) if count else 0.0,
+                "p95_ms": round(histogram.quantile(0.95) * 1000, 2),
+                "max_ms": round(maximum * 1000, 2),
+            }
+        return result
+
+    def render_prometheus(self, gauges: Optional[Dict[str, float]] = None) -> str:
+        """
+        Prometheus text exposition formatı
+
+        Args:
+            gauges: Ek olarak yazılacak isim -> değer çiftleri
+        """
+        name = "scrape_stage_duration_seconds"
+        lines = [
+            f"# HELP {name} Time spent per scrape stage and supplier",
+            f"# TYPE {name} histogram",
+        ]
+        errors = []
+        for (stage, supplier), count, total, _, error_count, counts, _ in self._items():
+            labels = f'stage="{stage}",supplier="{supplier}"'
+            cumulative = 0
+            for bound, n in zip(self.buckets, counts):
+                cumulative += n
+                lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+            lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {count}')
+            lines.append(f"{name}_sum{{{labels}}} {total:.6f}")
+            lines.append(f"{name}_count{{{labels}}} {count}")
+            errors.append(f"scrape_stage_errors_total{{{labels}}} {error_count}")
+
+        if errors:
+            lines.append("# HELP scrape_stage_errors_total Stage spans that ended with an exception")
+            lines.append("# TYPE scrape_stage_errors_total counter")
+            lines.extend(errors)
+
+        for gauge, value in (gauges or {}).items():
+            lines.append(f"# TYPE {gauge} gauge")
+            lines.append(f"{gauge} {value}")
+        return "\n".join(lines) + "\n"
+
+    def summary(self, stages: Iterable[str] = STAGES) -> str:
+        """Aşama ve tedarikçi bazında okunabilir tablo"""
+        snapshot = self.snapshot()
+        if not snapshot:
+            return "No stage timings recorded"
+        order = {stage: i for i, stage in enumerate(stages)}
+        rows = sorted(snapshot.items(), key=lambda kv: (order.get(kv[0].split("/")[0], len(order)), kv[0]))
+
+        lines = [f"{'stage/supplier':<28} {'count':>7} {'errors':>6} {'total s':>9} {'mean ms':>9} {'p95 ms':>9} {'max ms':>9}"]
+        for key, s in rows:
+            lines.append(
+                f"{key:<28} {s['count']:>7} {s['errors']:>6} {s['total_s']:>9.2f} "
+                f"{s['mean_ms']:>9.1f} {s['p95_ms']:>9.1f} {s['max_ms']:>9.1f}"
+            )
+        return "\n".join(lines)
+
+
+# backend ve main.py'nin ortak kullandığı kayıt
+registry = MetricsRegistry()
+
+
+def span(stage: str, supplier=None):
+    """Paylaşılan kayıt üzerinde süre ölçümü"""
+    return registry.span(stage, supplier)
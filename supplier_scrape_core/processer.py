@@ -1,14 +1,36 @@
-from typing import List
-import requests
+from typing import TYPE_CHECKING, Callable, Iterable, Iterator, List, Optional, Sized, Tuple
+from collections import Counter, OrderedDict
+import copy
+import os
+import threading
+import time
+from urllib.parse import urlsplit
 from .scrape_direct import ProductScraper
 import logging
 from .structers.product import Product, Suppliers, PreState
-from requests.adapters import HTTPAdapter
-from urllib3.util.retry import Retry
-import urllib3
+from .cache import ProductCache, LinkIndex, shared_cache, shared_link_index
+from .connections import shared_session, SESSION_SEARCH, SESSION_PRODUCT
+from .ratelimit import HostRateLimiter
+from .breaker import BreakerRegistry, shared_breakers
+from .metrics import span
+from .logs import CodeLog, BatchSummary
 
-# SSL uyarılarını bastır
-urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
+if TYPE_CHECKING:
+    from .breaker import CircuitBreaker
+    from .images import ImageVerifier
+    from .store import ProductStore
+
+# aynı batch içinde tekrar eden kodlar için hatırlanan son sonuç sayısı
+DUPLICATE_WINDOW = 2048
+# iter_with_code'da depoya tek seferde yazılan ürün sayısı
+STORE_BATCH = 500
+# tedarikçinin devresine hata sayılan arama cevapları
+BREAKER_STATUSES = (403, 429, 500, 502, 503, 504)
+# arama isteği zaman aşımı (saniye), tekrar sayısı ve backoff katsayısı; ürün sayfası zaman aşımı (saniye)
+SEARCH_TIMEOUT = 15
+SEARCH_RETRIES = 3
+SEARCH_BACKOFF = 1
+PRODUCT_TIMEOUT = 10
 
 headers = {
     "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
@@ -24,86 +46,419 @@ headers = {
     "Cache-Control": "max-age=0",
 }
 
-def create_session_with_retries():
+def search_link_template(supplier:Suppliers) -> str:
+    """
+    Tedarikçinin arama linki şablonu.
+    SCRAPE_SUPPLIER_BASE_URL tanımlıysa (benchmark / test stub sunucusu) tüm tedarikçiler oraya yönlendirilir.
+    """
+    base_url = os.environ.get("SCRAPE_SUPPLIER_BASE_URL")
+    if base_url:
+        return f"{base_url.rstrip('/')}/{supplier.name.lower()}/urunler/arama?q={{code}}"
+    return supplier.value["search_link_prefix"]
+
+def supplier_base_url(supplier:Suppliers) -> str:
+    """Tedarikçi sitesinin kök adresi, kategori gezintisi buradan başlar"""
+    base_url = os.environ.get("SCRAPE_SUPPLIER_BASE_URL")
+    if base_url:
+        return f"{base_url.rstrip('/')}/{supplier.name.lower()}"
+    parts = urlsplit(supplier.value["search_link_prefix"])
+    return f"{parts.scheme}://{parts.netloc}"
+
+def create_session_with_retries(pool_maxsize:int = 10):
     """Retry mekanizmasıyla session oluştur"""
+    # requests/urllib3 ilk fetch'te yüklenir, import süresine eklenmez
+    import requests
+    import urllib3
+    from requests.adapters import HTTPAdapter
+    from urllib3.util.retry import Retry
+
+    # SSL uyarılarını bastır
+    urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
+
     session = requests.Session()
     session.headers.update(headers)
     
     # Retry stratejisi tanımla
     retry_strategy = Retry(
-        total=3,  # Toplam retry sayısı
-        backoff_factor=1,  # İlk 1 saniye, sonra 2, 4 saniye bekleme
+        total=SEARCH_RETRIES,  # Toplam retry sayısı
+        backoff_factor=SEARCH_BACKOFF,  # İlk 1 saniye, sonra 2, 4 saniye bekleme
         status_forcelist=[403, 429, 500, 502, 503, 504],  # Bu status kodlarında retry et
         allowed_methods=["GET", "POST"]
     )
     
-    adapter = HTTPAdapter(max_retries=retry_strategy)
+    adapter = HTTPAdapter(max_retries=retry_strategy, pool_maxsize=pool_maxsize)
     session.mount("http://", adapter)
     session.mount("https://", adapter)
     
     return session
 
-class Processer:
+def access_error(error: Optional[Exception]) -> Optional[str]:
+    """
+    ProductScraper.fetch_product'ın istek hatası tedarikçinin devresine hata sayılıyorsa kısa açıklaması, değilse None.
+    404 gibi cevaplar site ayakta demektir
+    """
+    if error is None:
+        return None
+    response = getattr(error, "response", None)
+    if response is not None:
+        return f"HTTP {response.status_code}" if response.status_code in BREAKER_STATUSES else None
+    return type(error).__name__
+
+def code_worst_case() -> float:
+    """
+    Tek kodun en kötü çekim süresi (saniye): her denemesi zaman aşımına uğrayan arama, aradaki backoff
+    beklemeleri ve ürün sayfası. deadline sadece yeni kod başlatılmasını durdurur, cevap en geç deadline + bu süre
+    """
+    backoff = sum(SEARCH_BACKOFF * 2 ** i for i in range(SEARCH_RETRIES))
+    return SEARCH_TIMEOUT * (SEARCH_RETRIES + 1) + backoff + PRODUCT_TIMEOUT
+
+def pending_prestates(supplier:Suppliers, prestates:Iterable[PreState], *results:Iterable[Product]) -> List[PreState]:
+    """
+    Sonuç listelerinde (başarılı / başarısız) yer almayan prestate'ler, ör. deadline yüzünden çekilmeyenler.
+    Listede tekrar eden kodlar adet olarak eşleştirilir
+    """
+    done = Counter(str(product.urun_kodu) for products in results for product in products)
+    pending = []
+    for prestate in prestates:
+        key = supplier.value["prefix"] + str(prestate.code).strip()
+        if done[key] > 0:
+            done[key] -= 1
+        else:
+            pending.append(prestate)
+    return pending
+
+class SingleFlight:
+    """
+    Aynı anahtar için eşzamanlı yapılan çağrıları tek bir çalıştırmada birleştirir.
+    İlk gelen çağrı işi yapar, aynı anda gelen diğerleri onun sonucunu bekler.
+    """
+
+    class _Call:
+        def __init__(self):
+            self.event = threading.Event()
+            self.result = None
+            self.error = None
+
     def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+        self.coalesced = 0
+
+    def do(self, key, fn: Callable):
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._Call()
+                self._calls[key] = call
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.event.set()
+        return call.result
+
+    def mark_coalesced(self):
+        """Aynı istek içinde tekrar eden kodlar için sayacı arttır"""
+        with self._lock:
+            self.coalesced += 1
+
+
+class Processer:
+    # (supplier, code) anahtarlı, tüm Processer örnekleri arasında paylaşılan uçuştaki istekler
+    inflight = SingleFlight()
+
+    def __init__(self, cache: Optional[ProductCache] = None, link_index: Optional[LinkIndex] = None,
+                 rate_limiter: Optional[HostRateLimiter] = None, image_verifier: Optional["ImageVerifier"] = None,
+                 store: Optional["ProductStore"] = None, breakers: Optional[BreakerRegistry] = None):
+        """
+        Args:
+            cache: Ürün önbelleği. Verilmezse istekler arasında paylaşılan önbellek kullanılır
+            link_index: Kod -> ürün linki indeksi. Verilmezse paylaşılan indeks kullanılır
+            rate_limiter: Verilirse her istekten önce host bazında hız sınırı uygulanır
+            image_verifier: Verilirse başarılı ürünlerin görsel URL'leri arka planda doğrulanır
+            store: Verilirse her get_with_code sonucu depoya toplu yazılır
+            breakers: Tedarikçi devre kesicileri. Verilmezse paylaşılan devreler kullanılır
+        """
         self.product_scraper = None
-    
-    def get_with_code(self,supplier:Suppliers,*prestates:List[PreState])->tuple:
-        self.product_scraper = ProductScraper()
+        self.cache = cache if cache is not None else shared_cache
+        self.link_index = link_index if link_index is not None else shared_link_index
+        self.rate_limiter = rate_limiter
+        self.image_verifier = image_verifier
+        self.store = store
+        self.breakers = breakers if breakers is not None else shared_breakers
+        # son get_with_code çalışmasının depodaki id'si, export'lar bununla okunur
+        self.last_scrape_id = None
 
-        products = []
-        failed_products = []
-        logging.info(f"\n{'=' *140}\nStarting with: {supplier.value['name']} Supplier\n\n")
-        for i, prestate in enumerate(prestates):
-            prestate:PreState
-            url = supplier.value["search_link_prefix"].format(code=str(prestate.code))
-            logging.info(f"[{i}][{prestate.code}] Searching url: "+url)
-            
-            # Retry mekanizmasıyla session oluştur
-            session = create_session_with_retries()
-            
-            logging.debug(f"[{i}][{prestate.code}] Session headers: {session.headers}")
-
-            # çekilememe durumunda atanacak eleman
-            failed_product = Product(urun_kodu=prestate.code,marka=supplier,fiyat=prestate.price,stok=prestate.stock)
-            
-            try:
-                # SSL verification devre dışı ve timeout ekle
-                logging.info(f"[{i}][{prestate.code}] Fetching with verify=False, timeout=15")
-                response = session.get(url, timeout=15, verify=False)
-                logging.info(f"[{i}][{prestate.code}] Response status code: {response.status_code}")
-                logging.debug(f"[{i}][{prestate.code}] Response headers: {response.headers}")
-            except Exception as e:
-                logging.error(f"[{i}][{prestate.code}] Exception on finding with search (retry failed): {str(e)}")
-                failed_products.append(failed_product)
-                continue
-            
-            if response.status_code == 200:
-                html_content = response.text
+    def _throttle(self, url: str):
+        if self.rate_limiter is not None:
+            self.rate_limiter.wait(url)
+
+    @classmethod
+    def coalesced_count(cls) -> int:
+        """Birleştirilerek tek fetch'e indirilen istek sayısı"""
+        return cls.inflight.coalesced
+
+    def _scrape_product(self, link: str, supplier: Suppliers, breaker: "CircuitBreaker") -> Tuple[Optional[Product], bool]:
+        """
+        Ürün sayfasını çeker, sonucu tedarikçinin devresine yazar
+
+        Returns:
+            (Product veya None, erişim hatası mı)
+        """
+        product, error = self.product_scraper.fetch_product(link, supplier)
+        failure = access_error(error)
+        if failure is not None:
+            breaker.record_failure(failure)
+        elif error is not None or product is not None:
+            # 404 vb. cevap veya başarılı çekim, site ayakta
+            breaker.record_success()
+        return product, failure is not None
+
+    def _fetch_product(self, supplier: Suppliers, code: str, log: CodeLog) -> Optional[Product]:
+        """
+        Ürün linki indekste varsa doğrudan ürünü çeker, yoksa veya link artık geçersizse
+        arama sayfası üzerinden bulur. Başarısızlıkta veya tedarikçinin devresi açıksa None döner
+        """
+        breaker = self.breakers.get(supplier)
+        if not breaker.allow():
+            # site erişilemez durumda, retry / timeout beklemeden başarısız say
+            log.warning("Circuit open for %s, skipped", supplier.name)
+            return None
+
+        link = self.link_index.get(supplier, code)
+        if link:
+            log.info("Product Link from index: %s", link)
+            self._throttle(link)
+            product, unreachable = self._scrape_product(link, supplier, breaker)
+            if product:
+                log.info("Product fetch Success: %s", product)
+                return product
+            if unreachable:
+                # site erişilemez, link geçerli kalır; arama da aynı siteye gideceği için denenmez
+                log.error("Product page unreachable: %s", link)
+                return None
+            # link eskimiş olabilir, aramaya geri dön
+            self.link_index.discard(supplier, code)
+
+        return self._search_and_fetch_product(supplier, code, log, breaker)
+
+    def _search_and_fetch_product(self, supplier: Suppliers, code: str, log: CodeLog,
+                                  breaker: "CircuitBreaker") -> Optional[Product]:
+        """
+        Arama sayfası üzerinden ürün linkini bulur ve ürünü çeker. Başarısızlıkta None döner.
+        Arama ve ürün sayfası isteklerinin sonucu tedarikçinin devresine yazılır
+        """
+        url = search_link_template(supplier).format(code=code)
+        log.info("Searching url: %s", url)
+
+        # retry'lı paylaşılan session, bağlantılar batch'ler arasında açık kalır (connections.ConnectionWarmer)
+        session = shared_session(SESSION_SEARCH)
+
+        log.debug("Session headers: %s", session.headers)
+
+        try:
+            # SSL verification devre dışı ve timeout ekle
+            self._throttle(url)
+            with span("search_fetch", supplier):
+                response = session.get(url, timeout=SEARCH_TIMEOUT, verify=False)
+            log.info("Response status code: %s", response.status_code)
+            log.debug("Response headers: %s", response.headers)
+        except Exception as e:
+            log.error("Exception on finding with search (retry failed): %s", e)
+            breaker.record_failure(type(e).__name__)
+            return None
+
+        if response.status_code == 200:
+            breaker.record_success()
+            html_content = response.text
+        else:
+            log.error("Exception on html fetch: %s", response.status_code)
+            # 404 vb. site ayakta demek, sadece erişim hataları devreyi açar
+            if response.status_code in BREAKER_STATUSES:
+                breaker.record_failure(f"HTTP {response.status_code}")
             else:
-                logging.error(f"[{i}][{prestate.code}] Exception on html fetch: {response.status_code}")
-                failed_products.append(failed_product)
-                continue
-            
+                breaker.record_success()
+            return None
+
+        with span("search_parse", supplier):
             link, ret = self.product_scraper.extract_product_href_using_search(html_content)
-            
-            if ret:
-                logging.info(f"[{i}][{prestate.code}] Product Link: "+ link)
-            else:
-                logging.error(f"[{i}][{prestate.code}] Product not found: ")
-                failed_products.append(failed_product)
-                continue
-            
-            product = self.product_scraper.scrape_product(link, supplier)
-            if product:
-                logging.info(f"[{i}][{prestate.code}] Product fetch Success: {product}")
+
+        if ret:
+            log.info("Product Link: %s", link)
+            self.link_index.put(supplier, code, link)
+        else:
+            log.error("Product not found")
+            return None
+
+        self._throttle(link)
+        product, _ = self._scrape_product(link, supplier, breaker)
+        if product:
+            log.info("Product fetch Success: %s", product)
+        else:
+            log.error("Exception on product fetch")
+        return product
+
+    def _fetch_and_cache(self, supplier: Suppliers, code: str, log: CodeLog) -> Optional[Product]:
+        product = self._fetch_product(supplier, code, log)
+        if product is not None:
+            self.cache.put(supplier, code, product)
+        return product
+
+    def _iter_outcomes(self, supplier:Suppliers, prestates:Iterable[PreState], summary:BatchSummary,
+                       on_result:Optional[Callable[[PreState, Product, bool], None]] = None,
+                       cancel_event:Optional[threading.Event] = None,
+                       deadline:Optional[float] = None) -> Iterator[Tuple[PreState, Product, bool]]:
+        """get_with_code / iter_with_code ortak döngüsü, her kod için (prestate, product, başarılı mı)"""
+        self.product_scraper = ProductScraper(timeout=PRODUCT_TIMEOUT, session=shared_session(SESSION_PRODUCT))
+
+        # bu istek içinde zaten çekilmiş kodlar (aynı kod listede tekrar ediyorsa), pencere dışı tekrarlar önbellekten döner
+        fetched = OrderedDict()
+        i = -1
+        for i, prestate in enumerate(prestates):
+            prestate:PreState
+            if cancel_event is not None and cancel_event.is_set():
+                summary.skipped = summary.total - i if summary.total else 0
+                logging.warning("Cancelled, %d codes skipped", summary.skipped)
+                break
+            if deadline is not None and time.monotonic() >= deadline:
+                summary.skipped = summary.total - i if summary.total else 0
+                logging.warning("Deadline reached, %d codes left pending", summary.skipped)
+                break
+            code = str(prestate.code).strip()
+            log = CodeLog(i, prestate.code)
+
+            if code in fetched:
+                self.inflight.mark_coalesced()
+                summary.duplicates += 1
+                log.info("Duplicate code in batch, reusing result")
+                product = fetched[code]
+                fetched.move_to_end(code)
             else:
-                logging.error(f"[{i}][{prestate.code}] Exception on product fetch")
-                failed_products.append(failed_product)
+                product = self.cache.get(supplier, code)
+                if product is not None:
+                    summary.cache_hits += 1
+                    log.info("Served from cache")
+                else:
+                    # aynı anda başka bir istek aynı kodu çekiyorsa onun sonucunu bekle
+                    product = self.inflight.do(
+                        (supplier, code),
+                        lambda: self._fetch_and_cache(supplier, code, log)
+                    )
+                fetched[code] = product
+                if len(fetched) > DUPLICATE_WINDOW:
+                    fetched.popitem(last=False)
+
+            if product is None:
+                # çekilememe durumunda atanacak eleman
+                failed_product = Product(urun_kodu=prestate.code,marka=supplier,fiyat=prestate.price,stok=prestate.stock)
+                summary.failed += 1
+                if on_result is not None:
+                    on_result(prestate, failed_product, False)
+                yield prestate, failed_product, False
                 continue
-            
+
+            # her çağıran kendi fiyat/stok bilgisini alır, paylaşılan nesneye dokunulmaz
+            product = copy.copy(product)
             product.fiyat = prestate.price
             product.stok = prestate.stock
-            products.append(product)
-        logging.info(f"\nTotal Successful: {len(products)} Failed: {len(failed_products)}\n{supplier.value['name']} fetch process ended.\n{'='*140}")
+            summary.successed += 1
+            if on_result is not None:
+                on_result(prestate, product, True)
+
+            # görsel kontrolü kendi havuzunda çalışır, burada beklenmez
+            if self.image_verifier is not None:
+                self.image_verifier.submit(product.gorsel_url)
+            yield prestate, product, True
+        if not summary.total:
+            summary.total = i + 1
+
+    def get_with_code(self,supplier:Suppliers,*prestates:List[PreState],
+                      on_result:Optional[Callable[[PreState, Product, bool], None]] = None,
+                      cancel_event:Optional[threading.Event] = None,
+                      deadline:Optional[float] = None)->tuple:
+        """
+        Args:
+            supplier: Ürünlerin çekileceği tedarikçi
+            prestates: Ürün kodu, fiyat ve stok bilgileri
+            on_result: Verilirse her kod bittiğinde (prestate, product, başarılı mı) ile çağrılır
+            cancel_event: Set edildiğinde kalan kodlar çekilmez
+            deadline: time.monotonic() cinsinden son an. Geçince yeni kod başlatılmaz, o an çekilmekte olan kod
+                tamamlanır. Kalan kodlar iki listede de yer almaz, pending_prestates ile bulunur
+
+        Returns:
+            (başarılı ürünler, başarısız ürünler)
+        """
+        products = []
+        failed_products = []
+        summary = BatchSummary(supplier, len(prestates))
+        logging.info("Starting with: %s Supplier, %d codes", supplier.value['name'], len(prestates))
+        for _, product, success in self._iter_outcomes(supplier, prestates, summary, on_result, cancel_event, deadline):
+            (products if success else failed_products).append(product)
+        summary.log()
+        if self.store is not None:
+            self.last_scrape_id = self.store.record(supplier, products, len(failed_products))
         return products, failed_products
-            
+
+    def iter_with_code(self, supplier:Suppliers, prestates:Iterable[PreState],
+                       on_result:Optional[Callable[[PreState, Product, bool], None]] = None,
+                       cancel_event:Optional[threading.Event] = None,
+                       deadline:Optional[float] = None) -> Iterator[Tuple[PreState, Product, bool]]:
+        """
+        get_with_code'un sonuçları biriktirmeyen hali, her kod bittiğinde (prestate, product, başarılı mı) yield eder.
+        prestates liste veya generator olabilir, bellek kullanımı batch boyutuyla büyümez.
+        store verilmişse başarılı ürünler STORE_BATCH'lik parçalar halinde depoya yazılır; tüketici erken
+        bırakırsa o ana kadarki sonuçlar yazılır
+
+        Args:
+            supplier: Ürünlerin çekileceği tedarikçi
+            prestates: Ürün kodu, fiyat ve stok bilgileri
+            on_result, cancel_event, deadline: get_with_code ile aynı
+        """
+        summary = BatchSummary(supplier, len(prestates) if isinstance(prestates, Sized) else 0)
+        logging.info("Streaming with: %s Supplier", supplier.value['name'])
+        store, scrape_id, batch = self.store, None, []
+        if store is not None:
+            try:
+                scrape_id = store.begin_scrape(supplier, "stream")
+            except Exception as e:
+                logging.error(f"[{supplier.name}] Store write fail: {e}")
+                store = None
+
+        def flush():
+            nonlocal store
+            try:
+                store.upsert(batch, scrape_id)
+            except Exception as e:
+                logging.error(f"[{supplier.name}] Store write fail: {e}")
+                store = None
+            batch.clear()
+
+        try:
+            for outcome in self._iter_outcomes(supplier, prestates, summary, on_result, cancel_event, deadline):
+                yield outcome
+                if store is not None and outcome[2]:
+                    batch.append(outcome[1])
+                    if len(batch) >= STORE_BATCH:
+                        flush()
+        finally:
+            summary.log()
+            if store is not None:
+                flush()
+            # yazım hata verdiyse store None olmuştur
+            if store is not None:
+                store.finish_scrape(scrape_id, summary.successed, summary.failed)
+                self.last_scrape_id = scrape_id
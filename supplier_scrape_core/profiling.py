@@ -0,0 +1,168 @@
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+import datetime
+import importlib.util
+import logging
+import os
+import re
+import threading
+import time
+
+"""
+İsteğe bağlı batch profili.
+Tek bir get_with_code çalışması profillenir ve rapor yerel bir dizine yazılır.
+pyinstrument kuruluysa örnekleyen profiler ile speedscope json üretilir. cProfile her çağrıyı izlediği için
+düşük maliyetli değildir, sadece allow_deterministic ile açıkça istenirse pstats üretmek için kullanılır.
+
+Canlı trafikte güvenli olması için aynı anda tek profil çalışır ve iki profil arasında
+en az min_interval saniye geçmesi gerekir; dizinde en fazla max_reports rapor tutulur.
+"""
+
+REPORT_NAME_PATTERN = re.compile(r"^[\w.-]+\.(speedscope\.json|pstats)$")
+
+MODE_SAMPLING = "sampling"
+MODE_DETERMINISTIC = "deterministic"
+
+
+def _safe_label(label: str) -> str:
+    return re.sub(r"[^\w-]+", "_", label)[:40] or "batch"
+
+
+class ProfileStore:
+    """Profil raporlarını üreten ve saklayan dizin"""
+
+    def __init__(self, directory: str = "./profiles", min_interval: float = 60.0, max_reports: int = 50,
+                 sampling_interval: float = 0.001, allow_deterministic: bool = False):
+        """
+        Args:
+            directory: Raporların yazılacağı dizin
+            min_interval: İki profil arasında geçmesi gereken en az süre (saniye), 0 ise sınırsız
+            max_reports: Dizinde tutulacak en fazla rapor, eskiler silinir
+            sampling_interval: pyinstrument örnekleme aralığı (saniye)
+            allow_deterministic: pyinstrument yoksa cProfile kullanılsın mı. Verilmezse profil kapalıdır
+        """
+        self.directory = directory
+        self.min_interval = min_interval
+        self.max_reports = max_reports
+        self.sampling_interval = sampling_interval
+        # pyinstrument import edilmeden bakılır, ilk profile kadar yüklenmez
+        if importlib.util.find_spec("pyinstrument") is not None:
+            self.mode = MODE_SAMPLING
+        elif allow_deterministic:
+            self.mode = MODE_DETERMINISTIC
+        else:
+            self.mode = None
+        self._lock = threading.Lock()
+        self._running = False
+        self._last_started = None
+        self.skipped = 0
+
+    def _acquire(self) -> bool:
+        with self._lock:
+            now = time.monotonic()
+            if self._running or (
+                self._last_started is not None and now - self._last_started < self.min_interval
+            ):
+                self.skipped += 1
+                return False
+            self._running = True
+            self._last_started = now
+            return True
+
+    def _release(self):
+        with self._lock:
+            self._running = False
+
+    @contextmanager
+    def profile(self, label: str = "batch"):
+        """
+        Bloğu profiller. Sınır nedeniyle veya profil kapalı olduğu için profillenmezse blok yine çalışır.
+        Yield edilen dict'in "name" anahtarı, rapor yazıldıktan sonra dosya adını taşır (aksi halde None),
+        "mode" anahtarı profilin örnekleyen mi her çağrıyı izleyen mi olduğunu
+
+            with store.profile("BALGUNES") as report:
+                processer.get_with_code(...)
+            report["name"]
+        """
+        report = {"name": None, "mode": self.mode}
+        if self.mode is None or not self._acquire():
+            yield report
+            return
+
+        try:
+            profiler = self._start()
+        except Exception as e:
+            logging.error(f"Profiler start fail: {e}")
+            self._release()
+            yield report
+            return
+
+        try:
+            yield report
+        finally:
+            try:
+                report["name"] = self._stop(profiler, label)
+                logging.info(f"Profile saved: {report['name']}")
+            except Exception as e:
+                logging.error(f"Profile save fail: {e}")
+            finally:
+                self._release()
+
+    def _start(self):
+        if self.mode == MODE_DETERMINISTIC:
+            import cProfile
+            profiler = cProfile.Profile()
+            profiler.enable()
+            return profiler
+
+        from pyinstrument import Profiler
+        profiler = Profiler(interval=self.sampling_interval)
+        profiler.start()
+        return profiler
+
+    def _stop(self, profiler, label: str) -> str:
+        os.makedirs(self.directory, exist_ok=True)
+        stamp = datetime.datetime.now().strftime("%Y%m%dT%H%M%S%f")
+        base = os.path.join(self.directory, f"{stamp}_{_safe_label(label)}")
+
+        if hasattr(profiler, "disable"):
+            profiler.disable()
+            path = base + ".pstats"
+            profiler.dump_stats(path)
+        else:
+            from pyinstrument.renderers import SpeedscopeRenderer
+            profiler.stop()
+            path = base + ".speedscope.json"
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(profiler.output(SpeedscopeRenderer()))
+
+        self._prune()
+        return os.path.basename(path)
+
+    def _prune(self):
+        reports = self.list()
+        for report in reports[self.max_reports:]:
+            try:
+                os.remove(self.path(report["name"]))
+            except OSError:
+                pass
+
+    def list(self) -> List[Dict]:
+        """Raporlar, yeniden eskiye"""
+        if not os.path.isdir(self.directory):
+            return []
+        reports = []
+        for name in os.listdir(self.directory):
+            if not REPORT_NAME_PATTERN.match(name):
+                continue
+            stat = os.stat(os.path.join(self.directory, name))
+            reports.append({"name": name, "size": stat.st_size, "created": stat.st_mtime})
+        reports.sort(key=lambda r: r["name"], reverse=True)
+        return reports
+
+    def path(self, name: str) -> Optional[str]:
+        """Rapor dosyasının yolu, geçersiz veya olmayan ad için None"""
+        if not REPORT_NAME_PATTERN.match(name):
+            return None
+        path = os.path.join(self.directory, name)
+        return path if os.path.isfile(path) else None
@@ -0,0 +1,40 @@
+from typing import Dict
+from urllib.parse import urlsplit
+import threading
+import time
+
+"""
+Tedarikçi sitelerine host bazında istek hızı sınırı uygulayan yardımcılar
+"""
+
+
+class HostRateLimiter:
+    """Aynı host'a yapılan iki istek arasında en az `min_interval` saniye bırakır"""
+
+    def __init__(self, min_interval: float = 1.0):
+        """
+        Args:
+            min_interval: Aynı host'a art arda iki istek arası en kısa süre (saniye)
+        """
+        self.min_interval = min_interval
+        self._lock = threading.Lock()
+        # host -> bir sonraki isteğe izin verilen zaman
+        self._next_allowed: Dict[str, float] = {}
+
+    def wait(self, url: str) -> float:
+        """
+        Gerekirse host için sıradaki izinli zamana kadar bekler
+
+        Returns:
+            Beklenen süre (saniye)
+        """
+        host = urlsplit(url).hostname or ""
+        with self._lock:
+            now = time.monotonic()
+            allowed = max(now, self._next_allowed.get(host, now))
+            # slotu hemen ayır, böylece eşzamanlı çağıranlar sıraya girer
+            self._next_allowed[host] = allowed + self.min_interval
+        delay = allowed - now
+        if delay > 0:
+            time.sleep(delay)
+        return delay
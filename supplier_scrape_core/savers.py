@@ -1,15 +1,69 @@
-from typing import List
+from typing import TYPE_CHECKING, Dict, Iterable, List, Optional, Tuple
+import json
 import logging
-import pandas as pd
 from .structers.product import Product
+from .metrics import span
+from .cache import _atomic_write_json
 import os
 import io
 
+# pandas/openpyxl ilk export'ta yüklenir
+if TYPE_CHECKING:
+    import pandas as pd
+
+# diff export'ta değişiklik sayılan alanlar
+DIFF_FIELDS = ("urun_ismi", "gorsel_url", "kategori", "fiyat", "stok")
+
+
+def _normalize(value) -> str:
+    # None/NaN boş; eksik değer yüzünden float'a dönen 13.0 ile 13 aynı hash'i versin
+    if value is None or value != value:
+        return ""
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value).strip()
+
+
+class ExportSnapshot:
+    """Son export edilen satırlar: urun_kodu -> [içerik hash'i, isim]. Bir sonraki diff export buna göre yapılır"""
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path
+        self._rows: Dict[str, list] = {}
+        if path and os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                self._rows = json.load(f)
+
+    def get(self, key) -> Optional[str]:
+        row = self._rows.get(str(key))
+        return row[0] if row else None
+
+    def name(self, key) -> Optional[str]:
+        row = self._rows.get(str(key))
+        return row[1] if row else None
+
+    def keys(self) -> List[str]:
+        return list(self._rows)
+
+    def update(self, rows: Dict[str, list]):
+        self._rows.update(rows)
+
+    def discard(self, keys: Iterable):
+        for key in keys:
+            self._rows.pop(str(key), None)
+
+    def __len__(self):
+        return len(self._rows)
+
+    def save(self):
+        if self.path:
+            _atomic_write_json(self.path, self._rows)
+
 class SaverLikeIkasTemplate:
     
     def __init__(self,template_path:str = None):
         if template_path is None:
-            self.template_path = os.path.dirname(__file__) + r"\template\ikas-urunler.xlsx"
+            self.template_path = os.path.join(os.path.dirname(__file__), "template", "ikas-urunler.xlsx")
         else: 
             self.template_path = template_path
             
@@ -18,6 +72,8 @@ class SaverLikeIkasTemplate:
         self.column_remap = self._get_column_remap()
         
     def _get_template(self):
+        import pandas as pd
+
         try:
             frame = pd.read_excel(self.template_path)
         except Exception as e:
@@ -37,20 +93,37 @@ class SaverLikeIkasTemplate:
             "marka" : "Tedarikçi"
             }
     
+    @staticmethod
+    def _supplier_of(products: List[Product]):
+        """Süre ölçümü etiketi için ürünlerin tedarikçisi, karışık veya boşsa None"""
+        suppliers = {product.marka for product in products}
+        return suppliers.pop() if len(suppliers) == 1 else None
+
     def fill(self, products: List[Product], static_values = None):
+        with span("fill", self._supplier_of(products)):
+            return self._fill(self.products_frame(products), static_values)
+
+    @staticmethod
+    def products_frame(products: List[Product]) -> "pd.DataFrame":
+        """Ürünler, Product.to_dict kolonlarıyla"""
+        import pandas as pd
+
+        return pd.DataFrame([product.to_dict() for product in products])
 
-        rows = []
+    def fill_frame(self, frame: "pd.DataFrame", static_values = None):
+        """
+        Product.to_dict kolonlarındaki bir DataFrame'i (ör. ProductStore.read_frame) satır satır dolaşmadan doldurur
+        """
+        with span("fill"):
+            return self._fill(frame, static_values)
 
-        for product in products:
-            product_serie = (
-                pd.Series(product.to_dict())
-                .rename(self.column_remap)
-                .reindex(self.template_frame.columns)
-            )
+    def _remap(self, frame: "pd.DataFrame") -> "pd.DataFrame":
+        return frame.rename(columns=self.column_remap).reindex(columns=self.template_frame.columns)
 
-            rows.append(product_serie)
+    def _fill(self, frame: "pd.DataFrame", static_values = None):
+        import pandas as pd
 
-        new_df = pd.DataFrame(rows)
+        new_df = self._remap(frame)
 
         self.filled_frame = pd.concat(
             [self.template_frame, new_df],
@@ -58,26 +131,184 @@ class SaverLikeIkasTemplate:
         )
 
         # statik değerleri fill et
-        for k,v in static_values.items():
+        for k,v in (static_values or {}).items():
             self.filled_frame[k] = v
-    
+
         logging.debug(self.filled_frame)
         return self.filled_frame
         
-    def write(self,filled_frame:pd.DataFrame, dist_path = "./output.xlsx"):
+    def write(self,filled_frame:"pd.DataFrame", dist_path = "./output.xlsx") -> bool:
         try:
-            filled_frame.to_excel(dist_path, index=False)
+            with span("export"):
+                filled_frame.to_excel(dist_path, index=False)
             logging.info(f"Saved To: {dist_path}")
+            return True
         except Exception as e:
             logging.error(f"Save Fail To: {dist_path} \n{e}")
+            return False
+
+    def stream_writer(self, dist_path: str, static_values = None, chunk_size: int = 1000) -> "IkasStreamWriter":
+        """write(fill(...)) ile aynı dosyayı ürünler geldikçe parça parça yazan yazıcı"""
+        return IkasStreamWriter(self, dist_path, static_values, chunk_size)
+
+    def write_stream(self, products: Iterable[Product], dist_path: str, static_values = None) -> int:
+        """
+        Ürünleri tüketip dosyaya yazar, bellekte en fazla bir parça tutulur
+
+        Returns:
+            Yazılan ürün sayısı, hata durumunda -1
+        """
+        with self.stream_writer(dist_path, static_values) as writer:
+            for product in products:
+                writer.add(product)
+        return writer.count if writer.ok else -1
+
+    @staticmethod
+    def row_hashes(frame: "pd.DataFrame") -> "pd.Series":
+        """DIFF_FIELDS üzerinden satır içerik hash'i, index prefix'li urun_kodu (str)"""
+        import pandas as pd
+
+        frame = frame.reindex(columns=["urun_kodu", *DIFF_FIELDS])
+        values = frame[list(DIFF_FIELDS)].apply(lambda column: column.map(_normalize))
+        hashes = pd.util.hash_pandas_object(values, index=False).map("{:016x}".format)
+        hashes.index = frame["urun_kodu"].map(_normalize).values
+        return hashes
+
+    def diff_frame(self, frame: "pd.DataFrame", snapshot: ExportSnapshot,
+                   full: bool = True) -> Tuple["pd.DataFrame", Dict[str, list], List[str]]:
+        """
+        Satırları son export snapshot'ıyla karşılaştırır
+
+        Args:
+            frame: Product.to_dict kolonlarında güncel ürünler (fill öncesi)
+            snapshot: Son export edilen satırların hash'leri
+            full: frame tüm katalogsa True, snapshot'ta olup frame'de olmayanlar silinmiş sayılır
+
+        Returns:
+            (yeni / değişmiş satırlar, snapshot'a yazılacak {kod: [hash, isim]}, silinen kodlar)
+        """
+        with span("diff"):
+            hashes = self.row_hashes(frame)
+            changed = [snapshot.get(key) != digest for key, digest in hashes.items()]
+            names = frame["urun_ismi"].map(_normalize).values if "urun_ismi" in frame else [""] * len(frame)
+            rows = {
+                key: [digest, name]
+                for (key, digest), name, is_changed in zip(hashes.items(), names, changed) if is_changed
+            }
+            removed = sorted(set(snapshot.keys()) - set(hashes.index)) if full else []
+            return frame[changed], rows, removed
+
+    def removed_frame(self, removed: List[str], snapshot: ExportSnapshot) -> "pd.DataFrame":
+        """Silinen ürünler, şablon kolonlarında ve "Silindi mi?" işaretli"""
+        import pandas as pd
+
+        frame = pd.DataFrame({
+            "Barkod Listesi": removed,
+            "İsim": [snapshot.name(key) for key in removed],
+            "Silindi mi?": True,
+        })
+        return frame.reindex(columns=self.template_frame.columns)
+
+    def export_diff(self, frame: "pd.DataFrame", snapshot: ExportSnapshot, dist_path: str,
+                    removed_path: Optional[str] = None, static_values = None, full: bool = True) -> Dict[str, int]:
+        """
+        Sadece yeni / değişmiş satırları dist_path'e, silinenleri removed_path'e yazar.
+        Snapshot yalnızca dosyalar yazılabildiyse güncellenir
+
+        Returns:
+            {"rows", "changed", "unchanged", "removed"}
+        """
+        changed, rows, removed = self.diff_frame(frame, snapshot, full)
+        written = self.write(self.fill_frame(changed, static_values), dist_path)
+        if written and removed and removed_path:
+            written = self.write(self.removed_frame(removed, snapshot), removed_path)
+        if written:
+            snapshot.update(rows)
+            snapshot.discard(removed)
+            snapshot.save()
+
+        report = {
+            "rows": len(frame),
+            "changed": len(changed),
+            "unchanged": len(frame) - len(changed),
+            "removed": len(removed),
+        }
+        logging.info(f"Diff export {dist_path}: {report}")
+        return report
             
-    def convert_io_output(self,*filled_frames: List[pd.DataFrame]):
+    def convert_io_output(self,*filled_frames: List["pd.DataFrame"]):
+        import pandas as pd
+
         output = io.BytesIO()
-        df = pd.concat(filled_frames, ignore_index=True)
-        for i in ["İsim","Kategoriler"]:
-            df[i] = df[i].fillna("unknown")
-        with pd.ExcelWriter(output, engine="openpyxl") as writer:
-                df.to_excel(writer, index=False)
+        with span("export"):
+            df = pd.concat(filled_frames, ignore_index=True)
+            for i in ["İsim","Kategoriler"]:
+                df[i] = df[i].fillna("unknown")
+            with pd.ExcelWriter(output, engine="openpyxl") as writer:
+                    df.to_excel(writer, index=False)
         output.seek(0)
         return output
 
+
+
+class IkasStreamWriter:
+    """
+    İkas template'ini openpyxl write-only modunda satır satır yazar. Ürünler chunk_size'lık parçalar halinde
+    template kolonlarına çevrilir, tüm frame ve çalışma kitabı bellekte tutulmaz
+    """
+
+    def __init__(self, saver: SaverLikeIkasTemplate, dist_path: str, static_values = None, chunk_size: int = 1000):
+        from openpyxl import Workbook
+
+        self.saver = saver
+        self.dist_path = dist_path
+        self.static_values = static_values or {}
+        self.chunk_size = chunk_size
+        self.count = 0
+        self.ok = True
+        self._pending: List[Product] = []
+        self._workbook = Workbook(write_only=True)
+        self._sheet = self._workbook.create_sheet()
+        self._sheet.append(list(saver.template_frame.columns))
+        # template'teki örnek satırlar da fill'deki gibi başta yer alır
+        self._append(saver.template_frame.copy())
+
+    def _append(self, frame: "pd.DataFrame"):
+        for k, v in self.static_values.items():
+            frame[k] = v
+        frame = frame.astype(object).where(frame.notna(), None)
+        for row in frame.itertuples(index=False, name=None):
+            self._sheet.append(row)
+
+    def _flush(self):
+        if not self._pending:
+            return
+        with span("fill", self.saver._supplier_of(self._pending)):
+            frame = self.saver._remap(self.saver.products_frame(self._pending))
+        with span("export"):
+            self._append(frame)
+        self.count += len(self._pending)
+        self._pending = []
+
+    def add(self, product: Product):
+        self._pending.append(product)
+        if len(self._pending) >= self.chunk_size:
+            self._flush()
+
+    def close(self) -> bool:
+        """Kalan parçayı yazıp dosyayı kaydeder"""
+        try:
+            self._flush()
+            with span("export"):
+                self._workbook.save(self.dist_path)
+            logging.info(f"Saved To: {self.dist_path} ({self.count} products)")
+        except Exception as e:
+            logging.error(f"Save Fail To: {self.dist_path} \n{e}")
+            self.ok = False
+        return self.ok
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
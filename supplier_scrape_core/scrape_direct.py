@@ -1,8 +1,11 @@
-from bs4 import BeautifulSoup
-from typing import Optional
+from typing import TYPE_CHECKING, Optional, Tuple
 import logging
 from .structers.product import Product,Suppliers
-import requests
+from .metrics import span
+
+if TYPE_CHECKING:
+    import requests
+    from bs4 import BeautifulSoup
 
 """
 Önce ürün kodu ile ürün araması yapan sonra bu başarılı olduğunda ürün bilgilerini (Product)
@@ -13,14 +16,16 @@ SaveLikeİkas class'ıyla da ikas ürün template (xlsx) olarak bu ürünleri do
 class ProductScraper:
     """Ürün bilgilerini web'den çeken ve işleyen sınıf"""
     
-    def __init__(self, timeout: int = 10):
+    def __init__(self, timeout: int = 10, session: Optional["requests.Session"] = None):
         """
         ProductScraper başlatıcı
         
         Args:
             timeout: İstek zaman aşımı (saniye)
+            session: Verilirse istekler bu session'ın bağlantı havuzundan gider, verilmezse her istek yeni bağlantı
         """
         self.timeout = timeout
+        self.session = session
         self.headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
         }
@@ -35,32 +40,49 @@ class ProductScraper:
         Returns:
             Product instance veya hata durumunda None
         """
+        return self.fetch_product(url, supplier)[0]
+
+    def fetch_product(self, url: str, supplier: Suppliers) -> Tuple[Optional[Product], Optional[Exception]]:
+        """
+        scrape_product ile aynı, ürünle birlikte istek hatasını da döndürür. Bağlantı / zaman aşımı / HTTP durum
+        hataları (requests RequestException, HTTPError'da response dolu) ikinci elemandadır; parse hatası veya
+        sayfada ürün bulunamaması istek hatası sayılmaz
+
+        Returns:
+            (Product veya None, istek hatası veya None)
+        """
+        # bs4 ve requests ilk kullanımda yüklenir
+        import requests
+        from bs4 import BeautifulSoup
+
         try:
-            logging.info(f"Sending: {url}")
-            response = requests.get(url, headers=self.headers, timeout=self.timeout)
-            response.raise_for_status()
+            logging.debug("Sending: %s", url)
+            with span("product_fetch", supplier):
+                response = (self.session or requests).get(url, headers=self.headers, timeout=self.timeout)
+                response.raise_for_status()
     
 
-            soup = BeautifulSoup(response.content, 'html.parser')
+            with span("product_parse", supplier):
+                soup = BeautifulSoup(response.content, 'html.parser')
             
-            # Ürün bilgilerini çek
-            product = self._extract_product_info(soup, supplier)
+                # Ürün bilgilerini çek
+                product = self._extract_product_info(soup, supplier)
             
             if product:
-                logging.info(f"Fecthed: {product.urun_ismi}")
+                logging.debug("Fecthed: %s", product.urun_ismi)
             else:
-                logging.warning("Product information not found")
+                logging.warning("Product information not found: %s", url)
             
-            return product
+            return product, None
             
         except requests.exceptions.RequestException as e:
-            logging.error(f"Request Error: {e}")
-            return None
+            logging.error("Request Error: %s", e)
+            return None, e
         except Exception as e:
-            logging.error(f"Unexpected Error: {e}")
-            return None
+            logging.error("Unexpected Error: %s", e)
+            return None, None
     
-    def _extract_product_info(self, soup: BeautifulSoup, supplier:Suppliers) -> Optional[Product]:
+    def _extract_product_info(self, soup: "BeautifulSoup", supplier:Suppliers) -> Optional[Product]:
         """
         BeautifulSoup nesnesinden ürün bilgilerini ayıklar
         
@@ -124,6 +146,8 @@ class ProductScraper:
             tuple: (href_value, found) - href değeri ve bulundu mu (True/False)
                 Eğer bulunmazsa (None, False) döner
         """
+        from bs4 import BeautifulSoup
+
         try:
             # HTML'i parse et
             soup = BeautifulSoup(html_content, 'html.parser')
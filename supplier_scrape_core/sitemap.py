@@ -0,0 +1,341 @@
+from typing import Dict, Iterator, List, Optional, Tuple
+from urllib.parse import urljoin
+import argparse
+import json
+import logging
+import os
+import queue
+import re
+import threading
+import xml.etree.ElementTree as ET
+import zlib
+from .cache import (ProductCache, LinkIndex, shared_cache, shared_link_index, save_shared, load_shared,
+                    DEFAULT_CACHE_DIR, _atomic_write_json)
+from .ingest import find_supplier
+from .logs import setup_logging
+from .processer import create_session_with_retries, supplier_base_url
+from .ratelimit import HostRateLimiter
+from .scrape_direct import ProductScraper
+from .store import ProductStore, DEFAULT_STORE_PATH
+from .structers.product import Suppliers
+
+"""
+Sitemap üzerinden toplu ürün keşfi.
+robots.txt / sitemap.xml (gzip'li sitemap index'ler dahil) akış halinde, XMLPullParser'a parça parça verilir;
+büyük sitemap'lerde bellek sabit kalır. Bilinen link indeksine göre yalnızca yeni veya lastmod'u
+değişmiş ürün adresleri ProductScraper.scrape_product için sınırlı bir kuyruğa verilir.
+
+    python -m supplier_scrape_core.sitemap --supplier 11 --dry-run
+    python -m supplier_scrape_core.sitemap --supplier 12 --workers 2 --interval 1.0
+"""
+
+PRODUCT_URL = re.compile(r"/product/")
+GZIP_MAGIC = b"\x1f\x8b"
+CHUNK_SIZE = 64 * 1024
+
+
+def _local(tag: str) -> str:
+    # {http://www.sitemaps.org/schemas/sitemap/0.9}loc -> loc
+    return tag.rsplit("}", 1)[-1]
+
+
+class SitemapState:
+    """Ürün adresi -> son görülen lastmod. Bir sonraki keşifte değişmeyenler atlanır"""
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path
+        self._lock = threading.Lock()
+        self._lastmod: Dict[str, str] = {}
+        if path and os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                self._lastmod = json.load(f)
+
+    def get(self, url: str) -> Optional[str]:
+        with self._lock:
+            return self._lastmod.get(url)
+
+    def put(self, url: str, lastmod: Optional[str]):
+        with self._lock:
+            self._lastmod[url] = lastmod or ""
+
+    def __len__(self):
+        return len(self._lastmod)
+
+    def save(self):
+        if self.path:
+            with self._lock:
+                data = dict(self._lastmod)
+            _atomic_write_json(self.path, data)
+
+
+class DiscoveryReport:
+    def __init__(self):
+        self.sitemaps = 0
+        self.urls = 0
+        self.product_urls = 0
+        self.unchanged = 0
+        self.queued = 0
+        self.scraped = 0
+        self.failed = 0
+
+    def to_dict(self):
+        return dict(self.__dict__)
+
+    def __repr__(self):
+        return " ".join(f"{k}={v}" for k, v in self.__dict__.items())
+
+
+class SitemapDiscovery:
+    """Bir tedarikçinin sitemap'lerini gezer ve yeni / değişmiş ürün adreslerini bulur"""
+
+    def __init__(self, supplier: Suppliers, state: Optional[SitemapState] = None, cache: Optional[ProductCache] = None,
+                 link_index: Optional[LinkIndex] = None, rate_limiter: Optional[HostRateLimiter] = None,
+                 product_pattern: "re.Pattern" = PRODUCT_URL, timeout: float = 30, store: Optional[ProductStore] = None):
+        """
+        Args:
+            supplier: Keşfedilecek tedarikçi
+            state: Adres -> lastmod durumu, verilmezse bellek içi
+            cache: Çekilen ürünlerin yazılacağı önbellek, verilmezse paylaşılan önbellek
+            link_index: Bilinen linkler ve kod -> link indeksi, verilmezse paylaşılan indeks
+            rate_limiter: Verilirse her istekten önce host bazında beklenir
+            product_pattern: Ürün sayfası adreslerini ayıran regex
+            timeout: İstek zaman aşımı (saniye)
+            store: Verilirse çekilen ürünler depoya toplu yazılır
+        """
+        self.supplier = supplier
+        self.state = state if state is not None else SitemapState()
+        self.cache = cache if cache is not None else shared_cache
+        self.link_index = link_index if link_index is not None else shared_link_index
+        self.rate_limiter = rate_limiter
+        self.product_pattern = product_pattern
+        self.timeout = timeout
+        self.session = create_session_with_retries()
+        self.store = store
+        self._scrape_id = None
+        # worker'ların çektiği ürünler depoya toplu yazılmak için biriktirilir
+        self._pending = []
+        self.report = DiscoveryReport()
+        self._report_lock = threading.Lock()
+
+    def _count(self, field: str):
+        with self._report_lock:
+            setattr(self.report, field, getattr(self.report, field) + 1)
+
+    def _store(self, product=None, flush: bool = False):
+        if self.store is None:
+            return
+        with self._report_lock:
+            if product is not None:
+                self._pending.append(product)
+            if not self._pending or (not flush and len(self._pending) < self.store.batch_size):
+                return
+            batch, self._pending = self._pending, []
+        self.store.upsert(batch, self._scrape_id)
+
+    def _wait(self, url: str):
+        if self.rate_limiter is not None:
+            self.rate_limiter.wait(url)
+
+    def sitemap_urls(self) -> List[str]:
+        """robots.txt içindeki Sitemap: satırları, yoksa /sitemap.xml"""
+        base = supplier_base_url(self.supplier)
+        robots = f"{base}/robots.txt"
+        try:
+            self._wait(robots)
+            response = self.session.get(robots, timeout=self.timeout, verify=False)
+            if response.status_code == 200:
+                urls = [
+                    urljoin(robots, line.split(":", 1)[1].strip())
+                    for line in response.text.splitlines()
+                    if line.lower().startswith("sitemap:")
+                ]
+                if urls:
+                    return urls
+        except Exception as e:
+            logging.warning(f"[{self.supplier.name}] robots.txt could'nt read: {e}")
+        return [f"{base}/sitemap.xml"]
+
+    def _chunks(self, response) -> Iterator[bytes]:
+        """Yanıt gövdesi parça parça; .xml.gz dosyaları ham gzip gelir, ilk baytlara bakılarak açılır"""
+        decompressor = None
+        for chunk in response.iter_content(CHUNK_SIZE):
+            if decompressor is None:
+                decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS) if chunk[:2] == GZIP_MAGIC else False
+            yield decompressor.decompress(chunk) if decompressor else chunk
+        if decompressor:
+            yield decompressor.flush()
+
+    def _parse(self, url: str) -> Iterator[Tuple[str, str, Optional[str]]]:
+        """
+        Tek bir sitemap dosyasını akış halinde okur
+
+        Yields:
+            ("sitemap" | "url", loc, lastmod)
+        """
+        self._wait(url)
+        response = self.session.get(url, timeout=self.timeout, verify=False, stream=True)
+        try:
+            if response.status_code != 200:
+                logging.error(f"[{self.supplier.name}] Sitemap status {response.status_code}: {url}")
+                return
+            self.report.sitemaps += 1
+            parser = ET.XMLPullParser(events=("start", "end"))
+            root = None
+            loc = lastmod = None
+            for chunk in self._chunks(response):
+                parser.feed(chunk)
+                for event, element in parser.read_events():
+                    if event == "start":
+                        if root is None:
+                            root = element
+                        continue
+                    tag = _local(element.tag)
+                    if tag == "loc":
+                        loc = (element.text or "").strip()
+                    elif tag == "lastmod":
+                        lastmod = (element.text or "").strip()
+                    elif tag in ("url", "sitemap"):
+                        if loc:
+                            yield ("sitemap" if tag == "sitemap" else "url"), loc, lastmod
+                        loc = lastmod = None
+                        # işlenen elemanları kökten de at, bellek sabit kalsın
+                        root.clear()
+            parser.close()
+        finally:
+            response.close()
+
+    def iter_changed(self, sitemap_urls: Optional[List[str]] = None) -> Iterator[Tuple[str, Optional[str]]]:
+        """
+        Sitemap index'leri de açarak yeni veya lastmod'u değişmiş ürün adreslerini üretir
+
+        Yields:
+            (ürün adresi, lastmod)
+        """
+        pending = list(sitemap_urls or self.sitemap_urls())
+        visited = set()
+        while pending:
+            url = pending.pop(0)
+            if url in visited:
+                continue
+            visited.add(url)
+            try:
+                for kind, loc, lastmod in self._parse(url):
+                    if kind == "sitemap":
+                        # index'ler küçük, alt sitemap adresleri listede tutulur
+                        pending.append(loc)
+                        continue
+                    self.report.urls += 1
+                    if not self.product_pattern.search(loc):
+                        continue
+                    self.report.product_urls += 1
+                    # bilinen link, lastmod yoksa veya sonrasında değişmediyse atlanır
+                    previous = self.state.get(loc)
+                    if self.link_index.knows(loc) and (not lastmod or (previous is not None and previous >= lastmod)):
+                        self.report.unchanged += 1
+                        continue
+                    self.report.queued += 1
+                    yield loc, lastmod
+            except ET.ParseError as e:
+                logging.error(f"[{self.supplier.name}] Sitemap parse fail {url}: {e}")
+
+    def _scrape_worker(self, tasks: "queue.Queue", scraper: ProductScraper):
+        prefix = self.supplier.value["prefix"]
+        while True:
+            task = tasks.get()
+            if task is None:
+                tasks.task_done()
+                return
+            url, lastmod = task
+            try:
+                self._wait(url)
+                product = scraper.scrape_product(url, self.supplier)
+                if product is None or not product.urun_kodu:
+                    self._count("failed")
+                    continue
+                code = str(product.urun_kodu)[len(prefix):]
+                self.link_index.put(self.supplier, code, url)
+                self.cache.put(self.supplier, code, product)
+                self.state.put(url, lastmod)
+                self._store(product)
+                self._count("scraped")
+            except Exception as e:
+                logging.error(f"[{self.supplier.name}] Sitemap scrape fail {url}: {e}")
+                self._count("failed")
+            finally:
+                tasks.task_done()
+
+    def run(self, sitemap_urls: Optional[List[str]] = None, workers: int = 2, dry_run: bool = False,
+            limit: Optional[int] = None) -> DiscoveryReport:
+        """
+        Keşfi çalıştırır, değişen adresleri sınırlı kuyruk üzerinden worker'lara verir
+
+        Args:
+            sitemap_urls: Başlangıç sitemap'leri, verilmezse robots.txt / sitemap.xml
+            workers: Aynı anda scrape eden thread sayısı
+            dry_run: True ise sadece sayılır, scrape edilmez
+            limit: En fazla bu kadar adres kuyruğa verilir
+        """
+        if dry_run:
+            for n, _ in enumerate(self.iter_changed(sitemap_urls), 1):
+                if limit is not None and n >= limit:
+                    break
+            logging.info(f"[{self.supplier.name}] Sitemap dry run: {self.report}")
+            return self.report
+
+        if self.store is not None:
+            self._scrape_id = self.store.begin_scrape(self.supplier, "sitemap")
+        # kuyruk sınırlı, parse scrape'ten hızlı olsa da bellek büyümez
+        tasks: "queue.Queue" = queue.Queue(maxsize=workers * 4)
+        scraper = ProductScraper()
+        threads = [
+            threading.Thread(target=self._scrape_worker, args=(tasks, scraper), daemon=True)
+            for _ in range(workers)
+        ]
+        for thread in threads:
+            thread.start()
+        try:
+            for n, task in enumerate(self.iter_changed(sitemap_urls), 1):
+                tasks.put(task)
+                if limit is not None and n >= limit:
+                    break
+        finally:
+            for _ in threads:
+                tasks.put(None)
+            for thread in threads:
+                thread.join()
+            if self.store is not None:
+                self._store(flush=True)
+                self.store.finish_scrape(self._scrape_id, self.report.scraped, self.report.failed)
+        logging.info(f"[{self.supplier.name}] Sitemap discovery finished: {self.report}")
+        return self.report
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Sitemap'ten yeni / değişmiş ürünleri keşfet ve çek")
+    parser.add_argument("--supplier", required=True, help="Tedarikçi (prefix veya ad)")
+    parser.add_argument("--sitemap", action="append", help="Sitemap adresi, verilmezse robots.txt / sitemap.xml")
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--interval", type=float, default=1.0, help="Host başına istekler arası en kısa süre (saniye)")
+    parser.add_argument("--limit", type=int, help="En fazla bu kadar ürün çekilir")
+    parser.add_argument("--dry-run", action="store_true", help="Sadece yeni / değişmiş adresleri say")
+    parser.add_argument("--cache-dir", default=DEFAULT_CACHE_DIR)
+    parser.add_argument("--store", default=DEFAULT_STORE_PATH, help="Ürünlerin yazılacağı depo")
+    args = parser.parse_args(argv)
+
+    setup_logging()
+    supplier = find_supplier(args.supplier)
+    if supplier is None:
+        parser.error(f"Invalid supplier: {args.supplier}")
+
+    load_shared(args.cache_dir)
+    state = SitemapState(os.path.join(args.cache_dir, f"sitemap_{supplier.name.lower()}.json"))
+    store = None if args.dry_run else ProductStore(args.store)
+    discovery = SitemapDiscovery(supplier, state=state, rate_limiter=HostRateLimiter(args.interval), store=store)
+    discovery.run(args.sitemap, workers=args.workers, dry_run=args.dry_run, limit=args.limit)
+    if not args.dry_run:
+        state.save()
+        save_shared(args.cache_dir)
+
+
+if __name__ == "__main__":
+    main()
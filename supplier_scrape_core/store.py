@@ -0,0 +1,311 @@
+from typing import TYPE_CHECKING, Dict, Iterable, List, Optional
+import argparse
+import logging
+import os
+import sqlite3
+import threading
+import time
+from .structers.product import Product, Suppliers
+
+# pandas ilk okumada yüklenir
+if TYPE_CHECKING:
+    import pandas as pd
+
+"""
+Çekilen ürünlerin kalıcı kaydı (SQLite).
+- products: prefix'li urun_kodu anahtarlı son durum, tedarikçi ve kategori indeksli
+- scrapes: her get_with_code / crawl / sitemap çalışması
+- snapshots: çalışma başına ürünlerin o anki hali, geçmiş sorguları için
+
+Yazımlar toplu (executemany, tek transaction) yapılır. Export'lar ağ yerine read_frame ile buradan okunur.
+
+    python -m supplier_scrape_core.store --supplier 11 --output ./output/store_BALGUNES.xlsx
+"""
+
+DEFAULT_STORE_PATH = os.environ.get("SCRAPE_STORE_PATH", "./store/products.db")
+
+# Product.to_dict ile aynı sıra; marka tedarikçi prefix'i olarak tutulur
+FIELDS = ("urun_ismi", "kategori", "kategori_url", "gorsel_url", "fiyat", "stok", "aciklama", "puan")
+COLUMNS = ("urun_kodu",) + FIELDS + ("marka",)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS scrapes (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    supplier TEXT NOT NULL,
+    source TEXT NOT NULL,
+    started_at REAL NOT NULL,
+    finished_at REAL,
+    successed INTEGER DEFAULT 0,
+    failed INTEGER DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS products (
+    urun_kodu INTEGER PRIMARY KEY,
+    supplier TEXT NOT NULL,
+    code TEXT NOT NULL,
+    urun_ismi TEXT, kategori TEXT, kategori_url TEXT, gorsel_url TEXT,
+    fiyat, stok, aciklama TEXT, puan TEXT,
+    marka TEXT,
+    scrape_id INTEGER,
+    updated_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS snapshots (
+    scrape_id INTEGER NOT NULL,
+    urun_kodu INTEGER NOT NULL,
+    urun_ismi TEXT, kategori TEXT, kategori_url TEXT, gorsel_url TEXT,
+    fiyat, stok, aciklama TEXT, puan TEXT,
+    marka TEXT,
+    PRIMARY KEY (scrape_id, urun_kodu)
+);
+CREATE INDEX IF NOT EXISTS idx_products_supplier ON products (supplier);
+CREATE INDEX IF NOT EXISTS idx_products_kategori ON products (supplier, kategori);
+CREATE INDEX IF NOT EXISTS idx_snapshots_urun_kodu ON snapshots (urun_kodu);
+CREATE INDEX IF NOT EXISTS idx_scrapes_supplier ON scrapes (supplier, started_at);
+"""
+
+# kısmi veri (ör. liste kartında fiyat yok) mevcut alanları silmez
+UPSERT = f"""
+INSERT INTO products (urun_kodu, supplier, code, {", ".join(FIELDS)}, marka, scrape_id, updated_at)
+VALUES (?, ?, ?, {", ".join("?" for _ in FIELDS)}, ?, ?, ?)
+ON CONFLICT (urun_kodu) DO UPDATE SET
+    {", ".join(f"{f} = COALESCE(excluded.{f}, products.{f})" for f in FIELDS)},
+    scrape_id = COALESCE(excluded.scrape_id, products.scrape_id),
+    updated_at = excluded.updated_at
+"""
+
+SNAPSHOT = f"""
+INSERT OR REPLACE INTO snapshots (scrape_id, urun_kodu, {", ".join(FIELDS)}, marka)
+VALUES (?, ?, {", ".join("?" for _ in FIELDS)}, ?)
+"""
+
+
+def _value(value):
+    # fiyat / stok PreState'ten sayı olarak gelir, kolon tipsiz olduğu için sayı kalır
+    if value is None or isinstance(value, (int, float, str)):
+        return value
+    return str(value)
+
+
+class ProductStore:
+    """Ürünlerin son durumunu ve çalışma bazlı geçmişini tutan, thread-safe SQLite deposu"""
+
+    def __init__(self, path: str = DEFAULT_STORE_PATH, batch_size: int = 500):
+        """
+        Args:
+            path: Veritabanı dosyası, ":memory:" ile bellek içi
+            batch_size: Tek executemany ile yazılacak en fazla satır
+        """
+        self.path = path
+        self.batch_size = batch_size
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        # okuyan export'lar yazımı beklemesin
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def begin_scrape(self, supplier: Suppliers, source: str = "fetch") -> int:
+        """Yeni bir çalışma kaydı açar ve id'sini döndürür"""
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                "INSERT INTO scrapes (supplier, source, started_at) VALUES (?, ?, ?)",
+                (supplier.name, source, time.time())
+            )
+            return cursor.lastrowid
+
+    def finish_scrape(self, scrape_id: int, successed: int = 0, failed: int = 0):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE scrapes SET finished_at = ?, successed = successed + ?, failed = failed + ? WHERE id = ?",
+                (time.time(), successed, failed, scrape_id)
+            )
+
+    def upsert(self, products: Iterable[Product], scrape_id: Optional[int] = None) -> int:
+        """
+        Ürünleri batch_size'lık parçalar halinde yazar, scrape_id verilirse snapshot da alınır
+
+        Returns:
+            Yazılan ürün sayısı
+        """
+        now = time.time()
+        rows, snapshots, written = [], [], 0
+        for product in products:
+            if product.urun_kodu is None or product.marka is None:
+                continue
+            key = int(product.urun_kodu)
+            prefix = product.marka.value["prefix"]
+            values = [_value(getattr(product, f)) for f in FIELDS]
+            rows.append((key, product.marka.name, str(key)[len(prefix):], *values, prefix, scrape_id, now))
+            if scrape_id is not None:
+                snapshots.append((scrape_id, key, *values, prefix))
+            if len(rows) >= self.batch_size:
+                written += self._write(rows, snapshots)
+                rows, snapshots = [], []
+        if rows:
+            written += self._write(rows, snapshots)
+        return written
+
+    def _write(self, rows: List[tuple], snapshots: List[tuple]) -> int:
+        with self._lock, self._conn:
+            self._conn.executemany(UPSERT, rows)
+            if snapshots:
+                self._conn.executemany(SNAPSHOT, snapshots)
+        return len(rows)
+
+    def record(self, supplier: Suppliers, products: List[Product], failed: int = 0, source: str = "fetch") -> Optional[int]:
+        """
+        Bir çalışmanın sonucunu tek seferde yazar. Hata loglanır, çağıranın akışı bozulmaz
+
+        Returns:
+            Çalışma id'si veya hata durumunda None
+        """
+        try:
+            scrape_id = self.begin_scrape(supplier, source)
+            written = self.upsert(products, scrape_id)
+            self.finish_scrape(scrape_id, written, failed)
+            return scrape_id
+        except Exception as e:
+            logging.error(f"[{supplier.name}] Store write fail: {e}")
+            return None
+
+    @staticmethod
+    def _where(supplier: Optional[Suppliers], kategori: Optional[str], codes: Optional[Iterable],
+               products: str = "", fields: str = "") -> tuple:
+        """products / fields: supplier-code ve ürün alanlarının okunduğu tablo takma adları ("p.", "s.")"""
+        clauses, params = [], []
+        if supplier is not None:
+            clauses.append(f"{products}supplier = ?")
+            params.append(supplier.name)
+        if kategori is not None:
+            clauses.append(f"{fields}kategori = ?")
+            params.append(kategori)
+        if codes is not None:
+            codes = [str(c).strip() for c in codes]
+            clauses.append(f"{products}code IN ({', '.join('?' for _ in codes)})")
+            params.extend(codes)
+        return clauses, params
+
+    def get(self, supplier: Suppliers, code) -> Optional[Product]:
+        """Depodaki son hali, yoksa None"""
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT {', '.join(FIELDS)} FROM products WHERE supplier = ? AND code = ?",
+                (supplier.name, str(code).strip())
+            ).fetchone()
+        if row is None:
+            return None
+        return Product(urun_kodu=str(code).strip(), marka=supplier, **dict(zip(FIELDS, row)))
+
+    def read_frame(self, supplier: Optional[Suppliers] = None, kategori: Optional[str] = None,
+                   codes: Optional[Iterable] = None, scrape_id: Optional[int] = None) -> "pd.DataFrame":
+        """
+        Ürünleri Product.to_dict kolonlarıyla DataFrame olarak okur, SaverLikeIkasTemplate.fill_frame'e verilebilir
+
+        Args:
+            supplier: Verilirse sadece bu tedarikçi
+            kategori: Verilirse sadece bu kategori
+            codes: Verilirse sadece bu kodlar (prefix'siz)
+            scrape_id: Verilirse son hal yerine bu çalışmadaki snapshot okunur
+        """
+        import pandas as pd
+
+        if scrape_id is None:
+            clauses, params = self._where(supplier, kategori, codes)
+            where = (" WHERE " + " AND ".join(clauses)) if clauses else ""
+            query = f"SELECT {', '.join(COLUMNS)} FROM products{where} ORDER BY urun_kodu"
+        else:
+            # snapshot tablosunda supplier/code yok, son durum tablosuyla eşlenir
+            clauses, params = self._where(supplier, kategori, codes, products="p.", fields="s.")
+            clauses.append("s.scrape_id = ?")
+            params.append(scrape_id)
+            query = (f"SELECT {', '.join(f's.{c}' for c in COLUMNS)} FROM snapshots s "
+                     f"JOIN products p ON p.urun_kodu = s.urun_kodu WHERE {' AND '.join(clauses)} ORDER BY s.urun_kodu")
+        with self._lock:
+            return pd.read_sql_query(query, self._conn, params=params)
+
+    def history(self, supplier: Suppliers, code) -> List[Dict]:
+        """Ürünün çalışma bazlı geçmişi, eskiden yeniye"""
+        with self._lock:
+            cursor = self._conn.execute(
+                f"SELECT sc.id, sc.source, sc.started_at, {', '.join(f's.{f}' for f in FIELDS)} "
+                "FROM snapshots s JOIN scrapes sc ON sc.id = s.scrape_id "
+                "WHERE s.urun_kodu = ? ORDER BY sc.started_at",
+                (int("".join([supplier.value["prefix"], str(code).strip()])),)
+            )
+            names = [d[0] for d in cursor.description]
+            return [dict(zip(names, row)) for row in cursor.fetchall()]
+
+    def scrapes(self, supplier: Optional[Suppliers] = None, limit: int = 50) -> List[Dict]:
+        """Son çalışmalar, yeniden eskiye"""
+        where, params = ("WHERE supplier = ?", [supplier.name]) if supplier is not None else ("", [])
+        with self._lock:
+            cursor = self._conn.execute(
+                f"SELECT id, supplier, source, started_at, finished_at, successed, failed FROM scrapes {where} "
+                "ORDER BY id DESC LIMIT ?", (*params, limit)
+            )
+            names = [d[0] for d in cursor.description]
+            return [dict(zip(names, row)) for row in cursor.fetchall()]
+
+    def stats(self) -> Dict:
+        with self._lock:
+            per_supplier = dict(self._conn.execute("SELECT supplier, COUNT(*) FROM products GROUP BY supplier").fetchall())
+            scrapes = self._conn.execute("SELECT COUNT(*) FROM scrapes").fetchone()[0]
+            snapshots = self._conn.execute("SELECT COUNT(*) FROM snapshots").fetchone()[0]
+        return {
+            "products": sum(per_supplier.values()),
+            "per_supplier": per_supplier,
+            "scrapes": scrapes,
+            "snapshots": snapshots,
+        }
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM products").fetchone()[0]
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Depodaki ürünleri ağa gitmeden İkas şablonuna export et")
+    parser.add_argument("--supplier", help="Tedarikçi (prefix veya ad), verilmezse hepsi")
+    parser.add_argument("--category", help="Sadece bu kategori")
+    parser.add_argument("--scrape-id", type=int, help="Son hal yerine bu çalışmanın snapshot'ı")
+    parser.add_argument("--store", default=DEFAULT_STORE_PATH)
+    parser.add_argument("--output", default="./output/store.xlsx")
+    parser.add_argument("--diff", action="store_true", help="Sadece son export'tan beri yeni / değişmiş ürünleri yaz, silinenler ayrı dosyaya")
+    args = parser.parse_args(argv)
+
+    from .ingest import find_supplier
+    from .logs import setup_logging
+    from .savers import SaverLikeIkasTemplate, ExportSnapshot
+    from .config.config import STATIC_VALUES
+
+    setup_logging()
+    supplier = None
+    if args.supplier:
+        supplier = find_supplier(args.supplier)
+        if supplier is None:
+            parser.error(f"Invalid supplier: {args.supplier}")
+
+    store = ProductStore(args.store)
+    frame = store.read_frame(supplier, args.category, scrape_id=args.scrape_id)
+    logging.info(f"{len(frame)} products read from {args.store}")
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    saver = SaverLikeIkasTemplate()
+    if not args.diff:
+        saver.write(saver.fill_frame(frame, STATIC_VALUES), args.output)
+        return
+
+    # snapshot (tedarikçi filtresine göre ayrı) ve silinenler listesi çıktının yanında tutulur
+    base, ext = os.path.splitext(args.output)
+    snapshot_path = f"{base}.{supplier.name if supplier else 'ALL'}.snapshot.json"
+    # kategori veya çalışma filtresi katalogun tamamı değil, silinenler hesaplanmaz
+    saver.export_diff(frame, ExportSnapshot(snapshot_path), args.output, f"{base}_removed{ext}",
+                      STATIC_VALUES, full=args.category is None and args.scrape_id is None)
+
+
+if __name__ == "__main__":
+    main()
@@ -113,9 +113,14 @@ class Product:
             if supplier.value["prefix"] == prefix:
                 marka = supplier
                 break
-        
+
+        # serialize edilen kod prefix'li, constructor prefix'i tekrar eklemesin
+        code = items[0]
+        if marka is not None and code.startswith(prefix):
+            code = code[len(prefix):]
+
         return cls(
-            urun_kodu=items[0],
+            urun_kodu=code,
             urun_ismi=items[1],
             kategori=items[2],
             kategori_url=items[3],
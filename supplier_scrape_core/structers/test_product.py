@@ -0,0 +1,30 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+import unittest
+
+from supplier_scrape_core.structers.product import Product, Suppliers
+
+"""
+    python -m unittest supplier_scrape_core.structers.test_product
+"""
+
+
+class SerializeTest(unittest.TestCase):
+
+    def test_round_trip_keeps_code(self):
+        for supplier in Suppliers:
+            product = Product(urun_kodu="145204", urun_ismi="body", fiyat="129.9", stok="3", marka=supplier)
+            restored = Product.from_Serialize(product.serialize())
+            self.assertEqual(restored.urun_kodu, product.urun_kodu)
+            self.assertEqual(restored.marka, supplier)
+            self.assertEqual((restored.urun_ismi, restored.fiyat, restored.stok), ("body", "129.9", "3"))
+
+    def test_round_trip_is_stable(self):
+        product = Product(urun_kodu="145204", marka=Suppliers.BALGUNES)
+        twice = Product.from_Serialize(Product.from_Serialize(product.serialize()).serialize())
+        self.assertEqual(twice.urun_kodu, 11145204)
+
+
+if __name__ == "__main__":
+    unittest.main()
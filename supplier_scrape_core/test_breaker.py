@@ -0,0 +1,168 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import time
+import unittest
+
+from supplier_scrape_core.breaker import BreakerRegistry, CircuitBreaker, STATE_CLOSED, STATE_HALF_OPEN, STATE_OPEN
+from supplier_scrape_core.cache import ProductCache, LinkIndex
+from supplier_scrape_core.logs import CodeLog
+from supplier_scrape_core.processer import Processer, access_error
+from supplier_scrape_core.structers.product import Product, Suppliers
+
+"""
+Devre kesici durum geçişleri ve ürün sayfası hatalarının devreye yazılması. Ağa çıkılmaz.
+
+    python -m unittest supplier_scrape_core.test_breaker
+"""
+
+RESET = 0.05
+
+
+class CircuitBreakerTest(unittest.TestCase):
+
+    def open_breaker(self) -> CircuitBreaker:
+        breaker = CircuitBreaker("test", failure_threshold=3, reset_timeout=RESET)
+        for _ in range(3):
+            self.assertTrue(breaker.allow())
+            breaker.record_failure("Timeout")
+        return breaker
+
+    def test_opens_after_threshold(self):
+        breaker = CircuitBreaker("test", failure_threshold=3, reset_timeout=60)
+        breaker.record_failure("Timeout")
+        breaker.record_failure("Timeout")
+        self.assertEqual(breaker.state, STATE_CLOSED)
+        breaker.record_failure("HTTP 503")
+        self.assertEqual(breaker.state, STATE_OPEN)
+        self.assertFalse(breaker.allow())
+        snapshot = breaker.snapshot()
+        self.assertEqual((snapshot["opens"], snapshot["rejected"], snapshot["last_error"]), (1, 1, "HTTP 503"))
+        self.assertGreater(snapshot["retry_in"], 0)
+
+    def test_success_resets_consecutive_failures(self):
+        breaker = CircuitBreaker("test", failure_threshold=3, reset_timeout=RESET)
+        breaker.record_failure("Timeout")
+        breaker.record_failure("Timeout")
+        breaker.record_success()
+        breaker.record_failure("Timeout")
+        self.assertEqual(breaker.state, STATE_CLOSED)
+        self.assertEqual(breaker.consecutive_failures, 1)
+
+    def test_half_open_allows_single_probe(self):
+        breaker = self.open_breaker()
+        time.sleep(RESET * 1.5)
+        self.assertTrue(breaker.allow())
+        self.assertEqual(breaker.state, STATE_HALF_OPEN)
+        # deneme sürerken diğer istekler beklemeden reddedilir
+        self.assertFalse(breaker.allow())
+
+    def test_probe_success_closes(self):
+        breaker = self.open_breaker()
+        time.sleep(RESET * 1.5)
+        self.assertTrue(breaker.allow())
+        breaker.record_success()
+        self.assertEqual(breaker.state, STATE_CLOSED)
+        self.assertEqual(breaker.consecutive_failures, 0)
+        self.assertTrue(breaker.allow())
+        self.assertTrue(breaker.allow())
+
+    def test_probe_failure_reopens(self):
+        breaker = self.open_breaker()
+        time.sleep(RESET * 1.5)
+        self.assertTrue(breaker.allow())
+        breaker.record_failure("ConnectionError")
+        self.assertEqual(breaker.state, STATE_OPEN)
+        self.assertEqual(breaker.opens, 2)
+        self.assertFalse(breaker.allow())
+
+    def test_stale_probe_is_replaced(self):
+        breaker = self.open_breaker()
+        time.sleep(RESET * 1.5)
+        self.assertTrue(breaker.allow())
+        # sonucu hiç yazılmayan deneme reset_timeout sonra yenisine yer açar
+        time.sleep(RESET * 1.5)
+        self.assertTrue(breaker.allow())
+        self.assertFalse(breaker.allow())
+
+    def test_registry_snapshot_lists_every_supplier(self):
+        registry = BreakerRegistry(failure_threshold=1, reset_timeout=RESET)
+        registry.get(Suppliers.MALKOC).record_failure("Timeout")
+        snapshot = registry.snapshot()
+        self.assertEqual(set(snapshot), {s.name for s in Suppliers})
+        self.assertEqual(snapshot["MALKOC"]["state"], STATE_OPEN)
+        self.assertEqual(snapshot["BALGUNES"]["state"], STATE_CLOSED)
+
+
+class FakeResponse:
+    def __init__(self, status_code: int):
+        self.status_code = status_code
+
+
+class FakeHTTPError(Exception):
+    def __init__(self, status_code: int):
+        super().__init__(f"HTTP {status_code}")
+        self.response = FakeResponse(status_code)
+
+
+class FakeScraper:
+    """fetch_product sırayla verilen (product, error) sonuçlarını döndürür"""
+
+    def __init__(self, *outcomes):
+        self.outcomes = list(outcomes)
+        self.urls = []
+
+    def fetch_product(self, url, supplier):
+        self.urls.append(url)
+        return self.outcomes.pop(0)
+
+
+class AccessErrorTest(unittest.TestCase):
+
+    def test_only_access_failures_count(self):
+        self.assertIsNone(access_error(None))
+        self.assertIsNone(access_error(FakeHTTPError(404)))
+        self.assertEqual(access_error(FakeHTTPError(503)), "HTTP 503")
+        self.assertEqual(access_error(TimeoutError()), "TimeoutError")
+
+
+class ProductPageFailureTest(unittest.TestCase):
+
+    def setUp(self):
+        self.registry = BreakerRegistry(failure_threshold=3, reset_timeout=60)
+        self.processer = Processer(cache=ProductCache(), link_index=LinkIndex(), breakers=self.registry)
+        self.breaker = self.registry.get(Suppliers.BABEXI)
+        for code in ("1", "2", "3", "4"):
+            self.processer.link_index.put(Suppliers.BABEXI, code, f"http://stub/babexi/urun/{code}")
+
+    def fetch(self, code: str):
+        return self.processer._fetch_product(Suppliers.BABEXI, code, CodeLog(0, code))
+
+    def test_indexed_product_page_errors_open_breaker(self):
+        self.processer.product_scraper = FakeScraper(
+            (None, TimeoutError("read timed out")), (None, FakeHTTPError(503)), (None, ConnectionError("refused")))
+        for code in ("1", "2", "3"):
+            self.assertIsNone(self.fetch(code))
+        self.assertEqual(self.breaker.state, STATE_OPEN)
+        self.assertEqual(self.breaker.last_error, "ConnectionError")
+        # erişim hatasında link eskimiş sayılmaz
+        self.assertIsNotNone(self.processer.link_index.get(Suppliers.BABEXI, "1"))
+
+        # devre açıkken ürün sayfasına gidilmez
+        self.assertIsNone(self.fetch("4"))
+        self.assertEqual(len(self.processer.product_scraper.urls), 3)
+
+    def test_product_page_success_resets_failures(self):
+        product = Product(urun_kodu="2", urun_ismi="body", marka=Suppliers.BABEXI)
+        self.processer.product_scraper = FakeScraper(
+            (None, TimeoutError("read timed out")), (None, TimeoutError("read timed out")), (product, None))
+        self.fetch("1")
+        self.fetch("2")
+        self.assertEqual(self.breaker.consecutive_failures, 2)
+        self.assertIs(self.fetch("3"), product)
+        self.assertEqual(self.breaker.consecutive_failures, 0)
+        self.assertEqual(self.breaker.state, STATE_CLOSED)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,50 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import unittest
+
+from supplier_scrape_core.cache import ProductCache
+from supplier_scrape_core.structers.product import Product, Suppliers
+
+"""
+    python -m unittest supplier_scrape_core.test_cache
+"""
+
+
+def filled_cache() -> ProductCache:
+    cache = ProductCache()
+    for supplier in (Suppliers.BALGUNES, Suppliers.BABEXI):
+        for code in (1001, 1002, 1003):
+            cache.put(supplier, code, Product(urun_kodu=code, urun_ismi=f"{supplier.name} {code}", marka=supplier))
+    return cache
+
+
+class InvalidateTest(unittest.TestCase):
+
+    def test_codes_without_supplier_rejected(self):
+        cache = filled_cache()
+        with self.assertRaises(ValueError):
+            cache.invalidate(codes=[1001])
+        # hiçbir girdi silinmemeli
+        self.assertEqual(len(cache), 6)
+
+    def test_codes_with_supplier(self):
+        cache = filled_cache()
+        self.assertEqual(cache.invalidate(Suppliers.BALGUNES, [1001, 1002, 9999]), 2)
+        self.assertIsNone(cache.get(Suppliers.BALGUNES, 1001))
+        self.assertIsNotNone(cache.get(Suppliers.BALGUNES, 1003))
+        self.assertIsNotNone(cache.get(Suppliers.BABEXI, 1001))
+
+    def test_supplier_only(self):
+        cache = filled_cache()
+        self.assertEqual(cache.invalidate(Suppliers.BABEXI), 3)
+        self.assertEqual(len(cache), 3)
+
+    def test_everything(self):
+        cache = filled_cache()
+        self.assertEqual(cache.invalidate(), 6)
+        self.assertEqual(len(cache), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
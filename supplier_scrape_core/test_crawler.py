@@ -0,0 +1,38 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import unittest
+
+from supplier_scrape_core.cache import ProductCache, LinkIndex
+from supplier_scrape_core.crawler import CategoryCrawler
+from supplier_scrape_core.structers.product import Suppliers
+
+"""
+Liste sayfası kartlarından kod çıkarma. Ağa çıkılmaz.
+
+    python -m unittest supplier_scrape_core.test_crawler
+"""
+
+PAGE = """
+<h1>Zıbın</h1>
+<div class="pro card"><a href="/tr/product/body-145204"><img class="mainImg" src="/a.jpg"></a>
+    <h6 class="pro-name">BODY</h6><span class="pro-code">145204</span></div>
+<div class="pro card"><a href="/tr/product/tulum-2024-88231"><img class="mainImg" src="/b.jpg"></a>
+    <h6 class="pro-name">TULUM</h6></div>
+"""
+
+
+class CardCodeTest(unittest.TestCase):
+
+    def test_code_only_from_card_markup(self):
+        crawler = CategoryCrawler(Suppliers.BALGUNES, cache=ProductCache(), link_index=LinkIndex())
+        items, _, _ = crawler.parse_listing(PAGE, "http://stub/tr/category/zibin--40")
+
+        # linkteki son sayı (88231) ürün kodu sayılmaz, kart atlanır
+        self.assertEqual([code for code, _, _ in items], ["145204"])
+        self.assertEqual(items[0][1], "http://stub/tr/product/body-145204")
+        self.assertEqual(crawler.report.skipped_cards, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
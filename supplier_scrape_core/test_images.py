@@ -0,0 +1,103 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import tempfile
+import threading
+import time
+import unittest
+
+from supplier_scrape_core.images import ImageCheck, ImageVerifier
+
+"""
+Görsel doğrulama sonuçlarının LRU/TTL sınırı ve eşzamanlı indirme. Ağa çıkılmaz.
+
+    python -m unittest supplier_scrape_core.test_images
+"""
+
+
+class FakeVerifier(ImageVerifier):
+    """verify çağrılarını sayar, ağa çıkmaz"""
+
+    def __init__(self, **kwargs):
+        super().__init__(max_workers=2, **kwargs)
+        self.verified = []
+
+    def verify(self, url):
+        self.verified.append(url)
+        return ImageCheck(url, ok=not url.endswith("broken"), status=200)
+
+
+class FakeResponse:
+    def __init__(self, content: bytes):
+        self.content = content
+
+    def raise_for_status(self):
+        pass
+
+
+class SlowSession:
+    """Tüm indirmeler aynı anda yazmaya başlasın diye barrier'da bekler"""
+
+    def __init__(self, content: bytes, parties: int):
+        self.content = content
+        self.barrier = threading.Barrier(parties)
+
+    def get(self, url, timeout=None):
+        self.barrier.wait(5)
+        return FakeResponse(self.content)
+
+    def close(self):
+        pass
+
+
+class ResultBoundTest(unittest.TestCase):
+
+    def tearDown(self):
+        self.verifier.shutdown()
+
+    def test_results_bounded_by_max_results(self):
+        self.verifier = FakeVerifier(max_results=3)
+        for i in range(10):
+            self.verifier.submit(f"http://img/{i}.jpg").result(5)
+
+        self.assertEqual(len(self.verifier.wait()), 3)
+        self.assertEqual(self.verifier.stats()["pending"], 0)
+        self.assertIsNone(self.verifier.result("http://img/0.jpg"))
+        self.assertIsNotNone(self.verifier.result("http://img/9.jpg"))
+
+    def test_same_url_checked_once_until_ttl(self):
+        self.verifier = FakeVerifier(ttl=0.05)
+        self.verifier.submit("http://img/a.jpg").result(5)
+        self.assertTrue(self.verifier.submit("http://img/a.jpg").result(5).ok)
+        self.assertEqual(len(self.verifier.verified), 1)
+
+        time.sleep(0.1)
+        self.assertIsNone(self.verifier.result("http://img/a.jpg"))
+        self.verifier.submit("http://img/a.jpg").result(5)
+        self.assertEqual(len(self.verifier.verified), 2)
+
+
+class StoreTest(unittest.TestCase):
+
+    def test_concurrent_downloads_of_same_image(self):
+        with tempfile.TemporaryDirectory() as store_dir:
+            verifier = ImageVerifier(max_workers=4, store_dir=store_dir)
+            verifier.session = SlowSession(b"\x89PNG" + b"x" * 4096, 4)
+            checks = [ImageCheck(f"http://img/{i}/logo.png", ok=True) for i in range(4)]
+            threads = [threading.Thread(target=verifier._store, args=(check,)) for check in checks]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join(5)
+            verifier.shutdown()
+
+            paths = {check.path for check in checks}
+            self.assertEqual(len(paths), 1)
+            with open(paths.pop(), "rb") as f:
+                self.assertEqual(len(f.read()), 4100)
+            leftovers = [name for _, _, names in os.walk(store_dir) for name in names if name.endswith(".tmp")]
+            self.assertEqual(leftovers, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,189 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import threading
+import time
+import unittest
+
+from supplier_scrape_core.cache import ProductCache, LinkIndex
+from supplier_scrape_core.processer import Processer, SingleFlight
+from supplier_scrape_core.structers.product import PreState, Product, Suppliers
+
+"""
+İstek birleştirme (SingleFlight), batch içi tekrar penceresi ve önbellekten dönen ürünlerin kopyalanması.
+Ağa çıkılmaz, _fetch_product sahte fonksiyonla değiştirilir.
+
+    python -m unittest supplier_scrape_core.test_processer
+"""
+
+
+def wait_until(predicate, timeout: float = 5.0):
+    end = time.monotonic() + timeout
+    while not predicate():
+        if time.monotonic() > end:
+            raise AssertionError("condition not reached")
+        time.sleep(0.005)
+
+
+class FakeProcesser(Processer):
+    """_fetch_product çağrılarını sayar, release set edilene kadar bekletir"""
+
+    def __init__(self, product_factory, release: threading.Event = None, **kwargs):
+        super().__init__(cache=ProductCache(), link_index=LinkIndex(), **kwargs)
+        self.product_factory = product_factory
+        self.release = release
+        self.calls = []
+
+    def _fetch_product(self, supplier, code, log):
+        self.calls.append(code)
+        if self.release is not None:
+            self.release.wait(5)
+        return self.product_factory(supplier, code)
+
+
+def make_product(supplier, code):
+    return Product(urun_kodu=code, urun_ismi=f"ürün {code}", marka=supplier)
+
+
+class SingleFlightTest(unittest.TestCase):
+
+    def test_concurrent_calls_run_once(self):
+        flight = SingleFlight()
+        release = threading.Event()
+        runs, results = [], []
+
+        def fn():
+            runs.append(1)
+            release.wait(5)
+            return "sonuç"
+
+        threads = [threading.Thread(target=lambda: results.append(flight.do("k", fn))) for _ in range(5)]
+        for thread in threads:
+            thread.start()
+        # lider fn içinde beklerken diğer 4 çağrı ona bağlanmalı
+        wait_until(lambda: flight.coalesced == 4)
+        release.set()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(runs), 1)
+        self.assertEqual(results, ["sonuç"] * 5)
+
+    def test_follower_gets_leader_error(self):
+        flight = SingleFlight()
+        release = threading.Event()
+        errors = []
+
+        def fn():
+            release.wait(5)
+            raise ValueError("site down")
+
+        def call():
+            try:
+                flight.do("k", fn)
+            except ValueError as e:
+                errors.append(e)
+
+        leader = threading.Thread(target=call)
+        leader.start()
+        wait_until(lambda: "k" in flight._calls)
+        follower = threading.Thread(target=call)
+        follower.start()
+        wait_until(lambda: flight.coalesced == 1)
+        release.set()
+        leader.join()
+        follower.join()
+
+        self.assertEqual(len(errors), 2)
+        self.assertIs(errors[0], errors[1])
+        # hata sonrası anahtar temizlenir, sonraki çağrı yeniden çalışır
+        self.assertEqual(flight.do("k", lambda: 1), 1)
+
+
+class ProcesserCoalescingTest(unittest.TestCase):
+
+    def test_concurrent_identical_codes_fetch_once(self):
+        release = threading.Event()
+        processer = FakeProcesser(make_product, release)
+        before = Processer.coalesced_count()
+        results = {}
+
+        def run(name, price):
+            results[name] = processer.get_with_code(Suppliers.BALGUNES, PreState(900001, price, 1))
+
+        threads = [threading.Thread(target=run, args=(n, p)) for n, p in (("a", 100), ("b", 200), ("c", 300))]
+        for thread in threads:
+            thread.start()
+        wait_until(lambda: Processer.coalesced_count() - before == 2)
+        release.set()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(processer.calls, ["900001"])
+        prices = sorted(products[0].fiyat for products, _ in results.values())
+        self.assertEqual(prices, [100, 200, 300])
+
+    def test_follower_request_fails_with_leader(self):
+        release = threading.Event()
+
+        def broken(supplier, code):
+            raise RuntimeError("parse error")
+
+        processer = FakeProcesser(broken, release)
+        before = Processer.coalesced_count()
+        errors = []
+
+        def run():
+            try:
+                processer.get_with_code(Suppliers.BABEXI, PreState(900002, 10, 1))
+            except RuntimeError as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=run) for _ in range(2)]
+        for thread in threads:
+            thread.start()
+        wait_until(lambda: Processer.coalesced_count() - before == 1)
+        release.set()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(processer.calls), 1)
+        self.assertEqual(len(errors), 2)
+
+    def test_duplicate_codes_in_batch_get_own_price(self):
+        fetched = []
+
+        def factory(supplier, code):
+            product = make_product(supplier, code)
+            fetched.append(product)
+            return product
+
+        processer = FakeProcesser(factory)
+        products, failed = processer.get_with_code(
+            Suppliers.MALKOC, PreState(900003, 10, 1), PreState(900003, 20, 2), PreState(900003, 30, 3))
+
+        self.assertEqual(processer.calls, ["900003"])
+        self.assertEqual(failed, [])
+        self.assertEqual([(p.fiyat, p.stok) for p in products], [(10, 1), (20, 2), (30, 3)])
+        self.assertEqual(len({id(p) for p in products}), 3)
+        # fetch'in döndürdüğü, pencerede tutulan nesne değişmez
+        self.assertIsNone(fetched[0].fiyat)
+        self.assertIsNone(fetched[0].stok)
+
+    def test_cached_product_not_mutated(self):
+        processer = FakeProcesser(make_product)
+        processer.get_with_code(Suppliers.BALGUNES, PreState(900004, 50, 5))
+        first, _ = processer.get_with_code(Suppliers.BALGUNES, PreState(900004, 60, 6))
+        second, _ = processer.get_with_code(Suppliers.BALGUNES, PreState(900004, 70, 7))
+
+        self.assertEqual(processer.calls, ["900004"])
+        self.assertEqual((first[0].fiyat, first[0].stok), (60, 6))
+        self.assertEqual((second[0].fiyat, second[0].stok), (70, 7))
+        cached = processer.cache.get(Suppliers.BALGUNES, 900004)
+        self.assertIsNone(cached.fiyat)
+        self.assertIsNone(cached.stok)
+        self.assertEqual(cached.urun_ismi, "ürün 900004")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,56 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import importlib.util
+import tempfile
+import unittest
+
+from supplier_scrape_core.profiling import ProfileStore, MODE_DETERMINISTIC, MODE_SAMPLING
+
+"""
+    python -m unittest supplier_scrape_core.test_profiling
+"""
+
+HAS_PYINSTRUMENT = importlib.util.find_spec("pyinstrument") is not None
+
+
+class ProfileModeTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    @unittest.skipIf(HAS_PYINSTRUMENT, "pyinstrument is installed")
+    def test_disabled_without_sampling_profiler(self):
+        store = ProfileStore(self.tmp.name, min_interval=0)
+        self.assertIsNone(store.mode)
+        ran = []
+        with store.profile("batch") as report:
+            ran.append(1)
+        # blok profilsiz çalışır, rapor yazılmaz
+        self.assertEqual(ran, [1])
+        self.assertEqual(report, {"name": None, "mode": None})
+        self.assertEqual(store.list(), [])
+
+    @unittest.skipIf(HAS_PYINSTRUMENT, "pyinstrument is installed")
+    def test_deterministic_is_opt_in(self):
+        store = ProfileStore(self.tmp.name, min_interval=0, allow_deterministic=True)
+        self.assertEqual(store.mode, MODE_DETERMINISTIC)
+        with store.profile("batch") as report:
+            sum(range(1000))
+        self.assertTrue(report["name"].endswith(".pstats"))
+        self.assertEqual(report["mode"], MODE_DETERMINISTIC)
+
+    @unittest.skipUnless(HAS_PYINSTRUMENT, "pyinstrument is not installed")
+    def test_sampling_preferred(self):
+        store = ProfileStore(self.tmp.name, min_interval=0, allow_deterministic=True)
+        self.assertEqual(store.mode, MODE_SAMPLING)
+        with store.profile("batch") as report:
+            sum(range(1000))
+        self.assertTrue(report["name"].endswith(".speedscope.json"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,134 @@
+from typing import Dict, List
+import argparse
+import datetime
+import logging
+import os
+import time
+from .ingest import find_supplier, read_grouped
+from .cache import shared_cache, load_shared, save_shared, DEFAULT_CACHE_DIR
+from .processer import Processer
+from .ratelimit import HostRateLimiter
+from .logs import setup_logging
+from .structers.product import PreState, Suppliers
+
+"""
+Ertesi günün ürün kodlarını önceden çekip önbelleği ve link indeksini ısıtan iş.
+Operatörlerin sabah yapıştırdığı listeler soğuk scrape yerine hazır veriden karşılanır.
+
+Örnek (cron ile her sabah 06:30'da):
+    30 6 * * * cd /srv/scrape && python -m supplier_scrape_core.warmup --input codes.csv --notify http://localhost:5000
+"""
+
+def read_main_prestates() -> Dict[Suppliers, List[PreState]]:
+    """main.py içindeki prestates sözlüğü"""
+    from main import prestates
+    return prestates
+
+
+def lower_priority(niceness: int):
+    """Interaktif isteklerin önüne geçmemek için process önceliğini düşürür"""
+    if niceness and hasattr(os, "nice"):
+        try:
+            os.nice(niceness)
+        except OSError as e:
+            logging.warning(f"Process priority could'nt change: {e}")
+
+
+def wait_until(at: str):
+    """HH:MM biçimindeki bir sonraki saate kadar bekler"""
+    hour, minute = (int(x) for x in at.split(":"))
+    now = datetime.datetime.now()
+    target = now.replace(hour=hour, minute=minute, second=0, microsecond=0)
+    if target <= now:
+        target += datetime.timedelta(days=1)
+    logging.info(f"Warm-up scheduled at {target}")
+    time.sleep((target - now).total_seconds())
+
+
+def warm(prestates: Dict[Suppliers, List[PreState]], cache_dir: str = DEFAULT_CACHE_DIR,
+         min_interval: float = 1.0, refresh: bool = True) -> Dict[str, Dict[str, int]]:
+    """
+    Verilen kodları sırayla çekip paylaşılan önbelleği ve link indeksini doldurur,
+    her tedarikçiden sonra diske yazar.
+
+    Args:
+        prestates: Tedarikçiye göre ürün kodları
+        cache_dir: Warm verisinin yazılacağı dizin
+        min_interval: Aynı host'a iki istek arası en kısa süre (saniye)
+        refresh: True ise önbellekteki mevcut girdiler de yeniden çekilir
+
+    Returns:
+        Tedarikçi bazında başarılı/başarısız sayıları
+    """
+    load_shared(cache_dir)
+    processer = Processer(rate_limiter=HostRateLimiter(min_interval))
+
+    summary = {}
+    for supplier, items in prestates.items():
+        if not items:
+            continue
+        if refresh:
+            shared_cache.invalidate(supplier, [p.code for p in items])
+
+        started = time.monotonic()
+        successed, failed = processer.get_with_code(supplier, *items)
+        summary[supplier.name] = {"successed": len(successed), "failed": len(failed)}
+        logging.info(f"[{supplier.name}] Warmed {len(successed)}/{len(items)} in {time.monotonic() - started:.1f}s")
+
+        # yarıda kesilirse de o ana kadarki veri kullanılabilsin
+        save_shared(cache_dir)
+    return summary
+
+
+def notify_server(base_url: str):
+    """Çalışan backend'in warm verisini diskten yeniden yüklemesini sağlar"""
+    import requests
+    try:
+        response = requests.post(f"{base_url}/cache/reload", timeout=10)
+        logging.info(f"Server reload status: {response.status_code}")
+    except requests.exceptions.RequestException as e:
+        logging.error(f"Server reload fail: {e}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Ürün kodlarını önceden çekip önbelleği ısıtır")
+    parser.add_argument("--input", help="Kod listesi (csv/xlsx/jsonl)")
+    parser.add_argument("--supplier", help="Dosyada tedarikçi kolonu yoksa kullanılacak tedarikçi (prefix veya ad)")
+    parser.add_argument("--from-main", action="store_true", help="main.py içindeki prestates listesini kullan")
+    parser.add_argument("--cache-dir", default=DEFAULT_CACHE_DIR)
+    parser.add_argument("--interval", type=float, default=1.0, help="Host başına istekler arası en kısa süre (saniye)")
+    parser.add_argument("--nice", type=int, default=10, help="Process önceliğini düşürme miktarı")
+    parser.add_argument("--at", help="HH:MM, verilirse bu saate kadar beklenir")
+    parser.add_argument("--notify", help="Bitince warm verisini yeniden yükleyecek backend adresi")
+    args = parser.parse_args(argv)
+
+    setup_logging()
+
+    default_supplier = None
+    if args.supplier:
+        default_supplier = find_supplier(args.supplier)
+        if default_supplier is None:
+            parser.error(f"Invalid supplier: {args.supplier}")
+
+    prestates: Dict[Suppliers, List[PreState]] = {}
+    if args.from_main:
+        prestates.update(read_main_prestates())
+    if args.input:
+        for supplier, items in read_grouped(args.input, default_supplier).items():
+            prestates.setdefault(supplier, []).extend(items)
+    if not prestates:
+        parser.error("No codes given, use --input or --from-main")
+
+    if args.at:
+        wait_until(args.at)
+    lower_priority(args.nice)
+
+    summary = warm(prestates, args.cache_dir, args.interval)
+    logging.info(f"Warm-up finished: {summary}")
+
+    if args.notify:
+        notify_server(args.notify)
+
+
+if __name__ == "__main__":
+    main()